@@ -1,4 +1,37 @@
-from .nwbconverter import NWBConverter
-from .datainterfaces import *
-from .tools import spikeinterface, roiextractors, neo
-from .tools.yaml_conversion_specification import run_conversion_from_yaml
+from importlib import import_module
+
+from .datainterfaces import interface_modules as _interface_modules
+
+# Everything is imported on first access, so that importing neuroconv does not load the dependencies of every
+# interface and tool; see neuroconv.datainterfaces
+_lazy_imports = dict(
+    NWBConverter=".nwbconverter",
+    run_conversion_from_yaml=".tools.yaml_conversion_specification",
+    plan_conversion_from_yaml=".tools.yaml_conversion_specification",
+    interface_list=".datainterfaces",
+    **{interface_name: ".datainterfaces" for interface_name in _interface_modules},
+)
+# The modules of the tools, aliased at the top level
+_lazy_modules = dict(
+    spikeinterface=".tools.spikeinterface.spikeinterface",
+    roiextractors=".tools.roiextractors.roiextractors",
+    neo=".tools.neo.neo",
+)
+
+
+def __getattr__(name: str):
+    if name in _lazy_imports:
+        value = getattr(import_module(_lazy_imports[name], package=__name__), name)
+    elif name in _lazy_modules:
+        value = import_module(_lazy_modules[name], package=__name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_imports) + list(_lazy_modules))
+
+
+__all__ = list(_lazy_imports) + list(_lazy_modules)
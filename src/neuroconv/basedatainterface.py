@@ -1,16 +1,22 @@
 """Authors: Cody Baker and Ben Dichter."""
 from abc import abstractmethod, ABC
 import uuid
-from typing import Optional
+from pathlib import Path
+from typing import List, Optional
 
+import numpy as np
 from pynwb import NWBFile
 
 from .utils import get_base_schema, get_schema_from_method_signature
+from .utils.header_cache import header_cache
 
 
 class BaseDataInterface(ABC):
     """Abstract class defining the structure of all DataInterfaces."""
 
+    # The header cache shared by all the interfaces (see neuroconv.utils.header_cache)
+    header_cache = header_cache
+
     @classmethod
     def get_source_schema(cls):
         """Infer the JSON schema for the source_data from the method signature (annotation typing)."""
@@ -51,6 +57,62 @@ class BaseDataInterface(ABC):
         """Child DataInterface classes should override this to match their conversion options."""
         return dict()
 
+    def get_datasets(self, **conversion_options) -> dict:
+        """
+        Child DataInterface classes should override this to describe the large datasets run_conversion would write.
+
+        Returns a dictionary from dataset name to an H5DataIO wrapping a GenericDataChunkIterator over the data, with
+        the compression settings it would be written with. Creating the iterators must not read the data, so that a
+        conversion can be planned from the file headers alone.
+        """
+        return dict()
+
+    def get_source_file_paths(self) -> List[Path]:
+        """
+        Return the paths of the files and folders of the source data that run_conversion reads.
+
+        By default, these are the existing paths of the source arguments whose names end with '_path' or '_paths',
+        such as 'file_path', 'folder_path' or 'file_paths'. Child DataInterface classes should override this if the
+        extractor also reads files that are not passed as source arguments, such as the data files of a header file.
+        """
+        source_file_paths = []
+        for key, value in self.source_data.items():
+            if value is None or not (key.endswith("_path") or key.endswith("_paths")):
+                continue
+            for path in value if isinstance(value, (list, tuple)) else [value]:
+                if Path(path).exists():
+                    source_file_paths.append(Path(path))
+        return source_file_paths
+
+    def get_stub_fraction(self, **conversion_options) -> Optional[float]:
+        """
+        Return the fraction of the source data that run_conversion reads with stub_test=True, or None if unknown.
+
+        By default, this is the fraction of the bytes of the datasets described by get_datasets that the stub writes.
+        Child DataInterface classes without datasets to describe should override this if they support stub_test.
+        """
+
+        def get_planned_bytes(**options) -> int:
+            return sum(
+                int(np.prod(dataset_io.data.maxshape, dtype="int64")) * np.dtype(dataset_io.data.dtype).itemsize
+                for dataset_io in self.get_datasets(**options).values()
+            )
+
+        full_bytes = get_planned_bytes(**dict(conversion_options, stub_test=False))
+        if not full_bytes:
+            return None
+        return min(get_planned_bytes(**dict(conversion_options, stub_test=True)) / full_bytes, 1.0)
+
+    def requires_interleaved_write(self, **conversion_options) -> bool:
+        """
+        Child DataInterface classes should override this if run_conversion writes several datasets whose data is
+        produced concurrently, such as movies decoded in parallel.
+
+        The NWBFile is then written with exhaust_dci=False, which writes the buffers of all the DataChunkIterators in
+        round-robin order instead of each to completion in turn.
+        """
+        return False
+
     @abstractmethod
     def run_conversion(
         self,
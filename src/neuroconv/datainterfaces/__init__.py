@@ -1,94 +1,70 @@
-from .ecephys.tutorial.recordingtutorialdatainterface import RecordingTutorialInterface
-from .ecephys.tutorial.sortingtutorialdatainterface import SortingTutorialInterface
-from .ecephys.neuroscope.neuroscopedatainterface import (
-    NeuroscopeRecordingInterface,
-    NeuroscopeLFPInterface,
-    NeuroscopeMultiRecordingTimeInterface,
-    NeuroscopeSortingInterface,
-)
-from .ecephys.spikeglx.spikeglxdatainterface import SpikeGLXRecordingInterface, SpikeGLXLFPInterface
-from .ecephys.spikegadgets.spikegadgetsdatainterface import SpikeGadgetsRecordingInterface
-from .ecephys.spikeinterface.sipickledatainterfaces import (
-    SIPickleRecordingExtractorInterface,
-    SIPickleSortingExtractorInterface,
-)
-from .ecephys.intan.intandatainterface import IntanRecordingInterface
-from .ecephys.ced.ceddatainterface import CEDRecordingInterface
-from .ecephys.cellexplorer.cellexplorerdatainterface import CellExplorerSortingInterface
-from .ecephys.blackrock.blackrockdatainterface import (
-    BlackrockRecordingExtractorInterface,
-    BlackrockSortingExtractorInterface,
-)
-from .ecephys.openephys.openephysdatainterface import (
-    OpenEphysRecordingExtractorInterface,
-    OpenEphysSortingExtractorInterface,
-)
-from .ecephys.axona.axonadatainterface import (
-    AxonaRecordingExtractorInterface,
-    AxonaPositionDataInterface,
-    AxonaLFPDataInterface,
-    AxonaUnitRecordingExtractorInterface,
+"""
+Registry of the data interfaces, imported on first access.
+
+Each interface module is only imported, along with the dependencies of its format, when the interface is first
+accessed as an attribute of this package (or of neuroconv itself), so that importing neuroconv stays fast.
+"""
+from importlib import import_module
+
+# The interfaces in the order of interface_list, mapped to the module defining them
+interface_modules = dict(
+    RecordingTutorialInterface=".ecephys.tutorial.recordingtutorialdatainterface",
+    SortingTutorialInterface=".ecephys.tutorial.sortingtutorialdatainterface",
+    NeuralynxRecordingInterface=".ecephys.neuralynx.neuralynxdatainterface",
+    NeuralynxSortingInterface=".ecephys.neuralynx.neuralynxdatainterface",
+    NeuroscopeRecordingInterface=".ecephys.neuroscope.neuroscopedatainterface",
+    NeuroscopeMultiRecordingTimeInterface=".ecephys.neuroscope.neuroscopedatainterface",
+    NeuroscopeSortingInterface=".ecephys.neuroscope.neuroscopedatainterface",
+    NeuroscopeLFPInterface=".ecephys.neuroscope.neuroscopedatainterface",
+    SpikeGLXRecordingInterface=".ecephys.spikeglx.spikeglxdatainterface",
+    SpikeGLXLFPInterface=".ecephys.spikeglx.spikeglxdatainterface",
+    SpikeGadgetsRecordingInterface=".ecephys.spikegadgets.spikegadgetsdatainterface",
+    SIPickleRecordingExtractorInterface=".ecephys.spikeinterface.sipickledatainterfaces",
+    SIPickleSortingExtractorInterface=".ecephys.spikeinterface.sipickledatainterfaces",
+    IntanRecordingInterface=".ecephys.intan.intandatainterface",
+    CEDRecordingInterface=".ecephys.ced.ceddatainterface",
+    CellExplorerSortingInterface=".ecephys.cellexplorer.cellexplorerdatainterface",
+    BlackrockRecordingExtractorInterface=".ecephys.blackrock.blackrockdatainterface",
+    BlackrockSortingExtractorInterface=".ecephys.blackrock.blackrockdatainterface",
+    OpenEphysRecordingExtractorInterface=".ecephys.openephys.openephysdatainterface",
+    OpenEphysSortingExtractorInterface=".ecephys.openephys.openephysdatainterface",
+    PhySortingInterface=".ecephys.phy.phydatainterface",
+    KilosortSortingInterface=".ecephys.kilosort.kilosortdatainterface",
+    AxonaRecordingExtractorInterface=".ecephys.axona.axonadatainterface",
+    AxonaPositionDataInterface=".ecephys.axona.axonadatainterface",
+    AxonaLFPDataInterface=".ecephys.axona.axonadatainterface",
+    AxonaUnitRecordingExtractorInterface=".ecephys.axona.axonadatainterface",
+    CaimanSegmentationInterface=".ophys.caiman.caimandatainterface",
+    CnmfeSegmentationInterface=".ophys.cnmfe.cnmfedatainterface",
+    Suite2pSegmentationInterface=".ophys.suite2p.suite2pdatainterface",
+    ExtractSegmentationInterface=".ophys.extract.extractdatainterface",
+    SimaSegmentationInterface=".ophys.sima.simadatainterface",
+    SbxImagingInterface=".ophys.sbx.sbxdatainterface",
+    TiffImagingInterface=".ophys.tiff.tiffdatainterface",
+    MultiTiffImagingInterface=".ophys.tiff.tiffdatainterface",
+    Hdf5ImagingInterface=".ophys.hdf5.hdf5datainterface",
+    MovieInterface=".behavior.movie.moviedatainterface",
+    DeepLabCutInterface=".behavior.deeplabcut.deeplabcutdatainterface",
+    AbfInterface=".icephys.abf.abfdatainterface",
+    ScanImageImagingInterface=".ophys.scanimage.scanimageimaginginterface",
+    MultiScanImageImagingInterface=".ophys.scanimage.scanimageimaginginterface",
+    EDFRecordingInterface=".ecephys.edf.edfdatainterface",
 )
-from .ecephys.neuralynx.neuralynxdatainterface import NeuralynxRecordingInterface, NeuralynxSortingInterface
-from .ecephys.phy.phydatainterface import PhySortingInterface
-from .ecephys.kilosort.kilosortdatainterface import KilosortSortingInterface
-from .ecephys.edf.edfdatainterface import EDFRecordingInterface
 
-from .ophys.caiman.caimandatainterface import CaimanSegmentationInterface
-from .ophys.cnmfe.cnmfedatainterface import CnmfeSegmentationInterface
-from .ophys.suite2p.suite2pdatainterface import Suite2pSegmentationInterface
-from .ophys.extract.extractdatainterface import ExtractSegmentationInterface
-from .ophys.sima.simadatainterface import SimaSegmentationInterface
 
-from .ophys.sbx.sbxdatainterface import SbxImagingInterface
-from .ophys.tiff.tiffdatainterface import TiffImagingInterface
-from .ophys.hdf5.hdf5datainterface import Hdf5ImagingInterface
-from .ophys.scanimage.scanimageimaginginterface import ScanImageImagingInterface
+def __getattr__(name: str):
+    if name in interface_modules:
+        value = getattr(import_module(interface_modules[name], package=__name__), name)
+    elif name == "interface_list":
+        value = [getattr(import_module(__name__), interface_name) for interface_name in interface_modules]
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
-from .behavior.movie.moviedatainterface import MovieInterface
-from .behavior.deeplabcut.deeplabcutdatainterface import DeepLabCutInterface
 
-from .icephys.abf.abfdatainterface import AbfInterface
+def __dir__():
+    return sorted(list(globals()) + list(interface_modules) + ["interface_list"])
 
 
-interface_list = [
-    RecordingTutorialInterface,
-    SortingTutorialInterface,
-    NeuralynxRecordingInterface,
-    NeuralynxSortingInterface,
-    NeuroscopeRecordingInterface,
-    NeuroscopeMultiRecordingTimeInterface,
-    NeuroscopeSortingInterface,
-    NeuroscopeLFPInterface,
-    SpikeGLXRecordingInterface,
-    SpikeGLXLFPInterface,
-    SpikeGadgetsRecordingInterface,
-    SIPickleRecordingExtractorInterface,
-    SIPickleSortingExtractorInterface,
-    IntanRecordingInterface,
-    CEDRecordingInterface,
-    CellExplorerSortingInterface,
-    BlackrockRecordingExtractorInterface,
-    BlackrockSortingExtractorInterface,
-    OpenEphysRecordingExtractorInterface,
-    OpenEphysSortingExtractorInterface,
-    PhySortingInterface,
-    KilosortSortingInterface,
-    AxonaRecordingExtractorInterface,
-    AxonaPositionDataInterface,
-    AxonaLFPDataInterface,
-    AxonaUnitRecordingExtractorInterface,
-    CaimanSegmentationInterface,
-    CnmfeSegmentationInterface,
-    Suite2pSegmentationInterface,
-    ExtractSegmentationInterface,
-    SimaSegmentationInterface,
-    SbxImagingInterface,
-    TiffImagingInterface,
-    Hdf5ImagingInterface,
-    MovieInterface,
-    DeepLabCutInterface,
-    AbfInterface,
-    ScanImageImagingInterface,
-    EDFRecordingInterface,
-]
+__all__ = list(interface_modules) + ["interface_list"]
@@ -1,11 +1,23 @@
 """Authors: Saksham Sharda, Cody Baker."""
-from typing import Tuple, Iterable
+import hashlib
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Tuple, Iterable, Iterator, List, Optional
+from warnings import warn
 
 import numpy as np
 from tqdm import tqdm
-from hdmf.data_utils import GenericDataChunkIterator
+from hdmf.common import DynamicTable, VectorData, VectorIndex
+from hdmf.data_utils import DataChunkIterator, GenericDataChunkIterator
 
-from ....utils import FilePathType
+from ....utils import FilePathType, FolderPathType
 
 
 try:
@@ -16,9 +28,247 @@ except ImportError:
     HAVE_OPENCV = False
 INSTALL_MESSAGE = "Please install opencv to use the VideoCaptureContext class! (pip install opencv-python)"
 
+try:
+    import av
+
+    HAVE_PYAV = True
+except ImportError:
+    HAVE_PYAV = False
+
+
+def _demux_video_packets(file_path: FilePathType) -> Optional[Tuple[np.ndarray, np.ndarray, int, float]]:
+    """
+    Read the presentation timestamps and keyframe flags of the packets of the first video stream of a movie.
+
+    The packets are demuxed but never decoded. Returns the timestamps and flags in decoding order along with the
+    start time and time base of the stream, or None if PyAV is not installed or the container does not store a
+    timestamp for every packet.
+    """
+    if not HAVE_PYAV:
+        return None
+    try:
+        with av.open(str(file_path)) as container:
+            stream = container.streams.video[0]
+            presentation_timestamps = []
+            keyframe_flags = []
+            for packet in container.demux(stream):
+                if packet.size == 0:  # Flushing packet at the end of the stream
+                    continue
+                if packet.pts is None:
+                    return None
+                presentation_timestamps.append(packet.pts)
+                keyframe_flags.append(packet.is_keyframe)
+            start_time = stream.start_time or 0
+            time_base = float(stream.time_base)
+    except (av.error.FFmpegError, IndexError):
+        return None
+    if not presentation_timestamps:
+        return None
+    return np.array(presentation_timestamps, dtype="int64"), np.array(keyframe_flags, dtype=bool), start_time, time_base
+
+
+def _get_default_cache_folder() -> Path:
+    """Return the user cache directory of neuroconv, which the NEUROCONV_CACHE_DIR environment variable overrides."""
+    if "NEUROCONV_CACHE_DIR" in os.environ:
+        return Path(os.environ["NEUROCONV_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "neuroconv"
+
+
+class MovieFrameIndex:
+    """
+    Index of the presentation timestamps and keyframes of the frames of a movie, read from its container.
+
+    The index is built by demuxing every packet of the first video stream once, without decoding any of them.
+    It is then saved in a cache folder and reloaded for as long as the size and modification time of the movie file
+    are unchanged. Any frame can be reached exactly by seeking to its preceding keyframe and decoding forward.
+    """
+
+    version = 1
+
+    def __init__(
+        self, presentation_timestamps: np.ndarray, keyframe_indices: np.ndarray, start_time: int, time_base: float
+    ):
+        """
+        Parameters
+        ----------
+        presentation_timestamps : np.ndarray
+            The presentation timestamps of the frames in presentation order, in units of the time base of the stream.
+        keyframe_indices : np.ndarray
+            The sorted indices of the keyframes in presentation order.
+        start_time : int
+            The start time of the stream, in units of its time base.
+        time_base : float
+            The time base of the stream, in seconds.
+        """
+        self.presentation_timestamps = presentation_timestamps
+        self.keyframe_indices = keyframe_indices
+        self.start_time = start_time
+        self.time_base = time_base
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.presentation_timestamps)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """The timestamps of the frames in seconds, relative to the start of the stream as reported by OpenCV."""
+        return (self.presentation_timestamps - self.start_time) * self.time_base
+
+    def get_preceding_keyframe(self, frame_number: int) -> int:
+        """Return the index of the last keyframe at or before a frame."""
+        return int(self.keyframe_indices[np.searchsorted(self.keyframe_indices, frame_number, side="right") - 1])
+
+    @classmethod
+    def from_container(cls, file_path: FilePathType) -> Optional["MovieFrameIndex"]:
+        """
+        Build the index of a movie by demuxing its container.
+
+        Returns None if PyAV is not installed or the container does not store a timestamp for every packet.
+        """
+        packets = _demux_video_packets(file_path=file_path)
+        if packets is None:
+            return None
+        presentation_timestamps, keyframe_flags, start_time, time_base = packets
+
+        # Packets are stored in decoding order, which differs from presentation order for bidirectional frames
+        order = np.argsort(presentation_timestamps, kind="stable")
+        frame_indices = np.empty(shape=len(order), dtype="int64")
+        frame_indices[order] = np.arange(len(order))
+        # Decoding can always start with the first frame
+        keyframe_indices = np.union1d(frame_indices[keyframe_flags], [0])
+        return cls(
+            presentation_timestamps=presentation_timestamps[order],
+            keyframe_indices=keyframe_indices,
+            start_time=start_time,
+            time_base=time_base,
+        )
+
+    @classmethod
+    def from_file(
+        cls, file_path: FilePathType, cache_folder: Optional[FolderPathType] = None
+    ) -> Optional["MovieFrameIndex"]:
+        """
+        Load the cached index of a movie, or build it from the container and cache it.
+
+        Parameters
+        ----------
+        file_path : FilePathType
+            The path to the movie file.
+        cache_folder : FolderPathType, optional
+            The folder of the cached indices. Pass the folder of the movie to cache its index beside it.
+            The default is the 'movie_indices' folder of the user cache directory of neuroconv.
+
+        Returns
+        -------
+        MovieFrameIndex or None
+            None if the index can neither be loaded from the cache nor be built from the container.
+        """
+        movie_frame_index = cls.from_cache(file_path=file_path, cache_folder=cache_folder)
+        if movie_frame_index is not None:
+            return movie_frame_index
+
+        file_stat = Path(file_path).stat()
+        movie_frame_index = cls.from_container(file_path=file_path)
+        if movie_frame_index is not None:
+            movie_frame_index._save(
+                cache_file_path=cls._get_cache_file_path(file_path=file_path, cache_folder=cache_folder),
+                file_size=file_stat.st_size,
+                file_mtime_ns=file_stat.st_mtime_ns,
+            )
+        return movie_frame_index
+
+    @classmethod
+    def from_cache(
+        cls, file_path: FilePathType, cache_folder: Optional[FolderPathType] = None
+    ) -> Optional["MovieFrameIndex"]:
+        """
+        Load the cached index of a movie, without ever demuxing the container.
+
+        Returns None if the index of the movie is not cached, or was cached for a different size or modification time
+        of the movie file. See `from_file` for the parameters.
+        """
+        file_stat = Path(file_path).stat()
+        try:
+            with np.load(cls._get_cache_file_path(file_path=file_path, cache_folder=cache_folder)) as cached_index:
+                if (
+                    int(cached_index["version"]) == cls.version
+                    and int(cached_index["file_size"]) == file_stat.st_size
+                    and int(cached_index["file_mtime_ns"]) == file_stat.st_mtime_ns
+                ):
+                    return cls(
+                        presentation_timestamps=cached_index["presentation_timestamps"],
+                        keyframe_indices=cached_index["keyframe_indices"],
+                        start_time=int(cached_index["start_time"]),
+                        time_base=float(cached_index["time_base"]),
+                    )
+        except (OSError, KeyError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def _get_cache_file_path(file_path: FilePathType, cache_folder: Optional[FolderPathType] = None) -> Path:
+        file_path = Path(file_path)
+        cache_folder = _get_default_cache_folder() / "movie_indices" if cache_folder is None else Path(cache_folder)
+        path_hash = hashlib.sha1(str(file_path.resolve()).encode()).hexdigest()[:16]
+        return cache_folder / f"{file_path.name}.{path_hash}.index.npz"
+
+    def _save(self, cache_file_path: Path, file_size: int, file_mtime_ns: int):
+        # The cache is an optimization only, so an unwritable cache folder is ignored
+        try:
+            cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_file_path = cache_file_path.with_name(f"{cache_file_path.name}.{os.getpid()}.tmp")
+            with open(temporary_file_path, "wb") as file:
+                np.savez(
+                    file,
+                    version=self.version,
+                    file_size=file_size,
+                    file_mtime_ns=file_mtime_ns,
+                    presentation_timestamps=self.presentation_timestamps,
+                    keyframe_indices=self.keyframe_indices,
+                    start_time=self.start_time,
+                    time_base=self.time_base,
+                )
+            os.replace(temporary_file_path, cache_file_path)
+        except OSError:
+            pass
+
+
+def get_movie_container_timestamps(file_path: FilePathType) -> Optional[np.ndarray]:
+    """
+    Return the presentation timestamps, in seconds, of the frames of a movie from its container.
+
+    The timestamps are read from the packets of the first video stream, which are demuxed but never decoded,
+    or from the cached MovieFrameIndex of the movie.
+    They are relative to the start of the stream, as reported by OpenCV.
+
+    Returns None if PyAV is not installed or the container does not store a timestamp for every packet,
+    in which case the frames have to be decoded to retrieve their timestamps.
+    """
+    movie_frame_index = MovieFrameIndex.from_file(file_path=file_path)
+    return None if movie_frame_index is None else movie_frame_index.timestamps
+
+
+def get_movie_keyframe_indices(file_path: FilePathType) -> Optional[np.ndarray]:
+    """
+    Return the sorted indices of the keyframes of a movie, in presentation order, from its container.
+
+    Decoding can start at any keyframe, which splits the movie into groups of pictures (GOPs) that are decoded
+    independently of each other. The packets are demuxed but never decoded, or read from the cached MovieFrameIndex.
+
+    Returns None if PyAV is not installed or the container does not store a timestamp for every packet.
+    """
+    movie_frame_index = MovieFrameIndex.from_file(file_path=file_path)
+    return None if movie_frame_index is None else movie_frame_index.keyframe_indices
+
 
 class VideoCaptureContext:
-    """Retrieving video metadata and frames using a context manager."""
+    """
+    Retrieving video metadata and frames using a context manager.
+
+    Whenever the MovieFrameIndex of the movie is available, the frame count and timestamps are read from it and
+    seeking decodes forward from the preceding keyframe, checking the timestamp of every decoded frame against the
+    index, which makes random access to any frame exact.
+    """
 
     def __init__(self, file_path: FilePathType):
         assert HAVE_OPENCV, INSTALL_MESSAGE
@@ -26,16 +276,40 @@ class VideoCaptureContext:
         self.file_path = file_path
         self._current_frame = 0
         self._frame_count = None
+        self._frame_index = None
+        self._frame_index_loaded = False
+        self._frame_grabbed = False
         self._movie_open_msg = "The Movie file is not open!"
 
+    @property
+    def frame_index(self) -> Optional[MovieFrameIndex]:
+        """The index of the frames of the movie, or None if it cannot be read from the container."""
+        if not self._frame_index_loaded:
+            self._frame_index = MovieFrameIndex.from_file(file_path=self.file_path)
+            self._frame_index_loaded = True
+        return self._frame_index
+
     def get_movie_timestamps(self):
-        """Return numpy array of the timestamps(s) for a movie file."""
+        """
+        Return numpy array of the timestamps(s) for a movie file.
+
+        The timestamps are read from the frame index without decoding any frame whenever possible.
+        """
+        frame_count = self.get_movie_frame_count()
+        if self.frame_index is not None:
+            return self.frame_index.timestamps[:frame_count]
+        return self._decode_movie_timestamps()
+
+    def _decode_movie_timestamps(self):
+        """Return numpy array of the timestamps(s) for a movie file by reading every frame."""
+        initial_frame_number = self.current_frame
         timestamps = []
         for _ in tqdm(range(self.get_movie_frame_count()), desc="retrieving timestamps"):
-            success, _ = self.vc.read()
+            success, _ = self._read()
             if not success:
                 break
             timestamps.append(self.vc.get(cv2.CAP_PROP_POS_MSEC))
+        self.current_frame = initial_frame_number
         return np.array(timestamps) / 1000
 
     def get_movie_fps(self):
@@ -70,6 +344,17 @@ class VideoCaptureContext:
     def _movie_frame_count(self):
         """Return the total number of frames for a movie file."""
         assert self.isOpened(), self._movie_open_msg
+        if self.frame_index is not None:
+            return self.frame_index.frame_count
+        return self.get_header_frame_count()
+
+    def get_header_frame_count(self) -> int:
+        """
+        Return the number of frames of a movie file as stated by its container header, without demuxing any packet.
+
+        The frame count of the container header is an estimate for some formats.
+        """
+        assert self.isOpened(), self._movie_open_msg
         prop = self.get_cv_attribute("CAP_PROP_FRAME_COUNT")
         return int(self.vc.get(prop))
 
@@ -86,21 +371,65 @@ class VideoCaptureContext:
     @current_frame.setter
     def current_frame(self, frame_number: int):
         assert self.isOpened(), self._movie_open_msg
-        set_arg = self.get_cv_attribute("CAP_PROP_POS_FRAMES")
-        set_value = self.vc.set(set_arg, frame_number)
-        if set_value:
-            self._current_frame = frame_number
-        else:
+        self._frame_grabbed = False
+        if self.frame_index is not None and frame_number < self.frame_index.frame_count:
+            self._seek_frame(frame_number=frame_number)
+        elif not self.vc.set(self.get_cv_attribute("CAP_PROP_POS_FRAMES"), frame_number):
+            raise ValueError(f"Could not set frame number (received {frame_number}).")
+        self._current_frame = frame_number
+
+    def _grab_frame(self, frame_number: int) -> bool:
+        """Grab the next frame and check that its timestamp is that of a frame of the index."""
+        frame_timestamp_ms = self.frame_index.timestamps[frame_number] * 1000
+        return (
+            self.vc.grab() and abs(self.vc.get(self.get_cv_attribute("CAP_PROP_POS_MSEC")) - frame_timestamp_ms) < 1e-3
+        )
+
+    def _seek_frame(self, frame_number: int):
+        """
+        Grab a frame of the index, which the next read then retrieves.
+
+        The movie is sought to the timestamp of the preceding keyframe and decoded forward. OpenCV maps both the
+        timestamps and the frame numbers it seeks to through the frame rate of the movie, which misses the keyframe of
+        variable frame rate movies, so the timestamp of every grabbed frame is checked against the index. Seeking by
+        frame number is the second attempt, and decoding from the start of the movie is exact in any case.
+        """
+        keyframe_number = self.frame_index.get_preceding_keyframe(frame_number=frame_number)
+        seek_attempts = [
+            ("CAP_PROP_POS_MSEC", self.frame_index.timestamps[keyframe_number] * 1000),
+            ("CAP_PROP_POS_FRAMES", keyframe_number),
+        ]
+        for attribute_name, value in seek_attempts:
+            if self.vc.set(self.get_cv_attribute(attribute_name), value) and all(
+                self._grab_frame(frame_number=k) for k in range(keyframe_number, frame_number + 1)
+            ):
+                self._frame_grabbed = True
+                return
+        self.vc.release()
+        self.vc = cv2.VideoCapture(self.file_path)
+        if not all(self._grab_frame(frame_number=k) for k in range(frame_number + 1)):
             raise ValueError(f"Could not set frame number (received {frame_number}).")
+        self._frame_grabbed = True
+
+    def _read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read the next frame, which may already have been grabbed by a seek."""
+        if self._frame_grabbed:
+            self._frame_grabbed = False
+            return self.vc.retrieve()
+        return self.vc.read()
 
     def get_movie_frame(self, frame_number: int):
         """Return the specific frame from a movie as an RGB colorspace."""
         assert self.isOpened(), self._movie_open_msg
         assert frame_number < self.get_movie_frame_count(), "frame number is greater than length of movie"
         initial_frame_number = self.current_frame
-        self.current_frame = frame_number
-        success, frame = self.vc.read()
-        self.current_frame = initial_frame_number
+        if frame_number != initial_frame_number:
+            self.current_frame = frame_number
+        success, frame = self._read()
+        if initial_frame_number == frame_number + 1:
+            self._current_frame = initial_frame_number
+        else:
+            self.current_frame = initial_frame_number
         return np.flip(frame, 2)  # np.flip to re-order color channels to RGB
 
     def get_movie_frame_dtype(self):
@@ -121,7 +450,7 @@ class VideoCaptureContext:
     def __next__(self):
         assert self.isOpened(), self._movie_open_msg
         if self._current_frame < self.frame_count:
-            success, frame = self.vc.read()
+            success, frame = self._read()
             self._current_frame += 1
             if success:
                 return np.flip(frame, 2)  # np.flip to re-order color channels to RGB
@@ -132,7 +461,9 @@ class VideoCaptureContext:
             raise StopIteration
 
     def __enter__(self):
-        self.vc = cv2.VideoCapture(self.file_path)
+        if not self.vc.isOpened():
+            self.vc = cv2.VideoCapture(self.file_path)
+            self._frame_grabbed = False
         return self
 
     def __exit__(self, *args):
@@ -142,8 +473,94 @@ class VideoCaptureContext:
         self.vc.release()
 
 
+def _probe_movie(file_path: FilePathType, include_timestamps: bool) -> dict:
+    assert Path(file_path).is_file(), "The file does not exist!"
+    with VideoCaptureContext(str(file_path)) as video_capture_ob:
+        assert video_capture_ob.isOpened(), "The file could not be opened as a movie!"
+        fps = video_capture_ob.get_movie_fps()
+        if include_timestamps:
+            # The timestamps are read from the MovieFrameIndex, which demuxes every packet unless it is cached
+            frame_count = video_capture_ob.get_movie_frame_count()
+        else:
+            movie_frame_index = MovieFrameIndex.from_cache(file_path=file_path)
+            if movie_frame_index is None:
+                frame_count = video_capture_ob.get_header_frame_count()
+            else:
+                frame_count = movie_frame_index.frame_count
+        assert fps > 0, f"The movie has an invalid fps ({fps})!"
+        assert frame_count > 0, "The movie has no frames!"
+        movie_probe = dict(fps=fps, frame_count=frame_count, duration=frame_count / fps)
+        if include_timestamps:
+            movie_probe.update(timestamps=video_capture_ob.get_movie_timestamps())
+    return movie_probe
+
+
+def probe_movies(
+    file_paths: List[FilePathType], include_timestamps: bool = False, max_workers: Optional[int] = None
+) -> List[dict]:
+    """
+    Probe several movie files concurrently in a thread pool and validate all of them at once.
+
+    Without timestamps, only the container headers are read: the fps and frame count of each movie come from its
+    header, or from its MovieFrameIndex if that is already cached. The frame count of the header is an estimate for
+    some formats. With timestamps, the exact frame count and timestamps come from the MovieFrameIndex of each movie,
+    which demuxes every packet of the movie (without decoding them) unless it is already cached.
+    The movies are assumed to be contiguous parts of a single recording, in order.
+
+    Parameters
+    ----------
+    file_paths : list of FilePathType
+        The paths to the movie files.
+    include_timestamps : bool, default: False
+        Whether to also read the timestamps of the frames of each movie, relative to its own start.
+    max_workers : int, optional
+        The number of threads probing the movies. The default is that of concurrent.futures.ThreadPoolExecutor.
+
+    Returns
+    -------
+    list of dict
+        For each movie, its 'fps', 'frame_count', 'duration' in seconds, 'starting_frame' (the number of frames in
+        the movies before it) and, if requested, 'timestamps'.
+
+    Raises
+    ------
+    ValueError
+        Listing every movie that could not be probed.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_probe_movie, file_path=file_path, include_timestamps=include_timestamps)
+            for file_path in file_paths
+        ]
+    movie_probes = []
+    errors = []
+    for file_path, future in zip(file_paths, futures):
+        try:
+            movie_probes.append(future.result())
+        except Exception as exception:
+            errors.append(f"{file_path}: {exception}")
+    if errors:
+        raise ValueError(f"Could not probe {len(errors)} of the {len(file_paths)} movie files!\n" + "\n".join(errors))
+
+    starting_frames = np.cumsum([0] + [movie_probe["frame_count"] for movie_probe in movie_probes[:-1]])
+    for movie_probe, starting_frame in zip(movie_probes, starting_frames):
+        movie_probe.update(starting_frame=int(starting_frame))
+    fps_values = sorted(set(movie_probe["fps"] for movie_probe in movie_probes))
+    if len(fps_values) > 1:
+        warn(f"The movie files have different fps {fps_values}!")
+    return movie_probes
+
+
 class MovieDataChunkIterator(GenericDataChunkIterator):
-    """DataChunkIterator specifically for use on RecordingExtractor objects."""
+    """
+    DataChunkIterator specifically for use on movie files.
+
+    The frames are decoded sequentially into a buffer of the dtype of the movie that is reused across iterations.
+    The first frame is decoded once on initialization to determine the frame shape and dtype, and is kept to be
+    returned with the first buffer.
+    With max_workers greater than one, the frames are instead decoded by a SegmentedMovieDecoder, which splits the
+    movie at its keyframes into segments decoded in parallel worker processes.
+    """
 
     def __init__(
         self,
@@ -151,11 +568,27 @@ class MovieDataChunkIterator(GenericDataChunkIterator):
         buffer_gb: float = None,
         chunk_shape: tuple = None,
         stub_test: bool = False,
+        max_workers: int = 1,
+        max_in_flight_gb: float = 1.0,
     ):
         self.video_capture_ob = VideoCaptureContext(movie_file)
-        self._full_frame_size_mb, self._full_frame_shape = self._get_frame_details()
         if stub_test:
             self.video_capture_ob.frame_count = 10
+        self._first_frame = next(self.video_capture_ob)
+        self._frames_buffer = None
+        self._decoded_frames = None
+        self._next_decoded_frame = 0
+        if max_workers > 1:
+            self._decoded_frames = iter(
+                SegmentedMovieDecoder(
+                    file_path=movie_file,
+                    frame_count=self.video_capture_ob.get_movie_frame_count(),
+                    frame_shape=self._first_frame.shape,
+                    max_workers=max_workers,
+                    max_in_flight_gb=max_in_flight_gb,
+                )
+            )
+        self._full_frame_size_mb, self._full_frame_shape = self._get_frame_details()
         super().__init__(
             buffer_gb=buffer_gb,
             chunk_shape=chunk_shape,
@@ -189,20 +622,515 @@ class MovieDataChunkIterator(GenericDataChunkIterator):
 
     def _get_frame_details(self):
         """Get frame shape and size in MB"""
-        frame_shape = (1, *self.video_capture_ob.get_frame_shape())
+        frame_shape = (1, *self._first_frame.shape)
         min_frame_size_mb = (np.prod(frame_shape) * self._get_dtype().itemsize) / 1e6
         return min_frame_size_mb, frame_shape
 
     def _get_data(self, selection: Tuple[slice]) -> np.ndarray:
         start_frame = selection[0].start
         end_frame = selection[0].stop
-        frames = np.empty(shape=[end_frame - start_frame, *self._maxshape[1:]])
-        for frame_number in range(end_frame - start_frame):
+        number_of_frames = end_frame - start_frame
+        if self._frames_buffer is None or self._frames_buffer.shape[0] < number_of_frames:
+            self._frames_buffer = np.empty(shape=(number_of_frames, *self._first_frame.shape), dtype=self._get_dtype())
+        frames = self._frames_buffer[:number_of_frames]
+
+        if self._decoded_frames is not None and start_frame == self._next_decoded_frame:
+            for frame_number in range(number_of_frames):
+                frames[frame_number] = next(self._decoded_frames)
+            self._next_decoded_frame = end_frame
+            return frames
+
+        number_of_decoded_frames = 0
+        if start_frame == 0:
+            frames[0] = self._first_frame
+            number_of_decoded_frames = 1
+        if start_frame + number_of_decoded_frames != self.video_capture_ob.current_frame:
+            self.video_capture_ob.current_frame = start_frame + number_of_decoded_frames
+        for frame_number in range(number_of_decoded_frames, number_of_frames):
             frames[frame_number] = next(self.video_capture_ob)
         return frames
 
     def _get_dtype(self):
-        return self.video_capture_ob.get_movie_frame_dtype()
+        return self._first_frame.dtype
+
+    def _get_maxshape(self):
+        return (self.video_capture_ob.get_movie_frame_count(), *self._first_frame.shape)
+
+
+class BufferedMovieDecoder:
+    """
+    Decode a movie in a background thread into a fixed ring of frame blocks, which the consumer drains in order.
+
+    The ring is allocated once and holds at most buffer_gb of frames, so the decoding runs ahead of the consumer by
+    at most that much memory. The frames yielded are views of the ring: each is overwritten once the frames of the
+    following block have been consumed, and must be copied to be kept longer.
+    """
+
+    def __init__(self, video_capture_ob: VideoCaptureContext, buffer_gb: float = 1.0, frames_per_block: int = 32):
+        """
+        Parameters
+        ----------
+        video_capture_ob : VideoCaptureContext
+            The capture of the movie, whose frame_count sets the number of frames decoded from the start.
+        buffer_gb : float, default: 1.0
+            The size in gigabytes (GB) of the ring of decoded frames, which must hold at least two frames.
+        frames_per_block : int, default: 32
+            The maximum number of frames handed from the decoding thread to the consumer at a time.
+        """
+        self.video_capture_ob = video_capture_ob
+        self.frame_count = video_capture_ob.get_movie_frame_count()
+        self.frame_shape = video_capture_ob.get_frame_shape()
+
+        frame_size = int(np.prod(self.frame_shape)) * np.dtype("uint8").itemsize
+        number_of_frames = int(buffer_gb * 1e9 // frame_size)
+        assert number_of_frames >= 2, f"buffer_gb ({buffer_gb}) must hold at least two frames of {frame_size} bytes!"
+        # The decoding thread fills one block while the consumer drains another
+        self.frames_per_block = max(1, min(frames_per_block, number_of_frames // 2, self.frame_count))
+        self.number_of_blocks = number_of_frames // self.frames_per_block
+
+    def _decode_blocks(self, ring: np.ndarray, free_blocks: queue.Queue, filled_blocks: queue.Queue):
+        try:
+            with self.video_capture_ob as video_capture_ob:
+                number_of_frames = self.frames_per_block
+                while number_of_frames == self.frames_per_block:
+                    block_index = free_blocks.get()
+                    if block_index is None:  # The consumer stopped early
+                        return
+                    number_of_frames = 0
+                    for frame in islice(video_capture_ob, self.frames_per_block):
+                        ring[block_index, number_of_frames] = frame
+                        number_of_frames += 1
+                    if number_of_frames > 0:
+                        filled_blocks.put((block_index, number_of_frames))
+            filled_blocks.put(None)
+        except Exception as exception:
+            filled_blocks.put(exception)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        ring = np.empty(shape=(self.number_of_blocks, self.frames_per_block, *self.frame_shape), dtype="uint8")
+        free_blocks = queue.Queue()
+        for block_index in range(self.number_of_blocks):
+            free_blocks.put(block_index)
+        filled_blocks = queue.Queue()
+        decoding_thread = threading.Thread(
+            target=self._decode_blocks,
+            args=(ring, free_blocks, filled_blocks),
+            name="BufferedMovieDecoder",
+            daemon=True,
+        )
+        decoding_thread.start()
+
+        consumed_block_index = None
+        try:
+            while True:
+                filled_block = filled_blocks.get()
+                if consumed_block_index is not None:
+                    free_blocks.put(consumed_block_index)
+                if filled_block is None:
+                    break
+                if isinstance(filled_block, Exception):
+                    raise filled_block
+                consumed_block_index, number_of_frames = filled_block
+                yield from ring[consumed_block_index, :number_of_frames]
+        finally:
+            free_blocks.put(None)
+            decoding_thread.join()
+
+
+def get_frames_data_chunk_iterator(
+    frames: Iterable[np.ndarray], maxshape: Tuple[int, ...], desc: str, mininterval: float = 10
+) -> DataChunkIterator:
+    """
+    Wrap the decoded frames of a movie for writing, with a progress bar.
+
+    The dtype of the frames is given to the DataChunkIterator, which otherwise reads the first frame on construction
+    to infer it: that would start the decoding of every movie (and fill its buffer of decoded frames) as soon as its
+    ImageSeries is built, instead of when its data is written.
+    """
+    return DataChunkIterator(
+        data=tqdm(iterable=frames, desc=desc, position=0, total=maxshape[0], mininterval=mininterval),
+        iter_axis=0,  # nwb standard is time as zero axis
+        maxshape=maxshape,
+        dtype=np.dtype("uint8"),
+    )
+
+
+def _decode_movie_to_queue(file_path: str, frame_count: int, frames_per_block: int, frames_queue):
+    """Decode the first frame_count frames of a movie into blocks put on the queue, followed by None."""
+    try:
+        with VideoCaptureContext(file_path) as video_capture_ob:
+            video_capture_ob.frame_count = frame_count
+            block = []
+            for frame in video_capture_ob:
+                block.append(frame)
+                if len(block) == frames_per_block:
+                    frames_queue.put(np.stack(block))
+                    block = []
+            if block:
+                frames_queue.put(np.stack(block))
+        frames_queue.put(None)
+    except Exception as exception:
+        frames_queue.put(exception)
+
+
+class _MovieDecodingProcess:
+    """A worker process decoding a single movie into a bounded queue of frame blocks."""
+
+    def __init__(self, file_path: FilePathType, frame_count: int, frames_per_block: int, max_queued_blocks: int):
+        self.file_path = str(file_path)
+        self.frames_queue = multiprocessing.Queue(maxsize=max_queued_blocks)
+        self.process = multiprocessing.Process(
+            target=_decode_movie_to_queue,
+            args=(self.file_path, frame_count, frames_per_block, self.frames_queue),
+            daemon=True,
+        )
+        self.started = False
+        self.finished = False
+
+    def start(self):
+        self.process.start()
+        self.started = True
+
+    def get_block(self) -> Optional[np.ndarray]:
+        while True:
+            try:
+                block = self.frames_queue.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not self.process.is_alive() and self.frames_queue.empty():
+                    raise RuntimeError(
+                        f"The process decoding '{Path(self.file_path).name}' exited unexpectedly "
+                        f"(exitcode {self.process.exitcode})!"
+                    )
+        if isinstance(block, Exception):
+            raise block
+        return block
+
+    def join(self):
+        self.finished = True
+        self.process.join()
+
+
+class ParallelMovieDecoder:
+    """
+    Decode several movie files at once, each in its own worker process.
+
+    Every movie added to the decoder is returned as an iterator over its frames. At most max_workers movies are
+    decoded ahead of the consumption of their frames, each holding at most max_queued_blocks blocks of decoded
+    frames; the other movies start decoding when a worker finishes, or as soon as their frames are requested.
+    """
+
+    def __init__(self, max_workers: int, frames_per_block: int = 32, max_queued_blocks: int = 4):
+        """
+        Parameters
+        ----------
+        max_workers : int
+            The maximum number of movies decoded ahead of the consumption of their frames.
+        frames_per_block : int, default: 32
+            The number of frames sent from a worker process at a time.
+        max_queued_blocks : int, default: 4
+            The maximum number of decoded blocks of a movie waiting to be consumed.
+        """
+        assert max_workers > 0, f"max_workers ({max_workers}) must be greater than zero!"
+        self.max_workers = max_workers
+        self.frames_per_block = frames_per_block
+        self.max_queued_blocks = max_queued_blocks
+        self._decoding_processes = []
+
+    def add_movie(self, file_path: FilePathType, frame_count: int) -> Iterator[np.ndarray]:
+        """Schedule the decoding of the first frame_count frames of a movie and return an iterator over them."""
+        decoding_process = _MovieDecodingProcess(
+            file_path=file_path,
+            frame_count=frame_count,
+            frames_per_block=self.frames_per_block,
+            max_queued_blocks=self.max_queued_blocks,
+        )
+        self._decoding_processes.append(decoding_process)
+        self._start_pending_processes()
+        return self._iterate_frames(decoding_process=decoding_process)
+
+    def _start_pending_processes(self):
+        number_of_running_processes = sum(
+            decoding_process.started and not decoding_process.finished for decoding_process in self._decoding_processes
+        )
+        for decoding_process in self._decoding_processes:
+            if number_of_running_processes >= self.max_workers:
+                break
+            if not decoding_process.started:
+                decoding_process.start()
+                number_of_running_processes += 1
+
+    def _iterate_frames(self, decoding_process: _MovieDecodingProcess) -> Iterator[np.ndarray]:
+        # Requested frames are always decoded, even beyond max_workers, so that consumers never wait on each other
+        if not decoding_process.started:
+            decoding_process.start()
+        block = decoding_process.get_block()
+        while block is not None:
+            yield from block
+            block = decoding_process.get_block()
+        decoding_process.join()
+        self._start_pending_processes()
+
+
+def _get_movie_segments(
+    keyframe_indices: np.ndarray, frame_count: int, frames_per_segment: int
+) -> List[Tuple[int, int]]:
+    """
+    Split the first frame_count frames of a movie at its keyframes into (start_frame, end_frame) segments.
+
+    Each segment holds as many whole GOPs as fit in frames_per_segment frames, or a single GOP if it is longer.
+    """
+    boundaries = keyframe_indices[(keyframe_indices > 0) & (keyframe_indices < frame_count)]
+    boundaries = np.append(boundaries, frame_count)
+    segments = []
+    start_frame = 0
+    while start_frame < frame_count:
+        index = np.searchsorted(boundaries, start_frame + frames_per_segment, side="right") - 1
+        if index < 0 or boundaries[index] <= start_frame:
+            index = np.searchsorted(boundaries, start_frame, side="right")
+        end_frame = int(boundaries[index])
+        segments.append((start_frame, end_frame))
+        start_frame = end_frame
+    return segments
+
+
+def _decode_movie_segment(file_path: str, start_frame: int, end_frame: int) -> np.ndarray:
+    """Decode the frames of a movie from a keyframe at start_frame up to end_frame."""
+    with VideoCaptureContext(file_path) as video_capture_ob:
+        video_capture_ob.frame_count = end_frame
+        if start_frame != 0:
+            video_capture_ob.current_frame = start_frame
+        frames = None
+        number_of_frames = 0
+        for frame in video_capture_ob:
+            if frames is None:
+                frames = np.empty(shape=(end_frame - start_frame, *frame.shape), dtype=frame.dtype)
+            frames[number_of_frames] = frame
+            number_of_frames += 1
+    assert number_of_frames == end_frame - start_frame, (
+        f"Could only decode {number_of_frames} of the frames {start_frame} to {end_frame} "
+        f"of '{Path(file_path).name}'!"
+    )
+    return frames
+
+
+class SegmentedMovieDecoder:
+    """
+    Decode a single movie in parallel worker processes by splitting it at its keyframes.
+
+    The keyframes are read from the container index without decoding (see get_movie_keyframe_indices), and the
+    movie is split into segments of whole GOPs that are decoded independently in a process pool. Iterating over the
+    decoder yields the frames in order. At most max_workers + 1 segments are held in memory at once: the one being
+    iterated and those being decoded ahead of it; their size is chosen so that they fit in max_in_flight_gb, unless
+    a single GOP is larger.
+
+    If the keyframes cannot be read from the container (for instance when PyAV is not installed), the frames are
+    decoded sequentially in the current process instead.
+    """
+
+    def __init__(
+        self,
+        file_path: FilePathType,
+        frame_count: int,
+        frame_shape: Tuple[int, ...],
+        max_workers: int,
+        max_in_flight_gb: float = 1.0,
+    ):
+        """
+        Parameters
+        ----------
+        file_path : FilePathType
+            The path to the movie file.
+        frame_count : int
+            The number of frames to decode from the start of the movie.
+        frame_shape : tuple of int
+            The shape of a decoded frame, used to size the segments.
+        max_workers : int
+            The number of worker processes decoding segments concurrently.
+        max_in_flight_gb : float, default: 1.0
+            The upper bound on the size in gigabytes (GB) of the decoded segments held at once.
+        """
+        assert max_workers > 0, f"max_workers ({max_workers}) must be greater than zero!"
+        assert max_in_flight_gb > 0, f"max_in_flight_gb ({max_in_flight_gb}) must be greater than zero!"
+        self.file_path = str(file_path)
+        self.frame_count = frame_count
+        self.max_workers = max_workers
+
+        frame_size = int(np.prod(frame_shape)) * np.dtype("uint8").itemsize
+        self.frames_per_segment = max(1, int(max_in_flight_gb * 1e9 / (frame_size * (max_workers + 1))))
+        keyframe_indices = get_movie_keyframe_indices(file_path=file_path)
+        self.segments = None
+        if keyframe_indices is not None:
+            self.segments = _get_movie_segments(
+                keyframe_indices=keyframe_indices,
+                frame_count=frame_count,
+                frames_per_segment=self.frames_per_segment,
+            )
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        if self.segments is None:
+            with VideoCaptureContext(self.file_path) as video_capture_ob:
+                video_capture_ob.frame_count = self.frame_count
+                yield from video_capture_ob
+            return
+
+        segments = iter(self.segments)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = deque(
+                executor.submit(_decode_movie_segment, self.file_path, start_frame, end_frame)
+                for start_frame, end_frame in islice(segments, self.max_workers)
+            )
+            while futures:
+                frames = futures.popleft().result()
+                next_segment = next(segments, None)
+                if next_segment is not None:
+                    futures.append(executor.submit(_decode_movie_segment, self.file_path, *next_segment))
+                yield from frames
+
+
+class EncodedMoviesDataChunkIterator(GenericDataChunkIterator):
+    """
+    Iterate over the encoded bytes of movie files, concatenated in order, without decoding them.
+
+    Each file is memory mapped and only its leading number_of_bytes are copied, so a stub can keep a prefix of a file.
+    """
+
+    def __init__(self, file_paths: List[FilePathType], number_of_bytes: List[int], buffer_gb: float = 0.064):
+        self._encoded_movies = [
+            np.memmap(filename=file_path, dtype="uint8", mode="r")[:file_number_of_bytes]
+            for file_path, file_number_of_bytes in zip(file_paths, number_of_bytes)
+        ]
+        self._ends = np.cumsum([len(encoded_movie) for encoded_movie in self._encoded_movies])
+        super().__init__(buffer_gb=buffer_gb, chunk_mb=1.0)
+
+    def _get_data(self, selection: Tuple[slice]) -> np.ndarray:
+        start, stop = selection[0].start, selection[0].stop
+        data = np.empty(shape=stop - start, dtype="uint8")
+        for encoded_movie, end in zip(self._encoded_movies, self._ends):
+            movie_start = end - len(encoded_movie)
+            if movie_start < stop and start < end:
+                copy_start = max(start, movie_start)
+                copy_stop = min(stop, end)
+                data[copy_start - start : copy_stop - start] = encoded_movie[
+                    copy_start - movie_start : copy_stop - movie_start
+                ]
+        return data
+
+    def _get_dtype(self):
+        return np.dtype("uint8")
 
     def _get_maxshape(self):
-        return (self.video_capture_ob.get_movie_frame_count(), *self.video_capture_ob.get_frame_shape())
+        return (int(self._ends[-1]),)
+
+    def __len__(self):
+        # The ragged index of a DynamicTable checks the length of its target column on construction
+        return int(self._ends[-1])
+
+
+def get_encoded_movies_table(
+    image_series_names: List[str],
+    file_paths: List[FilePathType],
+    number_of_bytes: Optional[List[int]] = None,
+    name: str = "EncodedMovies",
+) -> DynamicTable:
+    """
+    Build the table of the encoded bytes of movie files, one row per ImageSeries, to copy them into an NWBFile.
+
+    NWB has no neurodata type for an encoded video stream, so the bytes are stored in a ragged column of a
+    DynamicTable, next to the name of the ImageSeries that holds the timing of the movie and its format.
+
+    Parameters
+    ----------
+    image_series_names : list of str
+        The names of the ImageSeries of the movies, in the same container as the table.
+    file_paths : list of FilePathType
+        The movie files, one per ImageSeries.
+    number_of_bytes : list of int, optional
+        The number of leading bytes of each file to copy. The default is the whole file.
+    name : str, default: 'EncodedMovies'
+        The name of the table.
+    """
+    if number_of_bytes is None:
+        number_of_bytes = [Path(file_path).stat().st_size for file_path in file_paths]
+    encoded_data = VectorData(
+        name="encoded_data",
+        description="The encoded bytes of the movie file, as they are stored on disk.",
+        data=EncodedMoviesDataChunkIterator(file_paths=file_paths, number_of_bytes=number_of_bytes),
+    )
+    columns = [
+        VectorData(
+            name="image_series_name",
+            description="The name of the ImageSeries holding the timing of the movie.",
+            data=list(image_series_names),
+        ),
+        VectorData(
+            name="format",
+            description="The container format of the movie file, given by its extension.",
+            data=[Path(file_path).suffix.lstrip(".").lower() for file_path in file_paths],
+        ),
+        # The index goes first, since the length check of DynamicTable drops the columns of iterated data
+        VectorIndex(name="encoded_data_index", data=list(np.cumsum(number_of_bytes)), target=encoded_data),
+        encoded_data,
+    ]
+    return DynamicTable(name=name, description="The encoded bytes of movie files.", columns=columns)
+
+
+def _get_encoded_movie_row(encoded_movies, image_series_name: str) -> int:
+    image_series_names = [
+        row_name.decode() if isinstance(row_name, bytes) else row_name
+        for row_name in encoded_movies["image_series_name"].data[:]
+    ]
+    assert image_series_name in image_series_names, f"No encoded movie for the ImageSeries '{image_series_name}'!"
+    return image_series_names.index(image_series_name)
+
+
+def write_encoded_movie(
+    encoded_movies, image_series_name: str, file_path: FilePathType, bytes_per_block: int = 2**26
+):
+    """
+    Write the encoded bytes of a movie copied into an NWBFile back to a movie file, identical to the original one.
+
+    Parameters
+    ----------
+    encoded_movies : DynamicTable
+        The 'EncodedMovies' table written by the MovieInterface with passthrough=True.
+    image_series_name : str
+        The name of the ImageSeries of the movie.
+    file_path : FilePathType
+        The path of the movie file to write. Its extension should match the format of the movie.
+    bytes_per_block : int, default: 64 MiB
+        The number of bytes read from the table at a time.
+    """
+    row = _get_encoded_movie_row(encoded_movies=encoded_movies, image_series_name=image_series_name)
+    encoded_data_index = encoded_movies["encoded_data"]
+    start = int(encoded_data_index.data[row - 1]) if row > 0 else 0
+    stop = int(encoded_data_index.data[row])
+    with open(file_path, "wb") as file:
+        for block_start in range(start, stop, bytes_per_block):
+            block_stop = min(block_start + bytes_per_block, stop)
+            file.write(np.asarray(encoded_data_index.target.data[block_start:block_stop]).tobytes())
+
+
+def get_encoded_movie_frames(encoded_movies, image_series_name: str) -> Iterator[np.ndarray]:
+    """
+    Decode the frames of a movie whose encoded bytes were copied into an NWBFile.
+
+    The bytes are written to a temporary movie file, which is decoded with OpenCV as RGB frames identical to those
+    that the MovieInterface writes when decoding the movie itself.
+
+    Parameters
+    ----------
+    encoded_movies : DynamicTable
+        The 'EncodedMovies' table written by the MovieInterface with passthrough=True.
+    image_series_name : str
+        The name of the ImageSeries of the movie.
+    """
+    row = _get_encoded_movie_row(encoded_movies=encoded_movies, image_series_name=image_series_name)
+    movie_format = encoded_movies["format"].data[row]
+    movie_format = movie_format.decode() if isinstance(movie_format, bytes) else movie_format
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        # The name of the ImageSeries may contain characters that are not allowed in file names
+        file_path = Path(temporary_folder) / f"movie.{movie_format}"
+        write_encoded_movie(encoded_movies=encoded_movies, image_series_name=image_series_name, file_path=file_path)
+        with VideoCaptureContext(str(file_path)) as video_capture_ob:
+            yield from video_capture_ob
@@ -3,18 +3,23 @@ from pathlib import Path
 from typing import Optional
 from warnings import warn
 
-import psutil
 import numpy as np
 from hdmf.backends.hdf5.h5_utils import H5DataIO
-from hdmf.data_utils import DataChunkIterator
 from pynwb import NWBFile
 from pynwb.image import ImageSeries
-from tqdm import tqdm
 
-from .movie_utils import VideoCaptureContext
+from .movie_utils import (
+    VideoCaptureContext,
+    BufferedMovieDecoder,
+    ParallelMovieDecoder,
+    SegmentedMovieDecoder,
+    get_encoded_movies_table,
+    get_frames_data_chunk_iterator,
+    probe_movies,
+)
 from ....basedatainterface import BaseDataInterface
-from ....tools.nwb_helpers import get_module
-from ....utils import get_schema_from_hdmf_class, get_base_schema, calculate_regular_series_rate
+from ....tools.nwb_helpers import get_module, make_or_load_nwbfile
+from ....utils import get_schema_from_hdmf_class, get_base_schema, calculate_regular_series_rate, OptionalFilePathType
 
 
 def _check_duplicates(movies_metadata, file_paths):
@@ -97,10 +102,49 @@ class MovieInterface(BaseDataInterface):
         )
         return metadata
 
+    def requires_interleaved_write(
+        self,
+        external_mode: bool = True,
+        chunk_data: bool = True,
+        max_workers: int = 1,
+        passthrough: bool = False,
+        **conversion_options,
+    ) -> bool:
+        """Whether the movie files are decoded in parallel, one per worker, which requires an interleaved write."""
+        return (
+            not external_mode
+            and not passthrough
+            and chunk_data
+            and max_workers > 1
+            and len(self.source_data["file_paths"]) > 1
+        )
+
+    def get_stub_fraction(self, external_mode: bool = True, **conversion_options) -> float:
+        """
+        The fraction of the movie data that run_conversion reads with stub_test=True.
+
+        In external_mode, the stub reads the same container headers and timestamps as the full conversion. Otherwise,
+        it decodes (or, with passthrough=True, copies the leading bytes of) the first 10 frames of each movie file,
+        so the fraction of each file is weighted by its size.
+        """
+        if external_mode:
+            return 1.0
+        file_sizes = []
+        stub_fractions = []
+        for file_path in self.source_data["file_paths"]:
+            with VideoCaptureContext(str(file_path)) as video_capture_ob:
+                frame_count = video_capture_ob.get_movie_frame_count()
+            file_sizes.append(Path(file_path).stat().st_size)
+            stub_fractions.append(min(10, frame_count) / frame_count if frame_count else 1.0)
+        return float(np.average(stub_fractions, weights=file_sizes)) if sum(file_sizes) else 1.0
+
     def run_conversion(
         self,
-        nwbfile: NWBFile,
-        metadata: dict,
+        nwbfile_path: OptionalFilePathType = None,
+        nwbfile: Optional[NWBFile] = None,
+        metadata: Optional[dict] = None,
+        overwrite: bool = False,
+        verbose: bool = True,
         stub_test: bool = False,
         external_mode: bool = True,
         starting_times: Optional[list] = None,
@@ -110,6 +154,9 @@ class MovieInterface(BaseDataInterface):
         module_description: Optional[str] = None,
         compression: Optional[str] = "gzip",
         compression_options: Optional[int] = None,
+        max_workers: int = 1,
+        passthrough: bool = False,
+        buffer_gb: float = 1.0,
     ):
         """
         Convert the movie data files to :py:class:`~pynwb.image.ImageSeries` and write them in the
@@ -118,7 +165,11 @@ class MovieInterface(BaseDataInterface):
 
         Parameters
         ----------
-        nwbfile : NWBFile
+        nwbfile_path : FilePathType, optional
+            Path for where to write or load (if overwrite=False) the NWBFile.
+            If specified, the context will always write to this location.
+        nwbfile : NWBFile, optional
+            An in-memory NWBFile object to write to the location.
         metadata : dict
             Dictionary of metadata information such as names and description of each video.
             Metadata should be passed for each video file passed in the file_paths argument during ``__init__``.
@@ -140,6 +191,12 @@ class MovieInterface(BaseDataInterface):
             The list for the 'Movies' key should correspond one to the movie files in the file_paths list.
             If multiple movies need to be in the same :py:class:`~pynwb.image.ImageSeries`, then supply the same value for "name" key.
             Storing multiple movies in the same :py:class:`~pynwb.image.ImageSeries` is only supported if 'external_mode'=True.
+        overwrite : bool, optional
+            Whether or not to overwrite the NWBFile if one exists at the nwbfile_path.
+            The default is False (append mode).
+        verbose : bool, optional
+            If 'nwbfile_path' is specified, informs user after a successful write operation.
+            The default is True.
         stub_test : bool
             If ``True``, truncates the write operation for fast testing. The default is ``False``.
         external_mode : bool
@@ -155,11 +212,12 @@ class MovieInterface(BaseDataInterface):
         timestamps : list, optional
             List of timestamps for the movies. If unspecified, timestamps are extracted from each movie data.
         chunk_data : bool
-            If True, uses a DataChunkIterator to read and write the movie, reducing overhead RAM usage at the cost of
-            reduced conversion speed (compared to loading video entirely into RAM as an array). This will also force to
-            True, even if manually set to False, whenever the video file size exceeds available system RAM by a factor
-            of 70 (from compression experiments). Based on experiments for a ~30 FPS system of ~400 x ~600 color
-            frames, the equivalent uncompressed RAM usage is around 2GB per minute of video. The default is True.
+            If True, uses a DataChunkIterator to read and write the movie frame by frame as it is decoded.
+            If False, a background thread decodes the movie ahead of the writer into a fixed ring of frame blocks
+            of at most buffer_gb (see :py:class:`~neuroconv.datainterfaces.behavior.movie.movie_utils.BufferedMovieDecoder`),
+            so that decoding overlaps with compression while the memory usage stays capped. Based on experiments for
+            a ~30 FPS system of ~400 x ~600 color frames, the uncompressed frames take around 2GB per minute of video.
+            The default is True.
         module_name: str, optional
             Name of the processing module to add the ImageSeries object to. Default behavior is to add as acquisition.
         module_description: str, optional
@@ -172,6 +230,34 @@ class MovieInterface(BaseDataInterface):
         compression_options: int, optional
             Parameter(s) for compression filter. Currently only supports the compression level (integer from 0 to 9) of
             compression="gzip".
+        max_workers: int, default: 1
+            The number of worker processes decoding the movie data when writing it internally (external_mode=False)
+            with chunk_data=True. Several movie files are decoded in parallel, one per worker, and handed to the writer
+            through bounded queues, so each worker only decodes a few blocks of frames ahead of the writer.
+            The NWBFile is then written with ``exhaust_dci=False``, which interleaves the frames of the movies so that
+            all of them are decoded concurrently. This is done when writing to 'nwbfile_path', including through
+            :py:meth:`~neuroconv.nwbconverter.NWBConverter.run_conversion`; an in-memory 'nwbfile' written by
+            the caller should likewise be written with ``io.write(nwbfile, exhaust_dci=False)``.
+            A single movie file is instead split at its keyframes into segments decoded in parallel
+            (see :py:class:`~neuroconv.datainterfaces.behavior.movie.movie_utils.SegmentedMovieDecoder`).
+        passthrough: bool, default: False
+            If True with external_mode=False, the encoded bytes of each movie file are copied as they are into the
+            'EncodedMovies' table (see
+            :py:func:`~neuroconv.datainterfaces.behavior.movie.movie_utils.get_encoded_movies_table`), next to the
+            :py:class:`~pynwb.image.ImageSeries` and instead of decoding the frames to raw RGB pixels.
+            The ImageSeries keeps the timestamps read from the container and refers to the original movie file
+            as an external file, so its time axis stays valid. No frame is decoded except the first one, so the write
+            is a plain byte copy and the table is about the size of the movie files.
+            The original movie file can be restored with
+            :py:func:`~neuroconv.datainterfaces.behavior.movie.movie_utils.write_encoded_movie`
+            and its frames decoded with
+            :py:func:`~neuroconv.datainterfaces.behavior.movie.movie_utils.get_encoded_movie_frames`.
+            With stub_test=True, only the first 10 timestamps are written along with the same fraction of the
+            leading bytes of the file, which may not be decodable on their own.
+            The chunk_data, compression, compression_options and max_workers options do not apply.
+        buffer_gb: float, default: 1.0
+            The upper bound on the size in gigabytes (GB) of the frames decoded ahead of the writer with chunk_data=False.
+            Each movie is only decoded while its data is written, so the bound holds for the whole conversion.
         """
         file_paths = self.source_data["file_paths"]
 
@@ -180,6 +266,8 @@ class MovieInterface(BaseDataInterface):
                 [isinstance(x, float) for x in starting_times]
             ), "Argument 'starting_times' must be a list of floats."
 
+        if metadata is None:
+            metadata = self.get_metadata()
         movies_metadata = metadata.get("Behavior", dict()).get("Movies", None)
         if movies_metadata is None:
             movies_metadata = self.get_metadata()["Behavior"]["Movies"]
@@ -213,103 +301,145 @@ class MovieInterface(BaseDataInterface):
             else:
                 raise ValueError("provide starting times as a list of len " f"{len(movies_metadata_unique)}")
 
-        for j, (image_series_kwargs, file_list) in enumerate(zip(movies_metadata_unique, file_paths_list)):
+        requires_interleaved_write = self.requires_interleaved_write(
+            external_mode=external_mode, chunk_data=chunk_data, max_workers=max_workers, passthrough=passthrough
+        )
+        parallel_movie_decoder = None
+        if requires_interleaved_write:
+            parallel_movie_decoder = ParallelMovieDecoder(max_workers=max_workers)
+
+        with make_or_load_nwbfile(
+            nwbfile_path=nwbfile_path,
+            nwbfile=nwbfile,
+            metadata=metadata,
+            overwrite=overwrite,
+            verbose=verbose,
+            exhaust_dci=not requires_interleaved_write,
+        ) as nwbfile_out:
+
+            encoded_movies = []
+            for j, (image_series_kwargs, file_list) in enumerate(zip(movies_metadata_unique, file_paths_list)):
 
-            if external_mode:
-                with VideoCaptureContext(str(file_list[0])) as vc:
-                    fps = vc.get_movie_fps()
+                series_timestamps = timestamps
+                if external_mode:
+                    # All the files of the ImageSeries are validated at once and taken as contiguous
+                    movie_probes = probe_movies(file_paths=file_list, include_timestamps=timestamps is None)
+                    fps = movie_probes[0]["fps"]
                     if timestamps is None:
-                        timestamps = starting_times[j] + vc.get_movie_timestamps()
-                image_series_kwargs.update(
-                    format="external",
-                    external_file=file_list,
-                )
-            else:
-                file = file_list[0]
-                uncompressed_estimate = Path(file).stat().st_size * 70
-                available_memory = psutil.virtual_memory().available
-                if not chunk_data and not stub_test and uncompressed_estimate >= available_memory:
-                    warn(
-                        f"Not enough memory (estimated {round(uncompressed_estimate/1e9, 2)} GB) to load movie file as "
-                        f"array ({round(available_memory/1e9, 2)} GB available)! Forcing chunk_data to True."
+                        starting_offsets = starting_times[j] + np.cumsum(
+                            [0.0] + [movie_probe["duration"] for movie_probe in movie_probes[:-1]]
+                        )
+                        series_timestamps = np.concatenate(
+                            [
+                                starting_offset + movie_probe["timestamps"]
+                                for starting_offset, movie_probe in zip(starting_offsets, movie_probes)
+                            ]
+                        )
+                    image_series_kwargs.update(
+                        format="external",
+                        external_file=file_list,
+                        starting_frame=[movie_probe["starting_frame"] for movie_probe in movie_probes],
                     )
-                    chunk_data = True
-                with VideoCaptureContext(str(file)) as video_capture_ob:
+                elif passthrough:
+                    file = file_list[0]
+                    with VideoCaptureContext(str(file)) as video_capture_ob:
+                        fps = video_capture_ob.get_movie_fps()
+                        series_timestamps = starting_times[j] + video_capture_ob.get_movie_timestamps()
+                        frame_shape = video_capture_ob.get_frame_shape()
+                    number_of_bytes = Path(file).stat().st_size
+                    if stub_test:
+                        # Keep the leading bytes in proportion to the stubbed frames
+                        number_of_bytes = int(
+                            np.ceil(number_of_bytes * min(10, len(series_timestamps)) / len(series_timestamps))
+                        )
+                        series_timestamps = series_timestamps[:10]
+                    encoded_movies.append((image_series_kwargs["name"], file, number_of_bytes))
+                    image_series_kwargs.update(
+                        format="external",
+                        external_file=[str(file)],
+                        starting_frame=[0],
+                        dimension=[frame_shape[1], frame_shape[0]],
+                    )
+                else:
+                    file = file_list[0]
+                    # The same capture is probed once and then iterated for the data
+                    video_capture_ob = VideoCaptureContext(str(file))
                     if stub_test:
                         video_capture_ob.frame_count = 10
                     total_frames = video_capture_ob.get_movie_frame_count()
                     frame_shape = video_capture_ob.get_frame_shape()
-                    timestamps = starting_times[j] + video_capture_ob.get_movie_timestamps()
+                    series_timestamps = starting_times[j] + video_capture_ob.get_movie_timestamps()
                     fps = video_capture_ob.get_movie_fps()
-                maxshape = (total_frames, *frame_shape)
-                best_gzip_chunk = (1, frame_shape[0], frame_shape[1], 3)
-                tqdm_pos, tqdm_mininterval = (0, 10)
-                if chunk_data:
-                    video_capture_ob = VideoCaptureContext(str(file))
-                    if stub_test:
-                        video_capture_ob.frame_count = 10
-                    iterable = DataChunkIterator(
-                        data=tqdm(
-                            iterable=video_capture_ob,
-                            desc=f"Copying movie data for {Path(file).name}",
-                            position=tqdm_pos,
-                            total=total_frames,
-                            mininterval=tqdm_mininterval,
-                        ),
-                        iter_axis=0,  # nwb standard is time as zero axis
-                        maxshape=maxshape,
-                    )
-                    data = H5DataIO(
-                        iterable,
-                        compression=compression,
-                        compression_opts=compression_options,
-                        chunks=best_gzip_chunk,
-                    )
-                else:
-                    iterable = np.zeros(shape=maxshape, dtype="uint8")
-                    with VideoCaptureContext(str(file)) as video_capture_ob:
-                        if stub_test:
-                            video_capture_ob.frame_count = 10
-                        with tqdm(
-                            desc=f"Reading movie data for {Path(file).name}",
-                            position=tqdm_pos,
-                            total=total_frames,
-                            mininterval=tqdm_mininterval,
-                        ) as pbar:
-                            for n, frame in enumerate(video_capture_ob):
-                                iterable[n, :, :, :] = frame
-                                pbar.update(1)
-                    data = H5DataIO(
-                        DataChunkIterator(
-                            tqdm(
-                                iterable=iterable,
+                    maxshape = (total_frames, *frame_shape)
+                    best_gzip_chunk = (1, frame_shape[0], frame_shape[1], 3)
+                    if chunk_data:
+                        if parallel_movie_decoder is not None:
+                            video_capture_ob.release()
+                            frames = parallel_movie_decoder.add_movie(file_path=file, frame_count=total_frames)
+                        elif max_workers > 1:
+                            video_capture_ob.release()
+                            frames = iter(
+                                SegmentedMovieDecoder(
+                                    file_path=file,
+                                    frame_count=total_frames,
+                                    frame_shape=frame_shape,
+                                    max_workers=max_workers,
+                                )
+                            )
+                        else:
+                            frames = video_capture_ob
+                        data = H5DataIO(
+                            get_frames_data_chunk_iterator(
+                                frames=frames, maxshape=maxshape, desc=f"Copying movie data for {Path(file).name}"
+                            ),
+                            compression=compression,
+                            compression_opts=compression_options,
+                            chunks=best_gzip_chunk,
+                        )
+                    else:
+                        buffered_movie_decoder = BufferedMovieDecoder(
+                            video_capture_ob=video_capture_ob, buffer_gb=buffer_gb
+                        )
+                        data = H5DataIO(
+                            get_frames_data_chunk_iterator(
+                                frames=buffered_movie_decoder,
+                                maxshape=maxshape,
                                 desc=f"Writing movie data for {Path(file).name}",
-                                position=tqdm_pos,
-                                mininterval=tqdm_mininterval,
                             ),
-                            iter_axis=0,  # nwb standard is time as zero axis
-                            maxshape=maxshape,
-                        ),
-                        compression="gzip",
-                        compression_opts=compression_options,
-                        chunks=best_gzip_chunk,
-                    )
-                image_series_kwargs.update(data=data)
-            rate = calculate_regular_series_rate(series=timestamps)
-            if rate is not None:
-                if fps != rate:
-                    warn(
-                        f"The fps={fps} from movie data is unequal to the difference in "
-                        f"regular timestamps. Using fps={rate} from timestamps instead.",
-                        UserWarning,
+                            compression="gzip",
+                            compression_opts=compression_options,
+                            chunks=best_gzip_chunk,
+                        )
+                    image_series_kwargs.update(data=data)
+                rate = calculate_regular_series_rate(series=series_timestamps)
+                if rate is not None:
+                    if fps != rate:
+                        warn(
+                            f"The fps={fps} from movie data is unequal to the difference in "
+                            f"regular timestamps. Using fps={rate} from timestamps instead.",
+                            UserWarning,
+                        )
+                    image_series_kwargs.update(starting_time=starting_times[j], rate=rate)
+                else:
+                    image_series_kwargs.update(timestamps=series_timestamps)
+
+                if module_name is None:
+                    nwbfile_out.add_acquisition(ImageSeries(**image_series_kwargs))
+                else:
+                    get_module(nwbfile=nwbfile_out, name=module_name, description=module_description).add(
+                        ImageSeries(**image_series_kwargs)
                     )
-                image_series_kwargs.update(starting_time=starting_times[j], rate=rate)
-            else:
-                image_series_kwargs.update(timestamps=timestamps)
 
-            if module_name is None:
-                nwbfile.add_acquisition(ImageSeries(**image_series_kwargs))
-            else:
-                get_module(nwbfile=nwbfile, name=module_name, description=module_description).add(
-                    ImageSeries(**image_series_kwargs)
+            if encoded_movies:
+                image_series_names, encoded_file_paths, number_of_bytes = zip(*encoded_movies)
+                encoded_movies_table = get_encoded_movies_table(
+                    image_series_names=image_series_names,
+                    file_paths=encoded_file_paths,
+                    number_of_bytes=number_of_bytes,
                 )
+                if module_name is None:
+                    nwbfile_out.add_acquisition(encoded_movies_table)
+                else:
+                    get_module(nwbfile=nwbfile_out, name=module_name, description=module_description).add(
+                        encoded_movies_table
+                    )
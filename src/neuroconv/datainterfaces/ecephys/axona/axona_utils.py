@@ -1,11 +1,12 @@
 import os
 import dateutil
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
-
+from natsort import natsorted
 from pynwb.behavior import Position, SpatialSeries
+from spikeinterface.core import BaseRecording, BaseRecordingSegment
 
 from ....utils import FilePathType
 
@@ -22,14 +23,19 @@ def get_eeg_sampling_frequency(file_path: FilePathType):
     Fs : float
         Sampling frequency
     """
-    Fs_entry = parse_generic_header(file_path, ["sample_rate"])
+    return _get_header_sampling_frequency(header_bstring=get_header_bstring(file_path))
+
+
+def _get_header_sampling_frequency(header_bstring: bytes):
+    """Read sampling frequency from the header byte string of a .eegX or .egfX file."""
+    Fs_entry = parse_header_bstring(header_bstring, ["sample_rate"])
     Fs = float(Fs_entry.get("sample_rate").split(" ")[0])
 
     return Fs
 
 
 # Helper functions for AxonaLFPDataInterface
-def read_eeg_file_lfp_data(file_path: FilePathType):
+def read_eeg_file_lfp_data(file_path: FilePathType, header_size: Optional[int] = None):
     """
     Read LFP data from Axona `.eegX` or `.egfX` file.
 
@@ -37,6 +43,8 @@ def read_eeg_file_lfp_data(file_path: FilePathType):
     -------
     file_path (Path or Str):
         Full file_path of Axona `.eegX` or `.egfX` file.
+    header_size (int, optional):
+        Size in bytes of the header of the file, if already known.
 
     Returns:
     -------
@@ -45,7 +53,8 @@ def read_eeg_file_lfp_data(file_path: FilePathType):
 
     lfp_dtype = ">i1"
     footer_size = len("\r\ndata_end\r\n")
-    header_size = len(get_header_bstring(file_path))
+    if header_size is None:
+        header_size = len(get_header_bstring(file_path))
     num_bytes = os.path.getsize(file_path) - header_size - footer_size
 
     # .eeg files are int8, .egf files are int16
@@ -56,7 +65,7 @@ def read_eeg_file_lfp_data(file_path: FilePathType):
         filename=file_path,
         dtype=lfp_dtype,
         mode="r",
-        offset=len(get_header_bstring(file_path)),
+        offset=header_size,
         shape=(1, num_bytes),
     )
 
@@ -67,7 +76,8 @@ def get_all_file_paths(file_path: FilePathType):
     """
     Read LFP file_paths of `.eeg` or `.egf` files in file_path's directory.
     E.g. if file_path='/my/directory/my_file.eeg', all .eeg channels will be
-    appended to the output.
+    appended to the output, in natural order of their names. Subdirectories
+    are not searched.
 
     Parameters:
     -----------
@@ -83,7 +93,7 @@ def get_all_file_paths(file_path: FilePathType):
     suffix = Path(file_path).suffix[0:4]
     current_path = Path(file_path).parent
 
-    path_list = [cur_path.name for cur_path in current_path.rglob("*" + suffix + "*")]
+    path_list = natsorted(cur_path.name for cur_path in current_path.glob("*" + suffix + "*") if cur_path.is_file())
 
     return path_list
 
@@ -108,10 +118,9 @@ def read_all_eeg_file_lfp_data(file_path: FilePathType):
     eeg_memmaps = list()
     sampling_rates = set()
     for fname in file_path_list:
-
-        sampling_rates.add(get_eeg_sampling_frequency(parent_path / fname))
-
-        eeg_memmaps.append(read_eeg_file_lfp_data(parent_path / fname))
+        header_bstring = get_header_bstring(parent_path / fname)
+        sampling_rates.add(_get_header_sampling_frequency(header_bstring=header_bstring))
+        eeg_memmaps.append(read_eeg_file_lfp_data(parent_path / fname, header_size=len(header_bstring)))
     assert len(sampling_rates) < 2, "File headers specify different sampling rates. Cannot combine EEG data."
 
     eeg_data = np.concatenate(eeg_memmaps, axis=0)
@@ -119,6 +128,66 @@ def read_all_eeg_file_lfp_data(file_path: FilePathType):
     return eeg_data
 
 
+class AxonaLFPRecordingExtractor(BaseRecording):
+    """
+    Lazy recording of the LFP of an Axona session, stored as one `.eegX` or
+    `.egfX` file per channel in the directory of file_path.
+
+    The files are memory mapped separately, and get_traces only reads the
+    requested samples of the requested channels. The header of each file is
+    parsed once.
+    """
+
+    extractor_name = "AxonaLFPRecording"
+    mode = "file"
+    name = "axona_lfp"
+
+    def __init__(self, file_path: FilePathType):
+        parent_path = Path(file_path).parent
+        eeg_memmaps = list()
+        sampling_rates = set()
+        for fname in get_all_file_paths(file_path):
+            header_bstring = get_header_bstring(parent_path / fname)
+            sampling_rates.add(_get_header_sampling_frequency(header_bstring=header_bstring))
+            eeg_memmaps.append(read_eeg_file_lfp_data(parent_path / fname, header_size=len(header_bstring))[0])
+        assert len(sampling_rates) < 2, "File headers specify different sampling rates. Cannot combine EEG data."
+        assert (
+            len(set(eeg_memmap.shape[0] for eeg_memmap in eeg_memmaps)) < 2
+        ), "Files have different numbers of samples. Cannot combine EEG data."
+
+        sampling_frequency = sampling_rates.pop()
+        BaseRecording.__init__(
+            self,
+            sampling_frequency=sampling_frequency,
+            channel_ids=np.arange(len(eeg_memmaps)),
+            dtype=eeg_memmaps[0].dtype,
+        )
+        self.add_recording_segment(
+            AxonaLFPRecordingSegment(eeg_memmaps=eeg_memmaps, sampling_frequency=sampling_frequency)
+        )
+        self._kwargs = dict(file_path=str(Path(file_path).absolute()))
+
+
+class AxonaLFPRecordingSegment(BaseRecordingSegment):
+    def __init__(self, eeg_memmaps: list, sampling_frequency: float):
+        BaseRecordingSegment.__init__(self, sampling_frequency=sampling_frequency)
+        self.eeg_memmaps = eeg_memmaps
+
+    def get_num_samples(self):
+        return self.eeg_memmaps[0].shape[0]
+
+    def get_traces(self, start_frame=None, end_frame=None, channel_indices=None):
+        channel_indices = np.arange(len(self.eeg_memmaps))[slice(None) if channel_indices is None else channel_indices]
+        time_slice = slice(start_frame, end_frame)
+        traces = np.empty(
+            shape=(len(range(self.get_num_samples())[time_slice]), len(channel_indices)),
+            dtype=self.eeg_memmaps[0].dtype,
+        )
+        for column, channel_index in enumerate(channel_indices):
+            traces[:, column] = self.eeg_memmaps[channel_index][time_slice]
+        return traces
+
+
 # Helper functions for AxonaPositionDataInterface
 def parse_generic_header(file_path: FilePathType, params: Union[list, set]):
     """
@@ -137,18 +206,25 @@ def parse_generic_header(file_path: FilePathType, params: Union[list, set]):
     EXAMPLE
     parse_generic_header('myset_file.set', ['experimenter', 'trial_time'])
     """
+    return parse_header_bstring(get_header_bstring(file_path), params)
+
+
+def parse_header_bstring(header_bstring: bytes, params: Union[list, set]):
+    """
+    Same as parse_generic_header, from the header byte string of a file
+    already read with get_header_bstring.
+    """
     header = dict()
     if params is not None:
         params = set(params)
-    with open(file_path, "rb") as f:
-        for bin_line in f:
-            if b"data_start" in bin_line:
-                break
-            line = bin_line.decode("cp1252").replace("\r\n", "").replace("\r", "").strip()
-            parts = line.split(" ")
-            key = parts[0]
-            if params is None or key in params:
-                header[key] = " ".join(parts[1:])
+    for bin_line in header_bstring.split(b"\n"):
+        if b"data_start" in bin_line:
+            break
+        line = bin_line.decode("cp1252").replace("\r\n", "").replace("\r", "").strip()
+        parts = line.split(" ")
+        key = parts[0]
+        if params is None or key in params:
+            header[key] = " ".join(parts[1:])
     return header
 
 
@@ -190,7 +266,7 @@ def get_header_bstring(file: FilePathType):
     return header
 
 
-def read_bin_file_position_data(bin_file_path: FilePathType):
+def read_bin_file_position_data(bin_file_path: FilePathType, packets_per_chunk: int = 2**16):
     """
     Read position data from Axona `.bin` file (if present).
 
@@ -198,6 +274,8 @@ def read_bin_file_position_data(bin_file_path: FilePathType):
     -------
     bin_file_path (Path or Str):
         Full file_path of Axona file with any extension.
+    packets_per_chunk (int):
+        Number of packets whose identifiers are scanned at a time, which bounds the memory used by the scan.
 
     Returns:
     -------
@@ -210,6 +288,8 @@ def read_bin_file_position_data(bin_file_path: FilePathType):
     described in the file format manual. In addition, note that `.bin` data is
     little endian (read right to left), as opposed to `.pos` file data, which is
     big endian.
+    The packet identifiers are scanned in chunks through a strided view of the
+    memory map, and only the position records of the selected packets are read.
     """
     pos_dt_se = np.dtype(
         [
@@ -244,39 +324,33 @@ def read_bin_file_position_data(bin_file_path: FilePathType):
     )
 
     # Only packets with the ADU2 flag contain position data
-    pos_mask = np.where([np_bin["id"] == b"ADU2"])[1]
-    pos_data = np_bin["pos"][pos_mask]
-
-    # Rearrange columns of coordinates and pixels to conform with pos data
-    # description in file format manual
-    pos_data = np.vstack(
-        (
-            pos_data["Y"],
-            pos_data["X"],
-            pos_data["y"],
-            pos_data["x"],
-            pos_data["px"],
-            pos_data["PX"],
-            pos_data["unused"],
-            pos_data["tot_px"],
-        )
-    ).T
+    packet_ids = np_bin["id"]
+    pos_mask = np.concatenate(
+        [
+            start + np.flatnonzero(packet_ids[start : start + packets_per_chunk] == b"ADU2")
+            for start in range(0, len(packet_ids), packets_per_chunk)
+        ]
+        or [np.empty(shape=0, dtype="int64")]
+    )
 
-    # Add timestamp as first column
-    pos_data = np.hstack((pos_mask.reshape((-1, 1)), pos_data))
+    # Select only every second sample
+    # Note that we do not lowpass filter, since other processing steps done by
+    # TINT would no longer work properly.
+    pos_mask = pos_mask[::2]
+    pos_records = np_bin["pos"][pos_mask]
 
     # Create timestamps from position of samples in `.bin` file to ensure
     # alignment with ecephys data
-    set_file = bin_file_path.split(".")[0] + ".set"
+    set_file = str(bin_file_path).split(".")[0] + ".set"
     sr_ecephys = int(parse_generic_header(set_file, ["rawRate"])["rawRate"])
-
     packets_per_ms = sr_ecephys / 3000
-    pos_data[:, 0] = pos_data[:, 0] / packets_per_ms
 
-    # Select only every second sample
-    # Note that we do not lowpass filter, since other processing steps done by
-    # TINT would no longer work properly.
-    pos_data = pos_data[::2]
+    # Rearrange columns of coordinates and pixels to conform with pos data
+    # description in file format manual, with the timestamp as first column
+    pos_data = np.empty(shape=(len(pos_mask), 9), dtype="int64")
+    pos_data[:, 0] = pos_mask / packets_per_ms
+    for column, field in enumerate(["Y", "X", "y", "x", "px", "PX", "unused", "tot_px"], start=1):
+        pos_data[:, column] = pos_records[field]
 
     return pos_data
 
@@ -1,7 +1,9 @@
 """Authors: Heberto Mayorquin, Steffen Buergers."""
+from pathlib import Path
+from typing import List
 
 import spikeextractors as se
-from spikeinterface.extractors import AxonaRecordingExtractor, NumpyRecording
+from spikeinterface.extractors import AxonaRecordingExtractor
 
 from pynwb import NWBFile
 
@@ -11,7 +13,7 @@ from ....basedatainterface import BaseDataInterface
 from ....tools.nwb_helpers import get_module
 from ....utils import get_schema_from_method_signature, FilePathType
 
-from .axona_utils import read_all_eeg_file_lfp_data, get_eeg_sampling_frequency, get_position_object
+from .axona_utils import AxonaLFPRecordingExtractor, get_all_file_paths, get_position_object
 
 
 class AxonaRecordingExtractorInterface(BaseRecordingExtractorInterface):
@@ -28,6 +30,11 @@ class AxonaRecordingExtractorInterface(BaseRecordingExtractorInterface):
         tetrode_id = self.recording_extractor.get_property("tetrode_id")
         self.recording_extractor.set_channel_groups(tetrode_id)
 
+    def get_source_file_paths(self) -> List[Path]:
+        """The `.set` header and `.bin` data files of the session, whichever of them file_path refers to."""
+        file_path = Path(self.source_data["file_path"])
+        return [path for path in (file_path.with_suffix(".set"), file_path.with_suffix(".bin")) if path.exists()]
+
     def extract_nwb_file_metadata(self):
 
         raw_annotations = self.recording_extractor.neo_reader.raw_annotations
@@ -113,7 +120,7 @@ class AxonaUnitRecordingExtractorInterface(AxonaRecordingExtractorInterface):
 class AxonaLFPDataInterface(BaseLFPExtractorInterface):
     """..."""
 
-    RX = NumpyRecording
+    RX = AxonaLFPRecordingExtractor
 
     @classmethod
     def get_source_schema(cls):
@@ -125,12 +132,12 @@ class AxonaLFPDataInterface(BaseLFPExtractorInterface):
         )
 
     def __init__(self, file_path: FilePathType):
+        super().__init__(file_path=file_path)
 
-        data = read_all_eeg_file_lfp_data(file_path).T
-        sampling_frequency = get_eeg_sampling_frequency(file_path)
-        super().__init__(traces_list=[data], sampling_frequency=sampling_frequency)
-
-        self.source_data = dict(file_path=file_path)
+    def get_source_file_paths(self) -> List[Path]:
+        """The `.eegX` or `.egfX` files of all the channels, which are read along with file_path."""
+        parent_path = Path(self.source_data["file_path"]).parent
+        return [parent_path / file_name for file_name in get_all_file_paths(self.source_data["file_path"])]
 
 
 class AxonaPositionDataInterface(BaseDataInterface):
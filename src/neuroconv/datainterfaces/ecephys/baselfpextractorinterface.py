@@ -28,6 +28,10 @@ class BaseLFPExtractorInterface(BaseRecordingExtractorInterface):
         )
         return metadata
 
+    def get_datasets(self, **conversion_options) -> dict:
+        """Describe the ElectricalSeries of LFP that run_conversion would write."""
+        return super().get_datasets(**dict(conversion_options, write_as="lfp", es_key="ElectricalSeries_lfp"))
+
     def run_conversion(
         self,
         nwbfile_path: OptionalFilePathType = None,
@@ -5,12 +5,15 @@ from typing import Optional
 import numpy as np
 import spikeextractors as se
 import spikeinterface as si
+from h5py._hl.filters import guess_chunk
+from hdmf.backends.hdf5 import H5DataIO
 from pynwb import NWBFile
 from pynwb.device import Device
 from pynwb.ecephys import ElectrodeGroup
 
 from ...basedatainterface import BaseDataInterface
 from ...tools.spikeinterface import write_recording
+from ...tools.spikeinterface.spikeinterfacerecordingdatachunkiterator import SpikeInterfaceRecordingDataChunkIterator
 from ...utils import get_schema_from_hdmf_class, get_base_schema, OptionalFilePathType
 
 
@@ -93,6 +96,63 @@ class BaseRecordingExtractorInterface(BaseDataInterface, ABC):
             raise TypeError(f"{self.recording_extractor} should be either se.RecordingExtractor or si.BaseRecording")
         return recording_extractor
 
+    def get_datasets(
+        self,
+        stub_test: bool = False,
+        write_as: Optional[str] = None,
+        es_key: Optional[str] = None,
+        compression: Optional[str] = None,
+        compression_opts: Optional[int] = None,
+        write_electrical_series: bool = True,
+        iterator_type: Optional[str] = "v2",
+        iterator_opts: Optional[dict] = None,
+        **conversion_options,
+    ) -> dict:
+        """
+        Describe the ElectricalSeries of each segment that run_conversion would write.
+
+        With iterator_type='v1' or None, the traces of each segment are read into memory at once, so they are
+        described with a buffer over the whole segment and the chunk shape that h5py guesses for them.
+        """
+        if iterator_type not in ("v1", "v2", None):
+            raise ValueError(f"iterator_type {iterator_type} should be either 'v1', 'v2' (recommended) or None")
+        if not write_electrical_series:
+            return dict()
+        if stub_test or self.subset_channels is not None:
+            recording = self.subset_recording(stub_test=stub_test)
+        else:
+            recording = self.recording_extractor
+        write_as = "raw" if write_as is None else write_as
+        number_of_segments = recording.get_num_segments() if isinstance(recording, si.BaseRecording) else 1
+        datasets = dict()
+        for segment_index in range(number_of_segments):
+            segment_signature = "" if number_of_segments == 1 else segment_index
+            name = (
+                f"ElectricalSeries{segment_signature}_{write_as}" if es_key is None else f"{es_key}{segment_signature}"
+            )
+            if iterator_type == "v2":
+                iterator_kwargs = iterator_opts or dict()
+            else:
+                number_of_frames = (
+                    recording.get_num_frames(segment_index=segment_index)
+                    if isinstance(recording, si.BaseRecording)
+                    else recording.get_num_frames()
+                )
+                traces_shape = (number_of_frames, recording.get_num_channels())
+                iterator_kwargs = dict(
+                    buffer_shape=traces_shape,
+                    chunk_shape=guess_chunk(traces_shape, None, recording.get_dtype().itemsize),
+                )
+            data_chunk_iterator = SpikeInterfaceRecordingDataChunkIterator(
+                recording=recording, segment_index=segment_index, **iterator_kwargs
+            )
+            datasets[name] = H5DataIO(
+                data=data_chunk_iterator,
+                compression="gzip" if compression is None else compression,
+                compression_opts=compression_opts,
+            )
+        return datasets
+
     def run_conversion(
         self,
         nwbfile_path: OptionalFilePathType = None,
@@ -1,5 +1,5 @@
 """Authors: Luiz Tauffer."""
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 
 from spikeinterface.extractors import BlackrockRecordingExtractor
@@ -81,10 +81,15 @@ class BlackrockRecordingExtractorInterface(BaseRecordingExtractorInterface):
         )
         return metadata_schema
 
+    def get_source_file_paths(self) -> List[Path]:
+        """The nsx file and the .nev file of the same name, whose spikes and events are parsed along with it."""
+        nev_file_path = self.file_path.with_suffix(".nev")
+        return [self.file_path] + ([nev_file_path] if nev_file_path.exists() else [])
+
     def get_metadata(self):
         metadata = super().get_metadata()
         # Open file and extract headers
-        basic_header = parse_nsx_basic_header(self.source_data["file_path"])
+        basic_header = self.header_cache.get(path=self.source_data["file_path"], reader=parse_nsx_basic_header)
         if "TimeOrigin" in basic_header:
             session_start_time = basic_header["TimeOrigin"]
             metadata["NWBFile"].update(session_start_time=session_start_time.strftime("%Y-%m-%dT%H:%M:%S"))
@@ -131,7 +136,7 @@ class BlackrockSortingExtractorInterface(BaseSortingExtractorInterface):
     def get_metadata(self):
         metadata = super().get_metadata()
         # Open file and extract headers
-        basic_header = parse_nev_basic_header(self.source_data["file_path"])
+        basic_header = self.header_cache.get(path=self.source_data["file_path"], reader=parse_nev_basic_header)
         if "TimeOrigin" in basic_header:
             session_start_time = basic_header["TimeOrigin"]
             metadata["NWBFile"].update(session_start_time=session_start_time.strftime("%Y-%m-%dT%H:%M:%S"))
@@ -85,12 +85,12 @@ def parse_nsx_basic_header(nsx_file):
         FieldDef("TimeOrigin", "8H", format_timeorigin),  # 16 bytes  - 8 uint16
         FieldDef("ChannelCount", "I", format_none),
     ]  # 4 bytes   - uint32
-    datafile = open(nsx_file, "rb")
-    filetype_id = bytes.decode(datafile.read(8), "latin-1")
-    if filetype_id == "NEURALSG":
-        # this wont contain fields that can be added to NWBFile metadata
-        return dict()
-    return processheaders(datafile, nsx_basic_dict)
+    with open(nsx_file, "rb") as datafile:
+        filetype_id = bytes.decode(datafile.read(8), "latin-1")
+        if filetype_id == "NEURALSG":
+            # this wont contain fields that can be added to NWBFile metadata
+            return dict()
+        return processheaders(datafile, nsx_basic_dict)
 
 
 def parse_nev_basic_header(nev_file):
@@ -107,5 +107,5 @@ def parse_nev_basic_header(nev_file):
         FieldDef("Comment", "256s", format_stripstring),  # 256 bytes - 256 char array
         FieldDef("NumExtendedHeaders", "I", format_none),
     ]
-    datafile = open(nev_file, "rb")
-    return processheaders(datafile, nev_basic_dict)
+    with open(nev_file, "rb") as datafile:
+        return processheaders(datafile, nev_basic_dict)
@@ -16,6 +16,11 @@ except ImportError:
     HAVE_SCIPY_AND_HDF5STORAGE = False
 
 
+def read_cell_class_info(file_path: FilePathType) -> np.ndarray:
+    """Read the cell type classification from a .CellClass.cellinfo.mat file."""
+    return scipy.io.loadmat(file_path).get("CellClass", np.empty(0))
+
+
 class CellExplorerSortingInterface(BaseSortingExtractorInterface):
     """Primary data interface class for converting Cell Explorer spiking data."""
 
@@ -67,7 +72,7 @@ class CellExplorerSortingInterface(BaseSortingExtractorInterface):
         celltype_mapping = {"pE": "excitatory", "pI": "inhibitory", "[]": "unclassified"}
         celltype_file_path = session_path / f"{session_id}.CellClass.cellinfo.mat"
         if celltype_file_path.is_file():
-            celltype_info = scipy.io.loadmat(celltype_file_path).get("CellClass", np.empty(0))
+            celltype_info = self.header_cache.get(path=celltype_file_path, reader=read_cell_class_info)
             if "label" in celltype_info.dtype.names:
                 for unit_id, value in zip(
                     unit_ids, [str(celltype_mapping[str(x[0])]) for x in celltype_info["label"][0][0][0]]
@@ -107,7 +112,7 @@ class CellExplorerSortingInterface(BaseSortingExtractorInterface):
                 )
         celltype_filepath = session_path / f"{session_id}.CellClass.cellinfo.mat"
         if celltype_filepath.is_file():
-            celltype_info = scipy.io.loadmat(celltype_filepath).get("CellClass", np.empty(0))
+            celltype_info = self.header_cache.get(path=celltype_filepath, reader=read_cell_class_info)
             if "label" in celltype_info.dtype.names:
                 unit_properties.append(
                     dict(
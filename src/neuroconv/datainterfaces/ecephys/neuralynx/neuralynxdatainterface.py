@@ -12,7 +12,8 @@ import spikeextractors as se
 
 from ..baserecordingextractorinterface import BaseRecordingExtractorInterface
 from ..basesortingextractorinterface import BaseSortingExtractorInterface
-from ....utils import FolderPathType
+from ....utils import FilePathType, FolderPathType
+from ....utils.header_cache import header_cache
 from ....utils.json_schema import dict_deep_update
 
 
@@ -26,6 +27,12 @@ def parse_header(header):
     return header_dict
 
 
+def read_raw_header(file_path: FilePathType) -> str:
+    """Read the 1 KB text header of a Neuralynx file."""
+    with open(file_path, "r", encoding="latin1") as file:
+        return file.read(1024)
+
+
 def get_metadata(folder_path: FolderPathType) -> dict:
     """
     Parse the header of one of the .ncs files to get the session start time (without
@@ -42,8 +49,7 @@ def get_metadata(folder_path: FolderPathType) -> dict:
     folder_path = Path(folder_path)
     csc_files = sorted(folder_path.glob("*.[nN]cs"))
     file_path = csc_files[0]
-    with file_path.open(encoding="latin1") as file:
-        raw_header = file.read(1024)
+    raw_header = header_cache.get(path=file_path, reader=read_raw_header)
     header = parse_header(raw_header)
     if header.get("FileVersion") == "3.4":
         return dict(
@@ -71,9 +77,7 @@ def get_filtering(channel_path: FolderPathType) -> str:
         json dump of filter parameters. Uses the mu character, which may cause problems
         for downstream things that expect ASCII.
     """
-    channel_path = Path(channel_path)
-    with open(channel_path, "r", encoding="latin1") as file:
-        raw_header = file.read(1024)
+    raw_header = header_cache.get(path=channel_path, reader=read_raw_header)
     header = parse_header(raw_header)
 
     return json.dumps(
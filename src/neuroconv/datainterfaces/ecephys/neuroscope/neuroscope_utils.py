@@ -1,10 +1,14 @@
 """Authors: Cody Baker and Ben Dichter."""
 from pathlib import Path
 from datetime import datetime
+from typing import List, Optional
+
 from dateutil import parser
 
 from lxml import etree as et
 
+from ....utils.header_cache import header_cache
+
 
 def get_xml_file_path(data_file_path: str):
     """
@@ -38,6 +42,69 @@ def safe_nested_find(root: et._Element, keys: list):
         return root
 
 
+class NeuroscopeSession:
+    """
+    The session information parsed from a Neuroscope .xml file.
+
+    Each property is extracted from the parsed tree on first access, so a file lacking one of the sections can still
+    provide the others.
+    """
+
+    def __init__(self, xml_file_path: str):
+        self.xml_file_path = str(xml_file_path)
+        self.root = get_xml(xml_file_path=self.xml_file_path)
+        self._shank_channels = None
+        self._channel_groups = None
+        self._session_start_time = None
+        self._parsed = set()
+
+    @property
+    def shank_channels(self) -> Optional[List[List[int]]]:
+        """The channels of each group used for spike detection, or None if the file does not specify them."""
+        if "shank_channels" not in self._parsed:
+            channel_groups = safe_find(
+                safe_nested_find(self.root, ["spikeDetection", "channelGroups"]), "group", findall=True
+            )
+            if channel_groups and all([safe_find(group, "channels") is not None for group in channel_groups]):
+                self._shank_channels = [
+                    [int(channel.text) for channel in group.find("channels")] for group in channel_groups
+                ]
+            self._parsed.add("shank_channels")
+        return self._shank_channels
+
+    @property
+    def channel_groups(self) -> List[List[int]]:
+        """The channels of each anatomical group, which are all the channels connected to the probe."""
+        if "channel_groups" not in self._parsed:
+            self._channel_groups = [
+                [int(channel.text) for channel in group.findall("channel")]
+                for group in self.root.find("anatomicalDescription").find("channelGroups").findall("group")
+            ]
+            self._parsed.add("channel_groups")
+        return self._channel_groups
+
+    @property
+    def session_start_time(self) -> Optional[datetime]:
+        """The date of the session, or None if the file does not specify it."""
+        if "session_start_time" not in self._parsed:
+            date_elem = safe_nested_find(self.root, ["generalInfo", "date"])
+            if date_elem is not None:
+                self._session_start_time = parser.parse(date_elem.text)
+            self._parsed.add("session_start_time")
+        return self._session_start_time
+
+
+def read_neuroscope_session(xml_file_path: str) -> NeuroscopeSession:
+    """
+    Parse the .xml file of a Neuroscope session, or return the session already parsed from it.
+
+    The parsed sessions are kept in the header cache shared by all data interfaces (`neuroconv.utils.header_cache`),
+    until the modification time or size of the file changes, so that all the interfaces of a converter, and all the
+    metadata helpers, share a single parse of each file.
+    """
+    return header_cache.get(path=xml_file_path, reader=NeuroscopeSession)
+
+
 def get_shank_channels(xml_file_path: str) -> list:
     """
     Retrieve the list of structured shank-only channels.
@@ -49,11 +116,9 @@ def get_shank_channels(xml_file_path: str) -> list:
     -------
         List reflecting the group structure of the channels.
     """
-    root = get_xml(xml_file_path)
-    channel_groups = safe_find(safe_nested_find(root, ["spikeDetection", "channelGroups"]), "group", findall=True)
-    if channel_groups and all([safe_find(group, "channels") is not None for group in channel_groups]):
-        shank_channels = [[int(channel.text) for channel in group.find("channels")] for group in channel_groups]
-        return shank_channels
+    shank_channels = read_neuroscope_session(xml_file_path=xml_file_path).shank_channels
+    if shank_channels is not None:
+        return [list(group) for group in shank_channels]
 
 
 def get_channel_groups(xml_file_path: str) -> list:
@@ -66,12 +131,7 @@ def get_channel_groups(xml_file_path: str) -> list:
     -------
         List reflecting the group structure of the channels.
     """
-    root = get_xml(xml_file_path)
-    channel_groups = [
-        [int(channel.text) for channel in group.findall("channel")]
-        for group in root.find("anatomicalDescription").find("channelGroups").findall("group")
-    ]
-    return channel_groups
+    return [list(group) for group in read_neuroscope_session(xml_file_path=xml_file_path).channel_groups]
 
 
 def get_session_start_time(xml_file_path: str) -> datetime:
@@ -82,7 +142,4 @@ def get_session_start_time(xml_file_path: str) -> datetime:
     -------
         datetime object describing the start time
     """
-    root = get_xml(xml_file_path)
-    date_elem = safe_nested_find(root, ["generalInfo", "date"])
-    if date_elem is not None:
-        return parser.parse(date_elem.text)
+    return read_neuroscope_session(xml_file_path=xml_file_path).session_start_time
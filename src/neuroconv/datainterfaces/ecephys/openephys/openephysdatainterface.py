@@ -1,14 +1,54 @@
 """Authors: Heberto Mayorquin, Luiz Tauffer."""
+import os
+from datetime import datetime
+from pathlib import Path
 from typing import Optional
+from xml.etree import ElementTree
 
-import pyopenephys
 import spikeextractors as se
 from spikeinterface.extractors import OpenEphysBinaryRecordingExtractor
 from spikeinterface.core.old_api_utils import OldToNewRecording
 
 from ..baserecordingextractorinterface import BaseRecordingExtractorInterface
 from ..basesortingextractorinterface import BaseSortingExtractorInterface
-from ....utils import get_schema_from_method_signature, FolderPathType
+from ....utils import get_schema_from_method_signature, FilePathType, FolderPathType
+
+
+def get_settings_file_path(folder_path: FolderPathType) -> Optional[Path]:
+    """
+    Find the settings file of the first experiment of an OpenEphys session, as pyopenephys does.
+
+    Returns None if the session has no experiment or no unique settings file for it.
+    """
+    folder_path = Path(folder_path)
+    file_names = sorted(os.listdir(folder_path))
+    continuous_file_names = [file_name for file_name in file_names if file_name.startswith("Continuous")]
+    if continuous_file_names:
+        name_parts = continuous_file_names[0].split("_")
+        experiment_id = 1 if len(name_parts) == 2 else int(name_parts[-1][0])
+    else:
+        experiment_names = [
+            file_name for file_name in file_names if "experiment" in file_name and (folder_path / file_name).is_dir()
+        ]
+        if not experiment_names:
+            return None
+        experiment_id = int(experiment_names[0][-1])
+
+    if experiment_id == 1:
+        settings_file_names = [file_name for file_name in file_names if file_name == "settings.xml"]
+    else:
+        settings_file_names = [
+            file_name
+            for file_name in file_names
+            if file_name.startswith("settings") and file_name.endswith(".xml") and str(experiment_id) in file_name
+        ]
+    return folder_path / settings_file_names[0] if len(settings_file_names) == 1 else None
+
+
+def read_session_start_time(settings_file_path: FilePathType) -> datetime:
+    """Read the start time of an OpenEphys experiment from the date in its settings file."""
+    date = ElementTree.parse(settings_file_path).getroot().findtext("INFO/DATE")
+    return datetime.strptime(date, "%d %b %Y %H:%M:%S")
 
 
 class OpenEphysRecordingExtractorInterface(BaseRecordingExtractorInterface):
@@ -54,11 +94,11 @@ class OpenEphysRecordingExtractorInterface(BaseRecordingExtractorInterface):
         """Auto-fill as much of the metadata as possible. Must comply with metadata schema."""
         metadata = super().get_metadata()
 
-        folder_path = self.source_data["folder_path"]
-        fileobj = pyopenephys.File(folder_path)
-        session_start_time = fileobj.experiments[0].datetime
-
-        metadata["NWBFile"].update(session_start_time=session_start_time)
+        # The cached start time is read again only when the settings file changes, not the data files of the folder
+        settings_file_path = get_settings_file_path(folder_path=self.source_data["folder_path"])
+        if settings_file_path is not None:
+            session_start_time = self.header_cache.get(path=settings_file_path, reader=read_session_start_time)
+            metadata["NWBFile"].update(session_start_time=session_start_time)
         return metadata
 
 
@@ -2,12 +2,16 @@
 from typing import Optional
 from abc import ABC
 
+from hdmf.backends.hdf5 import H5DataIO
 from pynwb import NWBFile
+from roiextractors import ImagingExtractor
 from pynwb.device import Device
 from pynwb.ophys import ImagingPlane, TwoPhotonSeries
 
 from ...basedatainterface import BaseDataInterface
 from ...tools.roiextractors import write_imaging, get_nwb_imaging_metadata
+from ...tools.roiextractors.imagingextractordatachunkiterator import ImagingExtractorDataChunkIterator
+from ...tools.roiextractors.summaryimages import SummaryImagesAccumulator, SummaryImageDataChunkIterator
 from ...utils import (
     get_schema_from_hdmf_class,
     fill_defaults,
@@ -18,13 +22,41 @@ from ...utils import (
 
 
 class BaseImagingExtractorInterface(BaseDataInterface, ABC):
+    """
+    Parent class for all ImagingExtractor interfaces.
+
+    The ImagingExtractor over the full source data is only constructed when it is first accessed, so that
+    stub conversions of formats whose headers are expensive to scan can read just the first frames instead;
+    see `get_stub_imaging_extractor`.
+    """
+
     IX = None
 
     def __init__(self, verbose: bool = True, **source_data):
         super().__init__(**source_data)
-        self.imaging_extractor = self.IX(**source_data)
+        self._imaging_extractor = None
         self.verbose = verbose
 
+    @property
+    def imaging_extractor(self) -> ImagingExtractor:
+        if self._imaging_extractor is None:
+            self._imaging_extractor = self.IX(**self.source_data)
+        return self._imaging_extractor
+
+    @imaging_extractor.setter
+    def imaging_extractor(self, imaging_extractor: ImagingExtractor):
+        self._imaging_extractor = imaging_extractor
+
+    def get_stub_imaging_extractor(self, stub_frames: int) -> ImagingExtractor:
+        """
+        Return an ImagingExtractor over the first stub_frames frames of the source data.
+
+        Interfaces to formats that can index their first frames without parsing the whole source override this
+        to avoid constructing the full ImagingExtractor.
+        """
+        stub_frames = min([stub_frames, self.imaging_extractor.get_num_frames()])
+        return self.imaging_extractor.frame_slice(start_frame=0, end_frame=stub_frames)
+
     def get_metadata_schema(self):
         metadata_schema = super().get_metadata_schema()
 
@@ -58,7 +90,11 @@ class BaseImagingExtractorInterface(BaseDataInterface, ABC):
 
     def get_metadata(self):
         metadata = super().get_metadata()
-        default_metadata = get_nwb_imaging_metadata(self.imaging_extractor)
+        # The metadata does not depend on the number of frames, so a stub suffices until the data is requested
+        imaging_extractor = self._imaging_extractor
+        if imaging_extractor is None:
+            imaging_extractor = self.get_stub_imaging_extractor(stub_frames=1)
+        default_metadata = get_nwb_imaging_metadata(imaging_extractor)
         metadata = dict_deep_update(default_metadata, metadata)
 
         # fix troublesome data types
@@ -70,6 +106,32 @@ class BaseImagingExtractorInterface(BaseDataInterface, ABC):
                     two_photon_series["rate"] = float(two_photon_series["rate"])
         return metadata
 
+    def get_datasets(
+        self,
+        stub_test: bool = False,
+        stub_frames: int = 100,
+        compute_summary_images: bool = False,
+        **conversion_options,
+    ) -> dict:
+        """Describe the TwoPhotonSeries, and the summary images if requested, that run_conversion would write."""
+        if stub_test:
+            imaging_extractor = self.get_stub_imaging_extractor(stub_frames=stub_frames)
+        else:
+            imaging_extractor = self.imaging_extractor
+        data_chunk_iterator = ImagingExtractorDataChunkIterator(
+            imaging_extractor=imaging_extractor, compute_summary_images=compute_summary_images
+        )
+        datasets = dict(TwoPhotonSeries=H5DataIO(data=data_chunk_iterator, compression=True))
+        if compute_summary_images:
+            for image_name in SummaryImagesAccumulator.image_names:
+                datasets[f"summary_images/{image_name}"] = H5DataIO(
+                    data=SummaryImageDataChunkIterator(
+                        summary_images_accumulator=data_chunk_iterator.summary_images_accumulator,
+                        image_name=image_name,
+                    )
+                )
+        return datasets
+
     def run_conversion(
         self,
         nwbfile_path: OptionalFilePathType = None,
@@ -79,11 +141,11 @@ class BaseImagingExtractorInterface(BaseDataInterface, ABC):
         stub_test: bool = False,
         stub_frames: int = 100,
         save_path: OptionalFilePathType = None,
+        compute_summary_images: bool = False,
     ):
 
         if stub_test:
-            stub_frames = min([stub_frames, self.imaging_extractor.get_num_frames()])
-            imaging_extractor = self.imaging_extractor.frame_slice(start_frame=0, end_frame=stub_frames)
+            imaging_extractor = self.get_stub_imaging_extractor(stub_frames=stub_frames)
         else:
             imaging_extractor = self.imaging_extractor
 
@@ -95,4 +157,5 @@ class BaseImagingExtractorInterface(BaseDataInterface, ABC):
             overwrite=overwrite,
             verbose=self.verbose,
             save_path=save_path,
+            compute_summary_images=compute_summary_images,
         )
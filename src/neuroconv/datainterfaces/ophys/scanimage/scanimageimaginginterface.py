@@ -1,8 +1,11 @@
+import glob
 import json
+from pathlib import Path
 from dateutil.parser import parse as dateparse
 from typing import Optional
 
-from roiextractors import ScanImageTiffImagingExtractor
+from natsort import natsorted
+from roiextractors import ImagingExtractor, ScanImageTiffImagingExtractor
 
 try:
     from ScanImageTiffReader import ScanImageTiffReader
@@ -13,7 +16,12 @@ except ImportError:
 
 
 from ..baseimagingextractorinterface import BaseImagingExtractorInterface
-from ....utils import FilePathType
+from ....tools.roiextractors.multifileimagingextractor import (
+    HAVE_TIFFFILE,
+    MultiScanImageTiffImagingExtractor,
+    has_single_page_frames,
+)
+from ....utils import FilePathType, FolderPathType
 
 
 def extract_extra_metadata(file_path):
@@ -70,6 +78,19 @@ class ScanImageImagingInterface(BaseImagingExtractorInterface):
 
         super().__init__(file_path=file_path, sampling_frequency=sampling_frequency, verbose=verbose)
 
+    def get_stub_imaging_extractor(self, stub_frames: int) -> ImagingExtractor:
+        file_path = Path(self.source_data["file_path"])
+        if self._imaging_extractor is not None or not HAVE_TIFFFILE or not has_single_page_frames(file_path=file_path):
+            return super().get_stub_imaging_extractor(stub_frames=stub_frames)
+
+        # Only index the first frames instead of every frame of the file
+        return MultiScanImageTiffImagingExtractor(
+            folder_path=file_path.parent,
+            sampling_frequency=self.source_data["sampling_frequency"],
+            file_pattern=glob.escape(file_path.name),
+            max_frames=stub_frames,
+        )
+
     def get_metadata(self):
         device_number = 0  # Imaging plane metadata is a list with metadata for each plane
 
@@ -87,3 +108,75 @@ class ScanImageImagingInterface(BaseImagingExtractorInterface):
             two_photon_series_metadata.update(description=extracted_description)
 
         return metadata
+
+
+class MultiScanImageImagingInterface(ScanImageImagingInterface):
+    """Data Interface for a ScanImage session split across many Tiff files."""
+
+    IX = MultiScanImageTiffImagingExtractor
+
+    @classmethod
+    def get_source_schema(cls):
+        source_schema = super(ScanImageImagingInterface, cls).get_source_schema()
+        source_schema["properties"]["folder_path"]["description"] = "Path to the folder containing the Tiff files."
+        source_schema["properties"]["file_pattern"][
+            "description"
+        ] = "Glob pattern, relative to the folder_path, selecting the Tiff files to concatenate in natural sort order."
+        return source_schema
+
+    def __init__(
+        self,
+        folder_path: FolderPathType,
+        file_pattern: str = "*.tif",
+        fallback_sampling_frequency: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        verbose: bool = True,
+    ):
+        """
+        DataInterface for concatenating the frames of many ScanImage Tiff files into a single TwoPhotonSeries.
+
+        The metadata is extracted from the exif of the first file. Only the headers of the files are read to index
+        the frames; the frames of different files are decoded in parallel threads as the data is written.
+
+        Parameters
+        ----------
+        folder_path: FolderPathType
+            Path to the folder containing the Tiff files.
+        file_pattern: str, default: "*.tif"
+            Glob pattern, relative to the folder_path, selecting the Tiff files.
+        fallback_sampling_frequency: float, optional
+            The sampling frequency can usually be extracted from the scanimage metadata in
+            exif:ImageDescription:state.acq.frameRate. If not, use this.
+        max_workers: int, optional
+            Maximum number of threads used to read and decode the files.
+        """
+        assert (
+            HAVE_SCAN_IMAGE_TIFF
+        ), "To use the ScanImageTiffExtractor install scanimage-tiff-reader: \n\n pip install scanimage-tiff-reader\n\n"
+        file_paths = natsorted(Path(folder_path).glob(file_pattern), key=str)
+        assert file_paths, f"No files matching the pattern '{file_pattern}' were found in '{folder_path}'!"
+        self.image_metadata = extract_extra_metadata(file_path=file_paths[0])
+
+        if "state.acq.frameRate" in self.image_metadata:
+            sampling_frequency = float(self.image_metadata["state.acq.frameRate"])
+        else:
+            assert_msg = (
+                "sampling frequency not found in image metadata, "
+                "input the frequency using the argument `fallback_sampling_frequency`"
+            )
+            assert fallback_sampling_frequency is not None, assert_msg
+            sampling_frequency = fallback_sampling_frequency
+
+        BaseImagingExtractorInterface.__init__(
+            self,
+            folder_path=folder_path,
+            file_pattern=file_pattern,
+            sampling_frequency=sampling_frequency,
+            max_workers=max_workers,
+            verbose=verbose,
+        )
+
+    def get_stub_imaging_extractor(self, stub_frames: int) -> ImagingExtractor:
+        if self._imaging_extractor is not None:
+            return BaseImagingExtractorInterface.get_stub_imaging_extractor(self, stub_frames=stub_frames)
+        return self.IX(**self.source_data, max_frames=stub_frames)
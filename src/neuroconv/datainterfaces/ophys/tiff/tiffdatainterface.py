@@ -1,7 +1,12 @@
-from roiextractors import TiffImagingExtractor
+import glob
+from pathlib import Path
+from typing import Optional
+
+from roiextractors import ImagingExtractor, TiffImagingExtractor
 
 from ..baseimagingextractorinterface import BaseImagingExtractorInterface
-from ....utils import FilePathType, FloatType, ArrayType
+from ....tools.roiextractors.multifileimagingextractor import MultiTiffImagingExtractor, has_single_page_frames
+from ....utils import FilePathType, FolderPathType, FloatType, ArrayType
 
 
 class TiffImagingInterface(BaseImagingExtractorInterface):
@@ -17,3 +22,69 @@ class TiffImagingInterface(BaseImagingExtractorInterface):
 
     def __init__(self, file_path: FilePathType, sampling_frequency: FloatType, verbose: bool = True):
         super().__init__(file_path=file_path, sampling_frequency=sampling_frequency, verbose=verbose)
+
+    def get_stub_imaging_extractor(self, stub_frames: int) -> ImagingExtractor:
+        file_path = Path(self.source_data["file_path"])
+        if self._imaging_extractor is not None or not has_single_page_frames(file_path=file_path):
+            return super().get_stub_imaging_extractor(stub_frames=stub_frames)
+
+        # Only parse the directories of the first pages instead of memory mapping the whole file
+        return MultiTiffImagingExtractor(
+            folder_path=file_path.parent,
+            sampling_frequency=self.source_data["sampling_frequency"],
+            file_pattern=glob.escape(file_path.name),
+            max_frames=stub_frames,
+        )
+
+
+class MultiTiffImagingInterface(BaseImagingExtractorInterface):
+    """Data Interface for a session split across many Tiff files."""
+
+    IX = MultiTiffImagingExtractor
+
+    @classmethod
+    def get_source_schema(cls):
+        source_schema = super().get_source_schema()
+        source_schema["properties"]["folder_path"]["description"] = "Path to the folder containing the Tiff files."
+        source_schema["properties"]["file_pattern"][
+            "description"
+        ] = "Glob pattern, relative to the folder_path, selecting the Tiff files to concatenate in natural sort order."
+        return source_schema
+
+    def __init__(
+        self,
+        folder_path: FolderPathType,
+        sampling_frequency: FloatType,
+        file_pattern: str = "*.tif",
+        max_workers: Optional[int] = None,
+        verbose: bool = True,
+    ):
+        """
+        DataInterface for concatenating the frames of many Tiff files into a single TwoPhotonSeries.
+
+        Only the headers of the files are read to index the frames; the frames of different files are decoded
+        in parallel threads as the data is written.
+
+        Parameters
+        ----------
+        folder_path: FolderPathType
+            Path to the folder containing the Tiff files.
+        sampling_frequency: float
+            The frequency at which the frames were sampled, in Hz.
+        file_pattern: str, default: "*.tif"
+            Glob pattern, relative to the folder_path, selecting the Tiff files.
+        max_workers: int, optional
+            Maximum number of threads used to read and decode the files.
+        """
+        super().__init__(
+            folder_path=folder_path,
+            sampling_frequency=sampling_frequency,
+            file_pattern=file_pattern,
+            max_workers=max_workers,
+            verbose=verbose,
+        )
+
+    def get_stub_imaging_extractor(self, stub_frames: int) -> ImagingExtractor:
+        if self._imaging_extractor is not None:
+            return super().get_stub_imaging_extractor(stub_frames=stub_frames)
+        return self.IX(**self.source_data, max_frames=stub_frames)
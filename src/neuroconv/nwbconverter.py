@@ -1,6 +1,6 @@
 """Authors: Cody Baker and Ben Dichter."""
 import json
-from jsonschema import validate
+from copy import deepcopy
 from typing import Optional, Dict
 from pathlib import Path
 
@@ -8,6 +8,7 @@ from pynwb import NWBFile
 from pynwb.file import Subject
 
 from .tools.nwb_helpers import get_default_nwbfile_metadata, make_nwbfile_from_metadata, make_or_load_nwbfile
+from .tools.conversion_plan import get_dataset_plan
 from .utils import (
     get_schema_from_hdmf_class,
     get_schema_for_NWBFile,
@@ -15,6 +16,8 @@ from .utils import (
     get_base_schema,
     unroot_schema,
     fill_defaults,
+    validate_with_cached_validator,
+    get_schema_validator,
 )
 
 from .utils.json_schema import NWBMetaDataEncoder
@@ -24,6 +27,7 @@ class NWBConverter:
     """Primary class for all NWB conversion classes."""
 
     data_interface_classes = None
+    _metadata_schema_cache = None
 
     @classmethod
     def get_source_schema(cls):
@@ -71,7 +75,18 @@ class NWBConverter:
         }
 
     def get_metadata_schema(self):
-        """Compile metadata schemas from each of the data interface objects."""
+        """
+        Compile metadata schemas from each of the data interface objects.
+
+        The schema, with the default values filled from the metadata of the interfaces, is compiled once per set of
+        data interface objects; a copy of it is returned on every call.
+        """
+        interfaces_key = tuple((name, id(interface)) for name, interface in self.data_interface_objects.items())
+        if self._metadata_schema_cache is None or self._metadata_schema_cache[0] != interfaces_key:
+            self._metadata_schema_cache = (interfaces_key, self._compile_metadata_schema())
+        return deepcopy(self._metadata_schema_cache[1])
+
+    def _compile_metadata_schema(self):
         metadata_schema = get_base_schema(
             id_="metadata.schema.json",
             root=True,
@@ -110,21 +125,93 @@ class NWBConverter:
         # The encoder produces a serialiazed object so we de serialized it for comparison
         serialized_metadata = encoder.encode(metadata)
         decoded_metadata = json.loads(serialized_metadata)
-        validate(instance=decoded_metadata, schema=self.get_metadata_schema())
+        validate_with_cached_validator(instance=decoded_metadata, schema=self.get_metadata_schema())
         if self.verbose:
             print("Metadata is valid!")
 
     def validate_conversion_options(self, conversion_options: Dict[str, dict]):
         """Validate conversion_options against Converter conversion_options_schema."""
-        validate(instance=conversion_options, schema=self.get_conversion_options_schema())
+        validate_with_cached_validator(instance=conversion_options, schema=self.get_conversion_options_schema())
         if self.verbose:
             print("conversion_options is valid!")
 
     def _validate_source_data(self, source_data: Dict[str, dict], verbose: bool = True):
-        validate(instance=source_data, schema=self.get_source_schema())
+        validate_with_cached_validator(instance=source_data, schema=self.get_source_schema())
         if verbose:
             print("Source data is valid!")
 
+    def get_conversion_plan(
+        self,
+        metadata: Optional[dict] = None,
+        conversion_options: Optional[dict] = None,
+        number_of_sample_chunks: int = 3,
+        conversion_rate_mb: float = 17.0,
+    ) -> dict:
+        """
+        Describe what run_conversion would write, without writing anything.
+
+        Only the headers of the source files and the few chunks compressed to estimate the compressed size of each
+        dataset are read.
+
+        Parameters
+        ----------
+        metadata: dict, optional
+            The metadata to validate. The default is the automatically extracted metadata.
+        conversion_options: dict, optional
+            Similar to source_data, a dictionary containing keywords for each interface for which non-default
+            conversion specification is requested.
+        number_of_sample_chunks: int, default: 3
+            The number of chunks of each dataset compressed to estimate its compressed size.
+        conversion_rate_mb: float, default: 17.0
+            Estimate of the conversion rate (in MB/s) of the source data, used for the estimated runtime.
+
+        Returns
+        -------
+        plan: dict
+            The metadata and conversion options with any validation errors, a description of each dataset of each
+            interface, the names of the interfaces whose datasets are not described, and the estimated total bytes,
+            compressed bytes, runtime in seconds and peak memory in bytes of the conversion.
+        """
+        if metadata is None:
+            metadata = self.get_metadata()
+        if conversion_options is None:
+            conversion_options = dict()
+        conversion_options_to_run = dict_deep_update(self.get_conversion_options(), conversion_options)
+
+        decoded_metadata = json.loads(NWBMetaDataEncoder().encode(metadata))
+        metadata_errors = get_schema_validator(schema=self.get_metadata_schema()).iter_errors(decoded_metadata)
+        conversion_options_errors = get_schema_validator(schema=self.get_conversion_options_schema()).iter_errors(
+            conversion_options_to_run
+        )
+
+        datasets = dict()
+        interfaces_without_datasets = []
+        for interface_name, data_interface in self.data_interface_objects.items():
+            interface_datasets = data_interface.get_datasets(**conversion_options_to_run.get(interface_name, dict()))
+            if not interface_datasets:
+                interfaces_without_datasets.append(interface_name)
+            datasets[interface_name] = [
+                get_dataset_plan(name=name, dataset_io=dataset_io, number_of_sample_chunks=number_of_sample_chunks)
+                for name, dataset_io in interface_datasets.items()
+            ]
+
+        all_datasets = [dataset for interface_datasets in datasets.values() for dataset in interface_datasets]
+        total_bytes = sum(dataset["bytes"] for dataset in all_datasets)
+        compressed_bytes = [dataset["estimated_compressed_bytes"] for dataset in all_datasets]
+        return dict(
+            metadata=metadata,
+            metadata_errors=[error.message for error in metadata_errors],
+            conversion_options=conversion_options_to_run,
+            conversion_options_errors=[error.message for error in conversion_options_errors],
+            datasets=datasets,
+            interfaces_without_datasets=interfaces_without_datasets,
+            total_bytes=total_bytes,
+            estimated_compressed_bytes=None if None in compressed_bytes else sum(compressed_bytes),
+            estimated_runtime=total_bytes / 1e6 / conversion_rate_mb,
+            # The datasets are written one after the other, each through a buffer of its data
+            estimated_peak_memory_bytes=max([dataset["buffer_bytes"] for dataset in all_datasets], default=0),
+        )
+
     def run_conversion(
         self,
         nwbfile_path: Optional[str] = None,
@@ -170,12 +257,17 @@ class NWBConverter:
         conversion_options_to_run = dict_deep_update(default_conversion_options, conversion_options)
         self.validate_conversion_options(conversion_options=conversion_options_to_run)
 
+        requires_interleaved_write = any(
+            data_interface.requires_interleaved_write(**conversion_options_to_run.get(interface_name, dict()))
+            for interface_name, data_interface in self.data_interface_objects.items()
+        )
         with make_or_load_nwbfile(
             nwbfile_path=nwbfile_path,
             nwbfile=nwbfile,
             metadata=metadata,
             overwrite=overwrite,
             verbose=self.verbose,
+            exhaust_dci=not requires_interleaved_write,
         ) as nwbfile_out:
             for interface_name, data_interface in self.data_interface_objects.items():
                 data_interface.run_conversion(
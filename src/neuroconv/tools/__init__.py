@@ -1,3 +1,28 @@
-from .spikeinterface import spikeinterface
-from .roiextractors import roiextractors
-from .neo import neo
+from importlib import import_module
+
+# The tools are imported on first access, so that importing neuroconv does not load the dependencies of every tool
+_lazy_imports = dict(
+    run_conversion_from_yaml=".yaml_conversion_specification",
+    plan_conversion_from_yaml=".yaml_conversion_specification",
+    spikeinterface=None,
+    roiextractors=None,
+    neo=None,
+)
+
+
+def __getattr__(name: str):
+    if name not in _lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _lazy_imports[name] is None:
+        value = import_module(f".{name}", package=__name__)
+    else:
+        value = getattr(import_module(_lazy_imports[name], package=__name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy_imports))
+
+
+__all__ = list(_lazy_imports)
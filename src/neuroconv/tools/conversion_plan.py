@@ -0,0 +1,93 @@
+"""Tools for planning a conversion without writing it."""
+import zlib
+from typing import Optional
+
+import numpy as np
+from hdmf.backends.hdf5 import H5DataIO
+from hdmf.data_utils import GenericDataChunkIterator
+
+
+def estimate_compression_ratio(
+    data_chunk_iterator: GenericDataChunkIterator,
+    compression=None,
+    compression_opts: Optional[int] = None,
+    number_of_sample_chunks: int = 3,
+) -> Optional[float]:
+    """
+    Estimate the ratio of compressed to raw bytes of a dataset by compressing a few of its chunks.
+
+    The sample chunks are spread evenly along the first axis. Only GZIP compression (the default of H5DataIO when
+    compression is True) can be sampled; None is returned for other filters.
+
+    Parameters
+    ----------
+    data_chunk_iterator: GenericDataChunkIterator
+        The iterator over the dataset; only the sampled chunks are read from it.
+    compression: str or bool, optional
+        The compression filter of the dataset. Falsy values mean no compression.
+    compression_opts: int, optional
+        The GZIP level. The default is 4, as for HDF5.
+    number_of_sample_chunks: int, default: 3
+    """
+    if not compression:
+        return 1.0
+    if compression not in (True, "gzip"):
+        return None
+    level = 4 if compression_opts is None else compression_opts
+
+    maxshape = data_chunk_iterator.maxshape
+    chunk_shape = data_chunk_iterator.chunk_shape
+    number_of_chunks_along_first_axis = int(np.ceil(maxshape[0] / chunk_shape[0]))
+    sample_chunk_indices = np.unique(
+        np.linspace(0, number_of_chunks_along_first_axis - 1, num=number_of_sample_chunks).astype(int)
+    )
+    raw_bytes = 0
+    compressed_bytes = 0
+    for chunk_index in sample_chunk_indices:
+        start = chunk_index * chunk_shape[0]
+        selection = (slice(start, min(start + chunk_shape[0], maxshape[0])),) + tuple(
+            slice(0, min(chunk_axis_length, axis_length))
+            for chunk_axis_length, axis_length in zip(chunk_shape[1:], maxshape[1:])
+        )
+        chunk = np.ascontiguousarray(
+            data_chunk_iterator._get_data(selection=selection), dtype=data_chunk_iterator.dtype
+        )
+        raw_bytes += chunk.nbytes
+        compressed_bytes += len(zlib.compress(chunk.tobytes(), level))
+    return compressed_bytes / raw_bytes if raw_bytes else 1.0
+
+
+def get_dataset_plan(name: str, dataset_io: H5DataIO, number_of_sample_chunks: int = 3) -> dict:
+    """
+    Describe a dataset to be written: its shape, dtype, chunking, size and estimated compressed size.
+
+    Parameters
+    ----------
+    name: str
+        The name of the dataset.
+    dataset_io: H5DataIO
+        The data chunk iterator of the dataset, wrapped with its compression settings.
+    number_of_sample_chunks: int, default: 3
+        The number of chunks compressed to estimate the compressed size; see `estimate_compression_ratio`.
+    """
+    data_chunk_iterator = dataset_io.data
+    io_settings = dataset_io.io_settings
+    itemsize = np.dtype(data_chunk_iterator.dtype).itemsize
+    raw_bytes = int(np.prod(data_chunk_iterator.maxshape, dtype="int64")) * itemsize
+    compression_ratio = estimate_compression_ratio(
+        data_chunk_iterator=data_chunk_iterator,
+        compression=io_settings.get("compression"),
+        compression_opts=io_settings.get("compression_opts"),
+        number_of_sample_chunks=number_of_sample_chunks,
+    )
+    return dict(
+        name=name,
+        shape=[int(axis_length) for axis_length in data_chunk_iterator.maxshape],
+        dtype=str(np.dtype(data_chunk_iterator.dtype)),
+        chunk_shape=[int(axis_length) for axis_length in data_chunk_iterator.chunk_shape],
+        buffer_shape=[int(axis_length) for axis_length in data_chunk_iterator.buffer_shape],
+        compression=io_settings.get("compression"),
+        bytes=raw_bytes,
+        estimated_compressed_bytes=None if compression_ratio is None else int(raw_bytes * compression_ratio),
+        buffer_bytes=int(np.prod(data_chunk_iterator.buffer_shape, dtype="int64")) * itemsize,
+    )
@@ -3,7 +3,9 @@ import os
 import subprocess
 import json
 import re
-from typing import Dict, Optional, List, Union, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional, List, Union, Tuple
 from pathlib import Path
 from warnings import warn
 from shutil import rmtree
@@ -17,7 +19,7 @@ from dandi.download import download as dandi_download
 from dandi.organize import organize as dandi_organize
 from dandi.upload import upload as dandi_upload
 
-from ..utils import FolderPathType, OptionalFolderPathType
+from ..utils import FilePathType, FolderPathType, OptionalFolderPathType
 
 try:  # pragma: no cover
     import globus_cli
@@ -67,6 +69,199 @@ def get_globus_dataset_content_sizes(
     return files_and_sizes
 
 
+def _submit_transfer_request(
+    source_endpoint_id: str,
+    source_files: List[List[str]],
+    destination_endpoint_id: str,
+    destination_folder_path: Path,
+    max_workers: int = 8,
+) -> Dict[str, int]:
+    """Private helper for sending all batched transfer requests to Globus and sizing each of their tasks."""
+    # .as_posix() to ensure correct string form Globus expects
+    # ':' replacement for Windows drives
+    source_folders = [
+        Path(batched_source_files[0]).parent.as_posix().replace(":", "") for batched_source_files in source_files
+    ]
+    destination_folder_name = destination_folder_path.as_posix().replace(":", "")
+    transfer_commands = []
+    for j, (source_folder, batched_source_files) in enumerate(zip(source_folders, source_files)):
+        paths_file = destination_folder_path / f"paths_{j}.txt"
+        with open(file=paths_file, mode="w") as f:
+            for source_file in batched_source_files:
+                file_name = Path(source_file).name
+                f.write(f"{file_name} {file_name}\n")
+        transfer_commands.append(
+            "globus transfer "
+            f"{source_endpoint_id}:{source_folder} {destination_endpoint_id}:/{destination_folder_name} "
+            f"--batch {paths_file}"
+        )
+
+    # All batches are submitted, and each distinct source folder is listed, concurrently
+    unique_source_folders = list(dict.fromkeys(source_folders))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        transfer_messages = list(
+            executor.map(lambda command: deploy_process(command=command, catch_output=True), transfer_commands)
+        )
+        folder_content_sizes = dict(
+            zip(
+                unique_source_folders,
+                executor.map(
+                    lambda source_folder: get_globus_dataset_content_sizes(
+                        globus_endpoint_id=source_endpoint_id, path=source_folder
+                    ),
+                    unique_source_folders,
+                ),
+            )
+        )
+    for j in range(len(source_files)):
+        (destination_folder_path / f"paths_{j}.txt").unlink()
+
+    task_total_sizes = dict()
+    failed_transfer_messages = []
+    for source_folder, batched_source_files, transfer_message in zip(source_folders, source_files, transfer_messages):
+        task_id = re.findall(
+            pattern=(
+                "^Message: The transfer has been accepted and a task has been created and queued for "
+                "execution\nTask ID: (.+)$"
+            ),
+            string=transfer_message,
+        )
+        if not task_id:
+            failed_transfer_messages.append(transfer_message)
+            continue
+        task_total_sizes.update(
+            {
+                task_id[0]: sum(
+                    [
+                        folder_content_sizes[source_folder][Path(source_file).name]
+                        for source_file in batched_source_files
+                    ]
+                )
+            }
+        )
+    # The other batches were accepted regardless, so their tasks are reported to be tracked or cancelled
+    assert not failed_transfer_messages, (
+        f"Transfer submission failed for {len(failed_transfer_messages)} of {len(source_files)} batches! "
+        f"The tasks {list(task_total_sizes)} were accepted and are still running. Globus output:\n"
+        + "\n".join(failed_transfer_messages)
+    )
+    return task_total_sizes
+
+
+def _get_globus_task_status(task_id: str) -> dict:
+    """Private helper for requesting the status of a single Globus task."""
+    return json.loads(deploy_process(command=f"globus task show {task_id} -Fjson", catch_output=True))
+
+
+def track_globus_transfers(
+    task_total_sizes: Dict[str, int],
+    display_progress: bool = True,
+    minimum_progress_update_rate: float = 1.0,
+    progress_update_rate: float = 60.0,
+    progress_update_timeout: float = 600.0,
+    max_workers: int = 8,
+) -> bool:
+    """
+    Track the progress of Globus transfer tasks until they all succeed or the tracking times out.
+
+    The status of all unfinished tasks is requested concurrently by a pool of threads that is reused on every update.
+    Each request deploys a process, so the interval between updates adapts to the transfers:
+
+    - While the tasks progress, the next update is aimed at half of the earliest estimated completion of a task,
+      from the rate at which each task progressed since the last update. The interval grows up to
+      'progress_update_rate' while the transfers are far from completion, and only tightens as one of them nears it.
+    - When the status of a task changes (e.g., it succeeds), the next update comes after 'minimum_progress_update_rate'.
+    - When no task made progress, the interval doubles, up to 'progress_update_rate'.
+
+    Parameters
+    ----------
+    task_total_sizes : dict
+        The total size in bytes of each task, keyed by task ID.
+    display_progress : bool, optional
+        Whether or not to display the transfer as progress bars using `tqdm`.
+        Defaults to True.
+    minimum_progress_update_rate : float, optional
+        The shortest interval (in seconds) between updates of the progress of the tasks.
+        Defaults to 1 second.
+    progress_update_rate : float, optional
+        The longest interval (in seconds) between updates of the progress of the tasks.
+        Defaults to 60 seconds.
+    progress_update_timeout : float, optional
+        Maximum amount of time to monitor the transfer progress.
+        Defaults to 10 minutes.
+    max_workers : int, optional
+        The maximum number of task statuses requested at the same time.
+        Defaults to 8.
+
+    Returns
+    -------
+    success : bool
+        Whether all tasks succeeded before the tracking timed out.
+    """
+    if display_progress:
+        all_pbars = {
+            task_id: tqdm(desc=f"Transferring batch #{j}...", total=total_size, position=j, leave=True)
+            for j, (task_id, total_size) in enumerate(task_total_sizes.items(), start=1)
+        }
+    unfinished_task_ids = list(task_total_sizes)
+    bytes_transferred = {task_id: 0 for task_id in task_total_sizes}
+    task_statuses = {task_id: None for task_id in task_total_sizes}
+    update_rate = minimum_progress_update_rate
+    start_time = time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        last_update_time = time()
+        while unfinished_task_ids and time() - start_time <= progress_update_timeout:
+            status_changed = False
+            remaining_seconds = []
+            polled_task_ids = list(unfinished_task_ids)
+            task_messages = list(executor.map(_get_globus_task_status, polled_task_ids))
+            update_time = time()
+            for task_id, task_message in zip(polled_task_ids, task_messages):
+                assert (
+                    task_message["status"] != "FAILED"
+                ), f"Something went wrong with the transfer! Please manually inspect the task with ID '{task_id}'."
+                status_changed |= task_statuses[task_id] not in (None, task_message["status"])
+                task_statuses[task_id] = task_message["status"]
+                new_bytes_transferred = task_message["bytes_transferred"] - bytes_transferred[task_id]
+                if new_bytes_transferred > 0:
+                    task_rate = new_bytes_transferred / max(update_time - last_update_time, 1e-3)
+                    remaining_seconds.append(
+                        (task_total_sizes[task_id] - task_message["bytes_transferred"]) / task_rate
+                    )
+                bytes_transferred[task_id] = task_message["bytes_transferred"]
+                if display_progress:
+                    all_pbars[task_id].update(n=task_message["bytes_transferred"] - all_pbars[task_id].n)
+                if task_message["status"] == "SUCCEEDED":
+                    status_changed = True
+                    unfinished_task_ids.remove(task_id)
+            last_update_time = update_time
+            if unfinished_task_ids:
+                update_rate = _get_next_update_rate(
+                    update_rate=update_rate,
+                    remaining_seconds=remaining_seconds,
+                    status_changed=status_changed,
+                    minimum_progress_update_rate=minimum_progress_update_rate,
+                    progress_update_rate=progress_update_rate,
+                )
+                sleep(update_rate)
+    return not unfinished_task_ids
+
+
+def _get_next_update_rate(
+    update_rate: float,
+    remaining_seconds: List[float],
+    status_changed: bool,
+    minimum_progress_update_rate: float,
+    progress_update_rate: float,
+) -> float:
+    """Private helper for scheduling the next update of track_globus_transfers."""
+    if status_changed:
+        return minimum_progress_update_rate
+    if remaining_seconds:
+        return min(max(min(remaining_seconds) / 2, minimum_progress_update_rate), progress_update_rate)
+    return min(2 * update_rate, progress_update_rate)
+
+
 def transfer_globus_content(
     source_endpoint_id: str,
     source_files: Union[str, List[List[str]]],
@@ -101,8 +296,10 @@ def transfer_globus_content(
         Whether or not to display the transfer as progress bars using `tqdm`.
         Defaults to True.
     progress_update_rate : float, optional
-        How frequently (in seconds) to update the progress bar display tracking the data transfer.
-        Defaults to 30 seconds.
+        The longest interval (in seconds) between updates of the progress bar display tracking the data transfer.
+        Updates are more frequent near the completion of a transfer or when the status of a task changes; see
+        `track_globus_transfers`.
+        Defaults to 60 seconds.
     progress_update_tiemout : float, optional
         Maximum amount of time to monitor the transfer progress.
         You may wish to set this to be longer when transferring very large files.
@@ -115,93 +312,6 @@ def transfer_globus_content(
     task_ids : list of strings
         List of the task IDs submitted to globus, if further information is needed to reestablish tracking or terminate.
     """
-
-    def _submit_transfer_request(
-        source_endpoint_id: str,
-        source_files: Union[str, List[List[str]]],
-        destination_endpoint_id: str,
-        destination_folder_path: Path,
-    ) -> Dict[str, int]:
-        """Send transfer request to Globus."""
-        folder_content_sizes = dict()
-        task_total_sizes = dict()
-        for j, batched_source_files in enumerate(source_files):
-            paths_file = destination_folder_path / f"paths_{j}.txt"
-            # .as_posix() to ensure correct string form Globus expects
-            # ':' replacement for Windows drives
-            source_folder = Path(batched_source_files[0]).parent.as_posix().replace(":", "")
-            destination_folder_name = destination_folder_path.as_posix().replace(":", "")
-            with open(file=paths_file, mode="w") as f:
-                for source_file in batched_source_files:
-                    file_name = Path(source_file).name
-                    f.write(f"{file_name} {file_name}\n")
-
-            transfer_command = (
-                "globus transfer "
-                f"{source_endpoint_id}:{source_folder} {destination_endpoint_id}:/{destination_folder_name} "
-                f"--batch {paths_file}"
-            )
-            transfer_message = deploy_process(
-                command=transfer_command,
-                catch_output=True,
-            )
-            task_id = re.findall(
-                pattern=(
-                    "^Message: The transfer has been accepted and a task has been created and queued for "
-                    "execution\nTask ID: (.+)$"
-                ),
-                string=transfer_message,
-            )
-            paths_file.unlink()
-            assert task_id, f"Transfer submission failed! Globus output:\n{transfer_message}."
-
-            if source_folder not in folder_content_sizes:
-                contents = get_globus_dataset_content_sizes(globus_endpoint_id=source_endpoint_id, path=source_folder)
-                folder_content_sizes.update({source_folder: contents})
-            task_total_sizes.update(
-                {
-                    task_id[0]: sum(
-                        [
-                            folder_content_sizes[source_folder][Path(source_file).name]
-                            for source_file in batched_source_files
-                        ]
-                    )
-                }
-            )
-        return task_total_sizes
-
-    def _track_transfer(
-        task_total_sizes: Dict[str, int],
-        display_progress: bool = True,
-        progress_update_rate: float = 60.0,
-        progress_update_timeout: float = 600.0,
-    ) -> bool:
-        """Track the progress of transfers."""
-        if display_progress:
-            all_pbars = [
-                tqdm(desc=f"Transferring batch #{j}...", total=total_size, position=j, leave=True)
-                for j, total_size in enumerate(task_total_sizes.values(), start=1)
-            ]
-        all_status = [False for _ in task_total_sizes]
-        success = all(all_status)
-        time_so_far = 0.0
-        start_time = time()
-        while not success and time_so_far <= progress_update_timeout:
-            time_so_far = time() - start_time
-            for j, (task_id, task_total_size) in enumerate(task_total_sizes.items()):
-                task_update = deploy_process(f"globus task show {task_id} -Fjson", catch_output=True)
-                task_message = json.loads(task_update)
-                all_status[j] = task_message["status"] == "SUCCEEDED"
-                assert (
-                    all_status[j] != "OK" or all_status[j] != "SUCCEEDED"
-                ), f"Something went wrong with the transfer! Please manually inspect the task with ID '{task_id}'."
-                if display_progress:
-                    all_pbars[j].update(n=task_message["bytes_transferred"] - all_pbars[j].n)
-            success = all(all_status)
-            if not success:
-                sleep(progress_update_rate)
-        return success
-
     source_files = [[source_files]] if isinstance(source_files, str) else source_files
     destination_folder_path = Path(destination_folder)
     destination_folder_path.mkdir(exist_ok=True)
@@ -220,7 +330,7 @@ def transfer_globus_content(
         destination_endpoint_id=destination_endpoint_id,
         destination_folder_path=destination_folder_path,
     )
-    success = _track_transfer(
+    success = track_globus_transfers(
         task_total_sizes=task_total_sizes,
         display_progress=display_progress,
         progress_update_rate=progress_update_rate,
@@ -252,6 +362,10 @@ def estimate_total_conversion_runtime(
         Estimate of the upload rate of a single file to the DANDI archive.
     compression_ratio: float, optional
         Esimate of the final average compression ratio for datasets in the file. Can vary widely.
+
+    The conversion rate and compression ratio of a dataset can be measured on a sample of its sessions with
+    `calibrate_conversion_from_yaml` and passed on through `get_calibrated_rates` from
+    neuroconv.tools.throughput_calibration.
     """
     c = 1 / compression_ratio  # compressed_size = total_size * c
     return total_mb * (1 / transfer_rate_mb + 1 / conversion_rate_mb + c / upload_rate_mb)
@@ -280,6 +394,10 @@ def estimate_s3_conversion_cost(
         Estimate of the upload rate of a single file to the DANDI archive.
     compression_ratio: float, optional
         Esimate of the final average compression ratio for datasets in the file. Can vary widely.
+
+    The conversion rate and compression ratio of a dataset can be measured on a sample of its sessions with
+    `calibrate_conversion_from_yaml` and passed on through `get_calibrated_rates` from
+    neuroconv.tools.throughput_calibration.
     """
     c = 1 / compression_ratio  # compressed_size = total_size * c
     total_mb_s = (
@@ -290,6 +408,138 @@ def estimate_s3_conversion_cost(
     return cost_mb_s * total_mb_s
 
 
+def _remove_path(path: Union[FilePathType, FolderPathType]):
+    """Private helper for removing a file or folder produced by a stage of a pipelined conversion."""
+    path = Path(path)
+    if path.is_dir():
+        rmtree(path=path)
+    elif path.exists():
+        path.unlink()
+
+
+def run_conversion_pipeline(
+    session_ids: Iterable[str],
+    transfer: Callable[[str], FolderPathType],
+    convert: Callable[[str, FolderPathType], FilePathType],
+    upload: Callable[[str, FilePathType], None],
+    max_sessions_in_flight: int = 3,
+    max_concurrent_transfers: int = 1,
+    max_concurrent_conversions: int = 1,
+    max_concurrent_uploads: int = 1,
+    cleanup: bool = True,
+    keep_failed_sessions: bool = False,
+) -> Dict[str, str]:
+    """
+    Transfer, convert and upload sessions as a pipeline, so that only the sessions in flight occupy local disk.
+
+    As soon as the source data of a session has been transferred it is converted, and as soon as its NWBFile has
+    been written it is uploaded, after which its source data and NWBFile are removed. A session is in flight from the
+    start of its transfer until the end of its upload; new transfers only start while fewer than
+    'max_sessions_in_flight' sessions are in flight, so the local disk holds the data of at most that many sessions.
+
+    Each stage is a function of the session ID, e.g., wrapping `transfer_globus_content`, `NWBConverter.run_conversion`
+    and `automatic_dandi_upload`, and runs in its own pool of threads.
+
+    By default, the source data of a session that fails in any stage is removed like that of an uploaded session, so
+    that a failure frees its place on local disk. A failing stage returns no path, so the transfer and convert
+    functions should remove their own partial output. The NWBFile of a session whose upload fails is kept, so that its
+    upload can be retried without converting it again; it no longer counts towards the sessions in flight.
+    With keep_failed_sessions=True, all the data of failed sessions is kept for inspection instead, and they stay
+    counted as in flight so that the local disk still holds the data of at most 'max_sessions_in_flight' sessions.
+    Once failed sessions occupy all of those places, the remaining sessions are not started and are reported as failed.
+
+    Parameters
+    ----------
+    session_ids : iterable of strings
+        The sessions to process, in order of transfer.
+    transfer : callable
+        Called as transfer(session_id), transfers the source data of a session and returns its local path.
+    convert : callable
+        Called as convert(session_id, source_path), converts the source data of a session and returns the path of
+        the written NWBFile.
+    upload : callable
+        Called as upload(session_id, nwbfile_path), uploads the NWBFile of a session.
+    max_sessions_in_flight : int, default: 3
+        The maximum number of sessions whose data is held on local disk at any time.
+    max_concurrent_transfers : int, default: 1
+    max_concurrent_conversions : int, default: 1
+    max_concurrent_uploads : int, default: 1
+    cleanup : bool, default: True
+        Whether to remove the source data and NWBFile of each session once it has been uploaded, and the source data
+        of each session that has failed.
+    keep_failed_sessions : bool, default: False
+        Whether to keep the source data and NWBFile of failed sessions on local disk for inspection, in which case
+        they keep occupying their place among the sessions in flight.
+
+    Returns
+    -------
+    failed_sessions : dict
+        The error message of each session that failed, keyed by session ID.
+    """
+    assert max_sessions_in_flight >= 1, "'max_sessions_in_flight' must be at least 1!"
+
+    pending_session_ids = deque(session_ids)
+    stage_functions = dict(transfer=transfer, convert=convert, upload=upload)
+    executors = dict(
+        transfer=ThreadPoolExecutor(max_workers=max_concurrent_transfers),
+        convert=ThreadPoolExecutor(max_workers=max_concurrent_conversions),
+        upload=ThreadPoolExecutor(max_workers=max_concurrent_uploads),
+    )
+    futures = dict()  # future -> (stage, session_id)
+    source_paths = dict()
+    nwbfile_paths = dict()
+    failed_sessions = dict()
+    number_of_sessions_in_flight = 0
+
+    def _submit(stage: str, session_id: str, *args):
+        futures[executors[stage].submit(stage_functions[stage], session_id, *args)] = (stage, session_id)
+
+    try:
+        while pending_session_ids or futures:
+            while pending_session_ids and number_of_sessions_in_flight < max_sessions_in_flight:
+                _submit("transfer", pending_session_ids.popleft())
+                number_of_sessions_in_flight += 1
+
+            if not futures:
+                # Every place in flight is held by the kept data of a failed session
+                for session_id in pending_session_ids:
+                    failed_sessions[session_id] = (
+                        "not started since the local disk holds the data of "
+                        f"{max_sessions_in_flight} failed sessions"
+                    )
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, session_id = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exception:
+                    failed_sessions[session_id] = f"{stage} failed with {type(exception).__name__}: {exception}"
+                    if not keep_failed_sessions:
+                        # An NWBFile only exists if the upload failed, and is kept to retry the upload
+                        if cleanup and session_id in source_paths:
+                            _remove_path(path=source_paths[session_id])
+                        number_of_sessions_in_flight -= 1
+                    continue
+
+                if stage == "transfer":
+                    source_paths[session_id] = result
+                    _submit("convert", session_id, result)
+                elif stage == "convert":
+                    nwbfile_paths[session_id] = result
+                    _submit("upload", session_id, result)
+                else:
+                    if cleanup:
+                        _remove_path(path=source_paths[session_id])
+                        _remove_path(path=nwbfile_paths[session_id])
+                    number_of_sessions_in_flight -= 1
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+    return failed_sessions
+
+
 def automatic_dandi_upload(
     dandiset_id: str,
     nwb_folder_path: FolderPathType,
@@ -4,4 +4,9 @@ from .neo import (
     add_icephys_electrode,
     add_icephys_recordings,
     write_neo_to_nwb,
+    get_electrodes_metadata,
+    get_command_traces,
+    get_conversion_from_unit,
+    get_nwb_metadata,
+    add_all_to_nwbfile,
 )
@@ -122,6 +122,7 @@ def make_or_load_nwbfile(
     metadata: Optional[dict] = None,
     overwrite: bool = False,
     verbose: bool = True,
+    exhaust_dci: bool = True,
 ):
     """
     Context for automatically handling decision of write vs. append for writing an NWBFile.
@@ -141,6 +142,9 @@ def make_or_load_nwbfile(
     verbose: bool, optional
         If 'nwbfile_path' is specified, informs user after a successful write operation.
         The default is True.
+    exhaust_dci: bool, default: True
+        If 'nwbfile_path' is specified, whether to write each DataChunkIterator to completion in turn.
+        If False, the buffers of all DataChunkIterators are written in round-robin order instead.
     """
     nwbfile_path_in = Path(nwbfile_path) if nwbfile_path else None
     assert not (nwbfile_path is None and nwbfile is None and metadata is None), (
@@ -169,7 +173,7 @@ def make_or_load_nwbfile(
     finally:
         if nwbfile_path:
             try:
-                io.write(nwbfile)
+                io.write(nwbfile, exhaust_dci=exhaust_dci)
 
                 if verbose:
                     print(f"NWB file saved at {nwbfile_path}!")
@@ -8,8 +8,12 @@ from .roiextractors import (
     add_two_photon_series,
     add_epochs,
     write_imaging,
+    get_nwb_multi_plane_imaging_metadata,
+    write_multi_plane_imaging,
     get_nwb_segmentation_metadata,
     add_summary_images,
+    add_accumulated_summary_images,
     write_segmentation,
     check_if_imaging_fits_into_memory,
+    get_default_ophys_metadata,
 )
@@ -5,6 +5,8 @@ import numpy as np
 from hdmf.data_utils import GenericDataChunkIterator
 from roiextractors import ImagingExtractor
 
+from .summaryimages import SummaryImagesAccumulator
+
 
 class ImagingExtractorDataChunkIterator(GenericDataChunkIterator):
     """DataChunkIterator for ImagingExtractor objects primarily used when writing imaging data to an NWB file."""
@@ -18,6 +20,7 @@ class ImagingExtractorDataChunkIterator(GenericDataChunkIterator):
         chunk_shape: Optional[tuple] = None,
         display_progress: bool = False,
         progress_bar_options: Optional[dict] = None,
+        compute_summary_images: bool = False,
     ):
         """
         Initialize an Iterable object which returns DataChunks with data and their selections on each iteration.
@@ -51,6 +54,10 @@ class ImagingExtractorDataChunkIterator(GenericDataChunkIterator):
         progress_bar_options : dict, optional
             Dictionary of keyword arguments to be passed directly to tqdm.
             See https://github.com/tqdm/tqdm#parameters for options.
+        compute_summary_images : bool, default: False
+            Accumulate the statistics behind the mean, max, standard deviation, and local correlation images from the
+            frames as they are read. The results are available from the `summary_images_accumulator` attribute once
+            the iteration is complete.
         """
         self.imaging_extractor = imaging_extractor
 
@@ -74,6 +81,15 @@ class ImagingExtractorDataChunkIterator(GenericDataChunkIterator):
         if buffer_shape is None:
             buffer_shape = self._get_scaled_buffer_shape(buffer_gb=buffer_gb, chunk_shape=chunk_shape)
 
+        self.summary_images_accumulator = None
+        if compute_summary_images:
+            self.summary_images_accumulator = SummaryImagesAccumulator(
+                frame_shape=self._maxshape[1:],
+                num_frames=self._maxshape[0],
+                dtype=self._dtype,
+                imaging_extractor=self.imaging_extractor,
+            )
+
         super().__init__(
             buffer_shape=buffer_shape,
             chunk_shape=chunk_shape,
@@ -117,4 +133,10 @@ class ImagingExtractorDataChunkIterator(GenericDataChunkIterator):
             end_frame=selection[0].stop,
         )
         tranpose_axes = (0, 2, 1) if len(data.shape) == 3 else (0, 2, 1, 3)
-        return data.transpose(tranpose_axes)[(slice(0, self.buffer_shape[0]),) + selection[1:]]
+        data = data.transpose(tranpose_axes)
+
+        # The full frames are read for every spatial selection, so only accumulate them once per block of frames
+        if self.summary_images_accumulator is not None and all(axis.start == 0 for axis in selection[1:]):
+            self.summary_images_accumulator.update(frames=data)
+
+        return data[(slice(0, self.buffer_shape[0]),) + selection[1:]]
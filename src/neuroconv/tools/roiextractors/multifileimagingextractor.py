@@ -0,0 +1,388 @@
+"""Virtual ImagingExtractors that present a sequence of split imaging files as a single continuous series."""
+import json
+import struct
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import List, Optional, Tuple
+
+import numpy as np
+from natsort import natsorted
+from roiextractors import ImagingExtractor
+
+from ...utils import FilePathType, FolderPathType, FloatType, ArrayType
+
+try:
+    import tifffile
+
+    HAVE_TIFFFILE = True
+except ImportError:
+    HAVE_TIFFFILE = False
+
+try:
+    from ScanImageTiffReader import ScanImageTiffReader
+
+    HAVE_SCAN_IMAGE_TIFF = True
+except ImportError:
+    HAVE_SCAN_IMAGE_TIFF = False
+
+
+def _read_next_ifd_offset(tif, ifd_offset: int) -> int:
+    """Return the offset of the image file directory (IFD) that follows the one at ifd_offset, or 0 if it is the last."""
+    tiff_format = tif.tiff
+    file_handle = tif.filehandle
+    file_handle.seek(ifd_offset)
+    (number_of_tags,) = struct.unpack(tiff_format.tagnoformat, file_handle.read(tiff_format.tagnosize))
+    file_handle.seek(ifd_offset + tiff_format.tagnosize + number_of_tags * tiff_format.tagsize)
+    (next_ifd_offset,) = struct.unpack(tiff_format.offsetformat, file_handle.read(tiff_format.offsetsize))
+    return next_ifd_offset
+
+
+def _count_evenly_spaced_tiff_pages(tif) -> Optional[int]:
+    """
+    Count the pages of a TIFF file whose pages after the first are evenly spaced up to the end of the file, as
+    written by tifffile and many acquisition systems, without walking the chain of their image file directories.
+
+    The count is inferred from the spacing of the second and third pages and the size of the file, and only accepted
+    if the directories of the last two pages it implies end the chain. None is returned for other files.
+    """
+    pages = tif.pages
+    try:
+        second_offset, third_offset = pages[1].offset, pages[2].offset
+    except IndexError:
+        return None
+    stride = third_offset - second_offset
+    if stride <= 0 or (tif.filehandle.size - second_offset) % stride != 0:
+        return None
+    num_pages = (tif.filehandle.size - second_offset) // stride + 1
+    last_offset = second_offset + (num_pages - 2) * stride
+    if num_pages < 4 or _read_next_ifd_offset(tif=tif, ifd_offset=last_offset - stride) != last_offset:
+        return None
+    if _read_next_ifd_offset(tif=tif, ifd_offset=last_offset) != 0:
+        return None
+    return num_pages
+
+
+def _read_tiff_header(file_path: Path, max_frames: Optional[int] = None) -> Tuple[int, Tuple[int, int], np.dtype]:
+    """
+    Read the number of pages, the image size, and the dtype of a TIFF file with one frame per page.
+
+    The pages of files with evenly spaced pages are counted from the size of the file. Otherwise, counting all pages
+    walks the chain of every image file directory (IFD) of the file; if max_frames is set, only the directories of
+    the first max_frames pages are parsed.
+    """
+    with tifffile.TiffFile(file_path) as tif:
+        first_page = tif.pages[0]
+        assert len(first_page.shape) == 2, (
+            f"The pages of '{file_path}' are not single-channel images! "
+            "Multi-channel or volumetric pages are not yet supported."
+        )
+        num_evenly_spaced_pages = _count_evenly_spaced_tiff_pages(tif=tif) if max_frames is None else None
+        if num_evenly_spaced_pages is not None:
+            num_frames = num_evenly_spaced_pages
+        elif max_frames is None:
+            num_frames = len(tif.pages)
+        else:
+            num_frames = 0
+            for _ in tif.pages:  # Pages are indexed lazily when iterated
+                num_frames += 1
+                if num_frames == max_frames:
+                    break
+        return num_frames, tuple(first_page.shape), np.dtype(first_page.dtype)
+
+
+def has_single_page_frames(file_path: FilePathType) -> bool:
+    """
+    Whether every frame of a TIFF file is one single-channel page, as read by MultiTiffImagingExtractor.
+
+    Only the first page and the metadata it holds are read. ImageJ and OME files, whose frames may be stored after a
+    single page or arranged by their metadata, and files whose shape metadata describes more than a stack of 2-D
+    pages, are reported as not having single page frames.
+    """
+    with tifffile.TiffFile(file_path) as tif:
+        first_page = tif.pages[0]
+        first_page_shape = tuple(first_page.shape)
+        if len(first_page_shape) != 2 or tif.is_imagej or tif.is_ome:
+            return False
+        if tif.is_shaped:
+            try:
+                shaped_metadata = json.loads(first_page.shaped_description)
+            except (TypeError, ValueError):
+                return False
+            shape = tuple(shaped_metadata.get("shape", first_page_shape))
+            return not shaped_metadata.get("truncated", False) and len(shape) <= 3 and shape[-2:] == first_page_shape
+        return True
+
+
+class MultiFileImagingExtractor(ImagingExtractor, ABC):
+    """
+    Abstract ImagingExtractor that concatenates the frames of many files along time.
+
+    Only the header of each file is read on initialization to index the number of frames it contains.
+    Frames are decoded on request; when a request spans several files, each file is decoded in its own thread.
+    The files read are kept open, since opening a file indexes its frames again (e.g., walking the chained image
+    file directories of a TIFF file), so that reading a file block by block indexes it only once. At most
+    max_open_files files that are not being read are kept open, the least recently read one being closed first;
+    a file is never closed while a thread reads it.
+    If max_frames is set, the headers are read in order only until that many frames are indexed, so that a stub
+    of a large session does not scan the headers of every file.
+    """
+
+    extractor_name = "MultiFileImaging"
+    installed = True
+    installation_mesg = ""
+    mode = "folder"
+    max_open_files = 16
+
+    def __init__(
+        self,
+        folder_path: FolderPathType,
+        sampling_frequency: FloatType,
+        file_pattern: str = "*.tif",
+        max_workers: Optional[int] = None,
+        max_frames: Optional[int] = None,
+    ):
+        """
+        Parameters
+        ----------
+        folder_path : FolderPathType
+            Path to the folder containing the split imaging files.
+        sampling_frequency : float
+            The frequency at which the frames were sampled, in Hz.
+        file_pattern : str, default: "*.tif"
+            Glob pattern, relative to the folder_path, selecting the files to concatenate.
+            The files are concatenated in natural sort order of their names.
+        max_workers : int, optional
+            Maximum number of threads used to read headers and decode frames from different files.
+            The default is chosen by concurrent.futures.ThreadPoolExecutor.
+        max_frames : int, optional
+            Only index the files, and the frames within them, needed for the first max_frames frames.
+            The default indexes all frames of all files.
+        """
+        super().__init__()
+        self.folder_path = Path(folder_path)
+        self.file_paths = natsorted(self.folder_path.glob(file_pattern), key=str)
+        assert self.file_paths, f"No files matching the pattern '{file_pattern}' were found in '{folder_path}'!"
+        self._sampling_frequency = sampling_frequency
+        self._max_workers = max_workers
+        self._open_files = OrderedDict()  # file_path -> [file, lock]
+        self._open_files_lock = Lock()
+
+        if max_frames is None:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                headers = list(executor.map(self._read_header, self.file_paths))
+        else:
+            assert max_frames > 0, f"max_frames ({max_frames}) must be greater than zero!"
+            headers = []
+            num_frames_to_index = max_frames
+            for file_path in self.file_paths:
+                headers.append(self._read_header(file_path=file_path, max_frames=num_frames_to_index))
+                num_frames_to_index -= headers[-1][0]
+                if num_frames_to_index <= 0:
+                    break
+            self.file_paths = self.file_paths[: len(headers)]
+        num_frames_per_file, image_sizes, dtypes = zip(*headers)
+        assert len(set(image_sizes)) == 1, "All files must have the same image size!"
+        assert len(set(dtypes)) == 1, "All files must have the same data type!"
+
+        self._num_rows, self._num_columns = image_sizes[0]
+        self._dtype = dtypes[0]
+        self._num_channels = 1
+        self._start_frames = np.cumsum([0, *num_frames_per_file])
+        self._num_frames = int(self._start_frames[-1])
+
+        self._kwargs = dict(
+            folder_path=str(self.folder_path.absolute()),
+            sampling_frequency=sampling_frequency,
+            file_pattern=file_pattern,
+            max_workers=max_workers,
+            max_frames=max_frames,
+        )
+
+    @abstractmethod
+    def _read_header(self, file_path: Path, max_frames: Optional[int] = None) -> Tuple[int, Tuple[int, int], np.dtype]:
+        """
+        Return the number of frames, the image size, and the dtype of a single file without decoding any frame.
+
+        If max_frames is set, the number of frames is only counted up to max_frames.
+        """
+        pass
+
+    @abstractmethod
+    def _open_file(self, file_path: Path):
+        """Open a single file for reading its frames. The returned object must have a close method."""
+        pass
+
+    @abstractmethod
+    def _read_open_file(self, file, start_frame: int, end_frame: int) -> np.ndarray:
+        """Decode the frames [start_frame, end_frame) of a file opened by _open_file."""
+        pass
+
+    def _acquire_open_file(self, file_path: Path) -> list:
+        """Return the [file, lock, number_of_readers] of a file, opening it if needed, and count one more reader."""
+        with self._open_files_lock:
+            open_file = self._open_files.get(file_path)
+            if open_file is None:
+                open_file = [self._open_file(file_path=file_path), Lock(), 0]
+                self._open_files[file_path] = open_file
+            else:
+                self._open_files.move_to_end(file_path)
+            open_file[2] += 1
+            return open_file
+
+    def _release_open_file(self, open_file: list):
+        """Count one less reader of an open file, and close the least recently read files in excess of the bound."""
+        with self._open_files_lock:
+            open_file[2] -= 1
+            number_of_files_to_close = len(self._open_files) - self.max_open_files
+            unread_file_paths = [file_path for file_path, (_, _, readers) in self._open_files.items() if readers == 0]
+            for file_path in unread_file_paths[: max(number_of_files_to_close, 0)]:
+                self._open_files.pop(file_path)[0].close()
+
+    def _read_frames(self, file_path: Path, start_frame: int, end_frame: int) -> np.ndarray:
+        """Decode the frames [start_frame, end_frame) of a single file as a (frames, rows, columns) array."""
+        open_file = self._acquire_open_file(file_path=file_path)
+        try:
+            # A file is read through a single handle, so the reads of the same file are serialized
+            with open_file[1]:
+                frames = self._read_open_file(file=open_file[0], start_frame=start_frame, end_frame=end_frame)
+        finally:
+            self._release_open_file(open_file=open_file)
+        return frames.reshape(end_frame - start_frame, self._num_rows, self._num_columns)
+
+    def __del__(self):
+        for file, _, _ in getattr(self, "_open_files", dict()).values():
+            file.close()
+
+    def _split_frame_range(self, start_frame: int, end_frame: int) -> List[Tuple[int, int, int]]:
+        """Split a global frame range into (file_index, local_start_frame, local_end_frame) segments."""
+        first_file_index = np.searchsorted(self._start_frames, start_frame, side="right") - 1
+        last_file_index = np.searchsorted(self._start_frames, end_frame, side="left") - 1
+        segments = []
+        for file_index in range(first_file_index, last_file_index + 1):
+            file_start_frame = self._start_frames[file_index]
+            local_start_frame = max(start_frame, file_start_frame) - file_start_frame
+            local_end_frame = min(end_frame, self._start_frames[file_index + 1]) - file_start_frame
+            segments.append((file_index, int(local_start_frame), int(local_end_frame)))
+        return segments
+
+    def get_video(self, start_frame: Optional[int] = None, end_frame: Optional[int] = None, channel: int = 0):
+        start_frame, end_frame, _ = slice(start_frame, end_frame).indices(self._num_frames)
+        video = np.empty(shape=(max(end_frame - start_frame, 0), self._num_rows, self._num_columns), dtype=self._dtype)
+        if video.shape[0] == 0:
+            return video
+
+        segments = self._split_frame_range(start_frame=start_frame, end_frame=end_frame)
+        offsets = np.cumsum([0] + [local_end - local_start for _, local_start, local_end in segments])
+
+        def read_segment(segment_index: int):
+            file_index, local_start_frame, local_end_frame = segments[segment_index]
+            video[offsets[segment_index] : offsets[segment_index + 1]] = self._read_frames(
+                file_path=self.file_paths[file_index], start_frame=local_start_frame, end_frame=local_end_frame
+            )
+
+        if len(segments) == 1:
+            read_segment(segment_index=0)
+        else:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(read_segment, range(len(segments))))
+        return video
+
+    def get_frames(self, frame_idxs: ArrayType, channel: int = 0) -> np.ndarray:
+        squeeze_data = isinstance(frame_idxs, (int, np.integer))
+        frame_idxs = np.atleast_1d(frame_idxs)
+        assert np.all(frame_idxs < self._num_frames), "'frame_idxs' exceed number of frames"
+
+        # Only the runs of consecutive requested frames are decoded, grouped by file
+        unique_frame_idxs, inverse = np.unique(frame_idxs, return_inverse=True)
+        file_indices = np.searchsorted(self._start_frames, unique_frame_idxs, side="right") - 1
+        frames = np.empty(shape=(len(unique_frame_idxs), self._num_rows, self._num_columns), dtype=self._dtype)
+        files_to_read = np.unique(file_indices)
+
+        def read_file_frames(file_index: int):
+            positions = np.flatnonzero(file_indices == file_index)
+            local_frame_idxs = unique_frame_idxs[positions] - self._start_frames[file_index]
+            runs = np.split(np.arange(len(positions)), np.flatnonzero(np.diff(local_frame_idxs) != 1) + 1)
+            for run in runs:
+                frames[positions[run]] = self._read_frames(
+                    file_path=self.file_paths[file_index],
+                    start_frame=int(local_frame_idxs[run[0]]),
+                    end_frame=int(local_frame_idxs[run[-1]]) + 1,
+                )
+
+        if len(files_to_read) == 1:
+            read_file_frames(file_index=files_to_read[0])
+        else:
+            with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+                list(executor.map(read_file_frames, files_to_read))
+        frames = frames[inverse.reshape(-1)]
+        return frames.squeeze(axis=0) if squeeze_data else frames
+
+    def get_dtype(self) -> np.dtype:
+        return self._dtype
+
+    def get_image_size(self) -> Tuple[int, int]:
+        return (self._num_rows, self._num_columns)
+
+    def get_num_frames(self) -> int:
+        return self._num_frames
+
+    def get_sampling_frequency(self) -> float:
+        return self._sampling_frequency
+
+    def get_num_channels(self) -> int:
+        return self._num_channels
+
+    def get_channel_names(self) -> list:
+        pass
+
+
+class MultiTiffImagingExtractor(MultiFileImagingExtractor):
+    """Concatenates the frames of many TIFF files, one page per frame, along time."""
+
+    extractor_name = "MultiTiffImaging"
+    installed = HAVE_TIFFFILE
+    installation_mesg = "To use the MultiTiffImagingExtractor install tifffile: \n\n pip install tifffile\n\n"
+
+    def _read_header(self, file_path: Path, max_frames: Optional[int] = None) -> Tuple[int, Tuple[int, int], np.dtype]:
+        return _read_tiff_header(file_path=file_path, max_frames=max_frames)
+
+    def _open_file(self, file_path: Path):
+        # The TiffFile keeps the offsets of the pages it has walked
+        return tifffile.TiffFile(file_path)
+
+    def _read_open_file(self, file, start_frame: int, end_frame: int) -> np.ndarray:
+        return file.asarray(key=range(start_frame, end_frame))
+
+
+class MultiScanImageTiffImagingExtractor(MultiFileImagingExtractor):
+    """Concatenates the frames of many TIFF files produced by ScanImage along time."""
+
+    extractor_name = "MultiScanImageTiffImaging"
+    installed = HAVE_SCAN_IMAGE_TIFF
+    installation_mesg = (
+        "To use the MultiScanImageTiffImagingExtractor install scanimage-tiff-reader: "
+        "\n\n pip install scanimage-tiff-reader\n\n"
+    )
+
+    def _read_header(self, file_path: Path, max_frames: Optional[int] = None) -> Tuple[int, Tuple[int, int], np.dtype]:
+        # ScanImageTiffReader indexes every frame of the file to report its shape
+        if max_frames is not None and HAVE_TIFFFILE:
+            return _read_tiff_header(file_path=file_path, max_frames=max_frames)
+
+        with ScanImageTiffReader(str(file_path)) as io:
+            shape = io.shape()
+            assert len(shape) == 3, (
+                f"The data in '{file_path}' is not a single-channel series of frames! "
+                "Multi-channel or volumetric data is not yet supported."
+            )
+            num_frames = shape[0] if max_frames is None else min(shape[0], max_frames)
+            return num_frames, tuple(shape[1:]), np.dtype(io.dtype())
+
+    def _open_file(self, file_path: Path):
+        return ScanImageTiffReader(str(file_path))
+
+    def _read_open_file(self, file, start_frame: int, end_frame: int) -> np.ndarray:
+        return file.data(beg=start_frame, end=end_frame)
@@ -0,0 +1,202 @@
+"""ImagingExtractor views that de-interleave the planes of a multi-plane acquisition from a shared frame buffer."""
+from collections import OrderedDict, defaultdict
+from typing import Optional, Tuple
+from warnings import warn
+
+import numpy as np
+from roiextractors import ImagingExtractor
+
+from ...utils import ArrayType
+
+
+class InterleavedPlanesFrameBuffer:
+    """
+    Decodes blocks of volumes from an ImagingExtractor whose frames cycle through the planes of a volume.
+
+    Frame `k` of the source extractor is assumed to belong to plane `k % num_planes` of volume `k // num_planes`.
+    Each decoded block is split into one view per plane and held until every plane has consumed it, so that the
+    iterators of all planes share a single read pass over the source. If the held blocks exceed `buffer_gb`,
+    the oldest are dropped and decoded again when their pending planes request them.
+    """
+
+    def __init__(self, imaging_extractor: ImagingExtractor, num_planes: int, buffer_gb: float = 1.0):
+        """
+        Parameters
+        ----------
+        imaging_extractor : ImagingExtractor
+            The ImagingExtractor with the interleaved frames of all planes.
+        num_planes : int
+            The number of planes in each volume.
+        buffer_gb : float, default: 1.0
+            The upper bound on size in gigabytes (GB) of the decoded blocks held for the planes yet to consume them.
+        """
+        assert num_planes > 0, f"num_planes ({num_planes}) must be greater than zero!"
+        assert buffer_gb > 0, f"buffer_gb ({buffer_gb}) must be greater than zero!"
+        self.imaging_extractor = imaging_extractor
+        self.num_planes = num_planes
+        self.buffer_gb = buffer_gb
+
+        num_frames = imaging_extractor.get_num_frames()
+        self.num_volumes = num_frames // num_planes
+        if num_frames % num_planes:
+            warn(
+                f"The number of frames ({num_frames}) is not a multiple of the number of planes ({num_planes})! "
+                f"The trailing {num_frames % num_planes} frames of the incomplete last volume will be ignored."
+            )
+        self.dtype = imaging_extractor.get_dtype()
+
+        self.num_decoded_frames = 0
+        self._held_blocks = OrderedDict()  # (start_volume, end_volume) -> (nbytes, {plane_index: plane_video})
+        self._last_served = dict()  # plane_index -> ((start_volume, end_volume), plane_video)
+        self._consumed_planes = defaultdict(set)  # (start_volume, end_volume) -> {plane_index}
+
+    def _decode_volumes(self, start_volume: int, end_volume: int) -> np.ndarray:
+        """Read a range of volumes from the source as a (volumes, planes, rows, columns) array."""
+        frames = self.imaging_extractor.get_video(
+            start_frame=start_volume * self.num_planes, end_frame=end_volume * self.num_planes
+        )
+        self.num_decoded_frames += frames.shape[0]
+        return frames.reshape((end_volume - start_volume, self.num_planes) + frames.shape[1:])
+
+    def get_volumes(self, start_volume: int, end_volume: int) -> np.ndarray:
+        """Return a range of volumes as a (volumes, rows, columns, planes) array."""
+        return np.moveaxis(self._decode_volumes(start_volume=start_volume, end_volume=end_volume), 1, -1)
+
+    def get_plane_video(self, plane_index: int, start_volume: int, end_volume: int) -> np.ndarray:
+        """Return a range of the frames of a single plane as a (volumes, rows, columns) array."""
+        block_key = (start_volume, end_volume)
+
+        # Iterators request the same frames once per spatial selection of their buffer
+        last_block_key, last_plane_video = self._last_served.get(plane_index, (None, None))
+        if last_block_key == block_key:
+            return last_plane_video
+
+        if block_key in self._held_blocks and plane_index in self._held_blocks[block_key][1]:
+            _, pending_planes = self._held_blocks[block_key]
+            plane_video = pending_planes.pop(plane_index)
+            if not pending_planes:
+                self._held_blocks.pop(block_key)
+        else:
+            volumes = self._decode_volumes(start_volume=start_volume, end_volume=end_volume)
+            plane_video = volumes[:, plane_index]
+            pending_planes = {
+                index: volumes[:, index]
+                for index in range(self.num_planes)
+                if index != plane_index and index not in self._consumed_planes[block_key]
+            }
+            self._held_blocks.pop(block_key, None)
+            if pending_planes:
+                self._held_blocks[block_key] = (volumes.nbytes, pending_planes)
+                self._drop_oldest_blocks()
+
+        self._consumed_planes[block_key].add(plane_index)
+        if len(self._consumed_planes[block_key]) == self.num_planes:
+            # No plane requests a block again once all of them have consumed it
+            self._consumed_planes.pop(block_key)
+        self._last_served[plane_index] = (block_key, plane_video)
+        return plane_video
+
+    def _drop_oldest_blocks(self):
+        while len(self._held_blocks) > 1 and sum(nbytes for nbytes, _ in self._held_blocks.values()) > (
+            self.buffer_gb * 1e9
+        ):
+            self._held_blocks.popitem(last=False)
+
+
+class _InterleavedPlanesImagingExtractor(ImagingExtractor):
+    """Base class for the ImagingExtractor views over an InterleavedPlanesFrameBuffer."""
+
+    installed = True
+    installation_mesg = ""
+
+    def __init__(self, frame_buffer: InterleavedPlanesFrameBuffer):
+        super().__init__()
+        self.frame_buffer = frame_buffer
+        self.parent_imaging = frame_buffer.imaging_extractor
+
+    def _get_parent_frame_indices(self, plane_index: int) -> np.ndarray:
+        return np.arange(self.frame_buffer.num_volumes) * self.frame_buffer.num_planes + plane_index
+
+    def _copy_plane_times(self, plane_index: int):
+        if getattr(self.parent_imaging, "_times", None) is not None:
+            self.set_times(times=self.parent_imaging._times[self._get_parent_frame_indices(plane_index=plane_index)])
+
+    def get_frames(self, frame_idxs: ArrayType, channel: int = 0) -> np.ndarray:
+        squeeze_data = isinstance(frame_idxs, (int, np.integer))
+        frame_idxs = np.atleast_1d(frame_idxs)
+        assert np.all(frame_idxs < self.get_num_frames()), "'frame_idxs' exceed number of frames"
+
+        start_frame, end_frame = int(frame_idxs.min()), int(frame_idxs.max()) + 1
+        frames = self.get_video(start_frame=start_frame, end_frame=end_frame)[frame_idxs - start_frame]
+        return frames.squeeze(axis=0) if squeeze_data else frames
+
+    def get_dtype(self) -> np.dtype:
+        return self.frame_buffer.dtype
+
+    def get_num_frames(self) -> int:
+        return self.frame_buffer.num_volumes
+
+    def get_sampling_frequency(self) -> Optional[float]:
+        sampling_frequency = self.parent_imaging.get_sampling_frequency()
+        return None if sampling_frequency is None else sampling_frequency / self.frame_buffer.num_planes
+
+    def get_num_channels(self) -> int:
+        return self.parent_imaging.get_num_channels()
+
+    def get_channel_names(self) -> list:
+        return self.parent_imaging.get_channel_names()
+
+
+class PlaneImagingExtractor(_InterleavedPlanesImagingExtractor):
+    """ImagingExtractor view of a single plane of an interleaved multi-plane acquisition."""
+
+    extractor_name = "PlaneImaging"
+
+    def __init__(self, frame_buffer: InterleavedPlanesFrameBuffer, plane_index: int):
+        """
+        Parameters
+        ----------
+        frame_buffer : InterleavedPlanesFrameBuffer
+            The buffer shared by the views of all planes of the acquisition.
+        plane_index : int
+            The index of the plane within each volume.
+        """
+        assert (
+            0 <= plane_index < frame_buffer.num_planes
+        ), f"plane_index ({plane_index}) must be less than the number of planes ({frame_buffer.num_planes})!"
+        super().__init__(frame_buffer=frame_buffer)
+        self.plane_index = plane_index
+        self._copy_plane_times(plane_index=plane_index)
+
+    def get_video(self, start_frame: Optional[int] = None, end_frame: Optional[int] = None, channel: int = 0):
+        start_frame, end_frame, _ = slice(start_frame, end_frame).indices(self.get_num_frames())
+        return self.frame_buffer.get_plane_video(
+            plane_index=self.plane_index, start_volume=start_frame, end_volume=max(start_frame, end_frame)
+        )
+
+    def get_image_size(self) -> Tuple[int, int]:
+        return tuple(self.parent_imaging.get_image_size())
+
+
+class VolumetricImagingExtractor(_InterleavedPlanesImagingExtractor):
+    """ImagingExtractor view of an interleaved multi-plane acquisition as a series of (rows, columns, planes) volumes."""
+
+    extractor_name = "VolumetricImaging"
+
+    def __init__(self, frame_buffer: InterleavedPlanesFrameBuffer):
+        """
+        Parameters
+        ----------
+        frame_buffer : InterleavedPlanesFrameBuffer
+            The buffer decoding the interleaved frames of the acquisition.
+        """
+        super().__init__(frame_buffer=frame_buffer)
+        # A volume is timed by the acquisition of its first plane
+        self._copy_plane_times(plane_index=0)
+
+    def get_video(self, start_frame: Optional[int] = None, end_frame: Optional[int] = None, channel: int = 0):
+        start_frame, end_frame, _ = slice(start_frame, end_frame).indices(self.get_num_frames())
+        return self.frame_buffer.get_volumes(start_volume=start_frame, end_volume=max(start_frame, end_frame))
+
+    def get_image_size(self) -> Tuple[int, int, int]:
+        return tuple(self.parent_imaging.get_image_size()) + (self.frame_buffer.num_planes,)
@@ -1,7 +1,7 @@
 """Authors: Heberto Mayorquin, Saksham Sharda, Alessio Buccino and Szonja Weigl."""
 from collections import defaultdict
 from warnings import warn
-from typing import Optional
+from typing import List, Optional
 from copy import deepcopy
 
 import psutil
@@ -27,6 +27,8 @@ from hdmf.data_utils import DataChunkIterator
 from hdmf.backends.hdf5.h5_utils import H5DataIO
 
 from .imagingextractordatachunkiterator import ImagingExtractorDataChunkIterator
+from .summaryimages import SummaryImagesAccumulator, SummaryImageDataChunkIterator
+from .multiplaneimagingextractor import InterleavedPlanesFrameBuffer, PlaneImagingExtractor, VolumetricImagingExtractor
 from ..nwb_helpers import get_default_nwbfile_metadata, make_or_load_nwbfile, get_module
 from ...utils import OptionalFilePathType, dict_deep_update, calculate_regular_series_rate
 
@@ -273,11 +275,17 @@ def add_two_photon_series(
     iterator_options: Optional[dict] = None,
     use_times=False,  # TODO: to be removed
     buffer_size: Optional[int] = None,  # TODO: to be removed
+    compute_summary_images: bool = False,
+    summary_images_set_name: str = "summary_images",
 ):
     """
     Auxiliary static method for nwbextractor.
 
     Adds two photon series from imaging object as TwoPhotonSeries to nwbfile object.
+
+    If compute_summary_images is True, the mean, max, standard deviation, and local correlation images are
+    accumulated from the frames as they are written (requires iterator_type='v2') and added to an Images container
+    named summary_images_set_name in the ophys processing module.
     """
     if use_times:
         warn("Keyword argument 'use_times' is deprecated and will be removed on or after August 1st, 2022.")
@@ -288,6 +296,9 @@ def add_two_photon_series(
         )
 
     iterator_options = iterator_options or dict()
+    if compute_summary_images:
+        assert iterator_type == "v2", "Summary images can only be computed on the fly with iterator_type='v2'!"
+        iterator_options = dict(iterator_options, compute_summary_images=True)
 
     metadata_copy = deepcopy(metadata)
     metadata_copy = dict_deep_update(get_nwb_imaging_metadata(imaging), metadata_copy, append_list=False)
@@ -301,8 +312,12 @@ def add_two_photon_series(
         return nwbfile
 
     # Add the image plane to nwb
-    nwbfile = add_imaging_plane(nwbfile=nwbfile, metadata=metadata_copy)
     imaging_plane_name = two_photon_series_metadata["imaging_plane"]
+    imaging_plane_names = [imaging_plane["name"] for imaging_plane in metadata_copy["Ophys"]["ImagingPlane"]]
+    imaging_plane_index = (
+        imaging_plane_names.index(imaging_plane_name) if imaging_plane_name in imaging_plane_names else 0
+    )
+    nwbfile = add_imaging_plane(nwbfile=nwbfile, metadata=metadata_copy, imaging_plane_index=imaging_plane_index)
     imaging_plane = nwbfile.get_imaging_plane(name=imaging_plane_name)
     two_photon_series_metadata.update(imaging_plane=imaging_plane)
 
@@ -332,6 +347,13 @@ def add_two_photon_series(
     two_photon_series = TwoPhotonSeries(**two_p_series_kwargs)
     nwbfile.add_acquisition(two_photon_series)
 
+    if compute_summary_images:
+        add_accumulated_summary_images(
+            nwbfile=nwbfile,
+            summary_images_accumulator=frames_to_iterator.summary_images_accumulator,
+            images_set_name=summary_images_set_name,
+        )
+
     return nwbfile
 
 
@@ -452,6 +474,7 @@ def write_imaging(
     use_times=False,  # TODO: to be removed
     buffer_size: Optional[int] = None,  # TODO: to be removed
     save_path: OptionalFilePathType = None,  # TODO: to be removed
+    compute_summary_images: bool = False,
 ):
     """
     Primary method for writing an ImagingExtractor object to an NWBFile.
@@ -491,6 +514,10 @@ def write_imaging(
         For 'v2', see
         https://hdmf.readthedocs.io/en/stable/hdmf.data_utils.html#hdmf.data_utils.GenericDataChunkIterator
         for the full list of options.
+    compute_summary_images : bool, default: False
+        Compute the mean, max, standard deviation, and local correlation images from the frames as they are written
+        and add them to the 'summary_images' container of the ophys processing module.
+        Requires iterator_type='v2'.
     """
     assert save_path is None or nwbfile is None, "Either pass a save_path location, or nwbfile object, but not both!"
     if nwbfile is not None:
@@ -543,11 +570,201 @@ def write_imaging(
             metadata=metadata,
             iterator_type=iterator_type,
             iterator_options=iterator_options,
+            compute_summary_images=compute_summary_images,
         )
         add_epochs(imaging=imaging, nwbfile=nwbfile_out)
     return nwbfile_out
 
 
+def _get_plane_suffix(plane_index: int) -> str:
+    return "" if plane_index == 0 else f"_Plane{plane_index}"
+
+
+def get_nwb_multi_plane_imaging_metadata(
+    plane_imaging_extractors: List[ImagingExtractor],
+    segmentation_extractors: Optional[List[SegmentationExtractor]] = None,
+) -> dict:
+    """
+    Convert metadata from the ImagingExtractors of each plane into nwb specific metadata.
+
+    Every plane gets its own ImagingPlane and TwoPhotonSeries, and, if segmentation_extractors are passed, its own
+    PlaneSegmentation and RoiResponseSeries. The objects of the first plane keep the default names; those of the
+    following planes are suffixed with '_Plane{plane_index}'.
+
+    Parameters
+    ----------
+    plane_imaging_extractors : list of ImagingExtractor
+        The ImagingExtractor of each plane.
+    segmentation_extractors : list of SegmentationExtractor, optional
+        The SegmentationExtractor of each plane.
+    """
+    metadata = get_nwb_imaging_metadata(plane_imaging_extractors[0])
+    default_imaging_plane = metadata["Ophys"]["ImagingPlane"][0]
+    default_two_photon_series = metadata["Ophys"]["TwoPhotonSeries"][0]
+
+    imaging_planes, two_photon_series = [], []
+    for plane_index, plane_imaging_extractor in enumerate(plane_imaging_extractors):
+        suffix = _get_plane_suffix(plane_index=plane_index)
+        plane_metadata = get_nwb_imaging_metadata(plane_imaging_extractor)["Ophys"]
+        imaging_plane = dict(plane_metadata["ImagingPlane"][0], name=default_imaging_plane["name"] + suffix)
+        imaging_planes.append(imaging_plane)
+        two_photon_series.append(
+            dict(
+                plane_metadata["TwoPhotonSeries"][0],
+                name=default_two_photon_series["name"] + suffix,
+                imaging_plane=imaging_plane["name"],
+            )
+        )
+    metadata["Ophys"].update(ImagingPlane=imaging_planes, TwoPhotonSeries=two_photon_series)
+
+    if segmentation_extractors is None:
+        return metadata
+
+    plane_segmentations = []
+    segmentation_metadata = dict(Fluorescence=None, DfOverF=None)
+    for plane_index, segmentation_extractor in enumerate(segmentation_extractors):
+        suffix = _get_plane_suffix(plane_index=plane_index)
+        plane_metadata = get_nwb_segmentation_metadata(segmentation_extractor)["Ophys"]
+        for plane_segmentation in plane_metadata["ImageSegmentation"]["plane_segmentations"]:
+            plane_segmentations.append(dict(plane_segmentation, name=plane_segmentation["name"] + suffix))
+        for data_interface_name in segmentation_metadata:
+            data_interface_metadata = plane_metadata[data_interface_name]
+            roi_response_series = [
+                dict(series, name=series["name"] + suffix) for series in data_interface_metadata["roi_response_series"]
+            ]
+            if segmentation_metadata[data_interface_name] is None:
+                segmentation_metadata[data_interface_name] = dict(data_interface_metadata, roi_response_series=[])
+            segmentation_metadata[data_interface_name]["roi_response_series"].extend(roi_response_series)
+        if plane_index == 0:
+            metadata["Ophys"]["ImageSegmentation"] = plane_metadata["ImageSegmentation"]
+    metadata["Ophys"]["ImageSegmentation"]["plane_segmentations"] = plane_segmentations
+    metadata["Ophys"].update(segmentation_metadata)
+
+    return metadata
+
+
+def write_multi_plane_imaging(
+    imaging: ImagingExtractor,
+    num_planes: int,
+    nwbfile_path: OptionalFilePathType = None,
+    nwbfile: Optional[NWBFile] = None,
+    metadata: Optional[dict] = None,
+    overwrite: bool = False,
+    verbose: bool = True,
+    write_as_volume: bool = False,
+    segmentation_extractors: Optional[List[SegmentationExtractor]] = None,
+    iterator_options: Optional[dict] = None,
+    frame_buffer_gb: float = 1.0,
+):
+    """
+    Write an ImagingExtractor whose frames cycle through the planes of a volume to an NWBFile.
+
+    Frame `k` of the imaging extractor is taken to belong to plane `k % num_planes`. The planes are de-interleaved
+    from blocks of volumes read once from the source and shared by the data iterators of all planes;
+    see InterleavedPlanesFrameBuffer. When writing to nwbfile_path, the TwoPhotonSeries are written one buffer at a
+    time in round-robin order, so the planes consume each block of volumes in lockstep and every frame is read once.
+    When passing an in-memory nwbfile, write it with `io.write(nwbfile, exhaust_dci=False)` to do the same: the
+    default write exhausts each TwoPhotonSeries in turn, so the blocks of the later planes are held in memory up to
+    frame_buffer_gb and decoded again beyond that.
+
+    Parameters
+    ----------
+    imaging: ImagingExtractor
+        The imaging extractor object with the interleaved frames of all planes.
+    num_planes: int
+        The number of planes in each volume.
+    nwbfile_path: FilePathType
+        Path for where to write or load (if overwrite=False) the NWBFile.
+        If specified, the context will always write to this location.
+    nwbfile: NWBFile, optional
+        If passed, this function will fill the relevant fields within the NWBFile object.
+    metadata: dict, optional
+        Metadata dictionary with information used to create the NWBFile when one does not exist or overwrite=True.
+        The lists of ophys objects are matched by name against the defaults of get_nwb_multi_plane_imaging_metadata.
+    overwrite: bool, optional
+        Whether or not to overwrite the NWBFile if one exists at the nwbfile_path.
+        The default is False (append mode).
+    verbose: bool, optional
+        If 'nwbfile_path' is specified, informs user after a successful write operation.
+        The default is True.
+    write_as_volume: bool, default: False
+        Write a single TwoPhotonSeries of (frames x width x height x planes) volumes instead of one TwoPhotonSeries
+        per plane.
+    segmentation_extractors: list of SegmentationExtractor, optional
+        The segmentation of each plane, written to the PlaneSegmentation, RoiResponseSeries, and segmentation images
+        matching its plane. Not supported with write_as_volume=True.
+    iterator_options : dict, optional
+        Dictionary of options for the ImagingExtractorDataChunkIterator of each TwoPhotonSeries.
+    frame_buffer_gb: float, default: 1.0
+        The upper bound on size in gigabytes (GB) of the decoded frames held for the planes yet to be written.
+    """
+    if nwbfile is not None:
+        assert isinstance(nwbfile, NWBFile), "'nwbfile' should be of type pynwb.NWBFile"
+    if segmentation_extractors is not None:
+        assert not write_as_volume, "Segmentations can only be written per plane (write_as_volume=False)!"
+        assert len(segmentation_extractors) == num_planes, (
+            f"The number of segmentation_extractors ({len(segmentation_extractors)}) must match the "
+            f"number of planes ({num_planes})!"
+        )
+
+    frame_buffer = InterleavedPlanesFrameBuffer(
+        imaging_extractor=imaging, num_planes=num_planes, buffer_gb=frame_buffer_gb
+    )
+    if write_as_volume:
+        plane_imaging_extractors = [VolumetricImagingExtractor(frame_buffer=frame_buffer)]
+    else:
+        plane_imaging_extractors = [
+            PlaneImagingExtractor(frame_buffer=frame_buffer, plane_index=plane_index)
+            for plane_index in range(num_planes)
+        ]
+
+    metadata = dict_deep_update(
+        get_nwb_multi_plane_imaging_metadata(
+            plane_imaging_extractors=plane_imaging_extractors, segmentation_extractors=segmentation_extractors
+        ),
+        metadata or dict(),
+    )
+
+    with make_or_load_nwbfile(
+        nwbfile_path=nwbfile_path,
+        nwbfile=nwbfile,
+        metadata=metadata,
+        overwrite=overwrite,
+        verbose=verbose,
+        exhaust_dci=False,
+    ) as nwbfile_out:
+        add_devices(nwbfile=nwbfile_out, metadata=metadata)
+        for plane_index, plane_imaging_extractor in enumerate(plane_imaging_extractors):
+            add_two_photon_series(
+                imaging=plane_imaging_extractor,
+                nwbfile=nwbfile_out,
+                metadata=metadata,
+                two_photon_series_index=plane_index,
+                iterator_options=iterator_options,
+            )
+        add_epochs(imaging=imaging, nwbfile=nwbfile_out)
+
+        for plane_index, segmentation_extractor in enumerate(segmentation_extractors or []):
+            add_plane_segmentation(
+                segmentation_extractor=segmentation_extractor,
+                nwbfile=nwbfile_out,
+                metadata=metadata,
+                plane_segmentation_index=plane_index,
+            )
+            add_fluorescence_traces(
+                segmentation_extractor=segmentation_extractor,
+                nwbfile=nwbfile_out,
+                metadata=metadata,
+                plane_index=plane_index,
+            )
+            add_summary_images(
+                nwbfile=nwbfile_out,
+                segmentation_extractor=segmentation_extractor,
+                images_set_name="SegmentationImages" + _get_plane_suffix(plane_index=plane_index),
+            )
+    return nwbfile_out
+
+
 def get_nwb_segmentation_metadata(sgmextractor: SegmentationExtractor):
     """
     Convert metadata from the segmentation into nwb specific metadata.
@@ -630,9 +847,17 @@ def add_plane_segmentation(
         compression_options = dict()
 
     def image_mask_iterator():
-        for roi_id in segmentation_extractor.get_roi_ids():
-            image_masks = segmentation_extractor.get_roi_image_masks(roi_ids=[roi_id]).T.squeeze()
-            yield image_masks
+        # The masks are requested in blocks of ROIs of about 100 MB, sized from the first mask, instead of one by one
+        roi_ids = segmentation_extractor.get_roi_ids()
+        start_roi = 0
+        number_of_block_rois = 1
+        while start_roi < len(roi_ids):
+            image_masks = segmentation_extractor.get_roi_image_masks(
+                roi_ids=roi_ids[start_roi : start_roi + number_of_block_rois]
+            )
+            yield from image_masks.T
+            start_roi += number_of_block_rois
+            number_of_block_rois = max(1, int(1e8 // max(image_masks[..., 0].nbytes, 1)))
 
     # Set the defaults and required infrastructure
     metadata_copy = deepcopy(metadata)
@@ -661,8 +886,8 @@ def add_plane_segmentation(
     # Check if the plane segmentation already exists in the image segmentation
     if plane_segmentation_name not in image_segmentation.plane_segmentations:
         roi_ids = segmentation_extractor.get_roi_ids()
-        accepted_ids = [int(roi_id in segmentation_extractor.get_accepted_list()) for roi_id in roi_ids]
-        rejected_ids = [int(roi_id in segmentation_extractor.get_rejected_list()) for roi_id in roi_ids]
+        accepted_ids = np.isin(roi_ids, segmentation_extractor.get_accepted_list()).astype(int)
+        rejected_ids = np.isin(roi_ids, segmentation_extractor.get_rejected_list()).astype(int)
 
         roi_locations = segmentation_extractor.get_roi_locations().T
 
@@ -837,7 +1062,12 @@ def _create_roi_table_region(
     plane_index: int,
 ):
     """Private method to create ROI table region."""
-    add_plane_segmentation(segmentation_extractor=segmentation_extractor, nwbfile=nwbfile, metadata=metadata)
+    add_plane_segmentation(
+        segmentation_extractor=segmentation_extractor,
+        nwbfile=nwbfile,
+        metadata=metadata,
+        plane_segmentation_index=plane_index,
+    )
 
     # Get plane segmentation from the image segmentation
     image_segmentation_metadata = metadata["Ophys"]["ImageSegmentation"]
@@ -845,7 +1075,7 @@ def _create_roi_table_region(
     ophys = get_module(nwbfile, "ophys")
     image_segmentation = ophys.get_data_interface(image_segmentation_name)
 
-    plane_segmentation_name = image_segmentation_metadata["plane_segmentations"][0]["name"]
+    plane_segmentation_name = image_segmentation_metadata["plane_segmentations"][plane_index]["name"]
     plane_segmentation = image_segmentation.plane_segmentations[plane_segmentation_name]
 
     # Create a reference for ROIs from the plane segmentation
@@ -916,6 +1146,48 @@ def add_summary_images(
     return nwbfile
 
 
+def add_accumulated_summary_images(
+    nwbfile: NWBFile,
+    summary_images_accumulator: SummaryImagesAccumulator,
+    images_set_name: str = "summary_images",
+) -> NWBFile:
+    """
+    Adds the summary images of an accumulator (i.e. mean, max, std and correlation) to the nwbfile.
+
+    The image data is only computed when the nwbfile is written, after the frames feeding the accumulator
+    have been iterated, so no extra pass over the imaging data is required.
+
+    Parameters
+    ----------
+    nwbfile : NWBFile
+        An previously defined -in memory- NWBFile.
+    summary_images_accumulator : SummaryImagesAccumulator
+        The accumulator fed by the frames of a TwoPhotonSeries, e.g., from an ImagingExtractorDataChunkIterator
+        created with compute_summary_images=True.
+    images_set_name : str
+        The name of the image container, "summary_images" by default.
+
+    Returns
+    -------
+    NWBFile
+        The nwbfile passed as an input with the summary images added.
+    """
+    ophys = get_module(nwbfile=nwbfile, name="ophys", description="contains optical physiology processed data")
+
+    image_collection_does_not_exist = images_set_name not in ophys.data_interfaces
+    if image_collection_does_not_exist:
+        ophys.add(Images(images_set_name))
+    image_collection = ophys.data_interfaces[images_set_name]
+
+    for img_name in SummaryImagesAccumulator.image_names:
+        if img_name in image_collection.images:
+            continue
+        data = SummaryImageDataChunkIterator(summary_images_accumulator=summary_images_accumulator, image_name=img_name)
+        image_collection.add_image(GrayscaleImage(name=img_name, data=data))
+
+    return nwbfile
+
+
 def write_segmentation(
     segext_obj: SegmentationExtractor,
     nwbfile_path: OptionalFilePathType = None,
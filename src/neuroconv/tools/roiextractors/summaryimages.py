@@ -0,0 +1,206 @@
+"""Summary images computed on the fly from the frames written by an ImagingExtractorDataChunkIterator."""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from hdmf.data_utils import GenericDataChunkIterator
+from roiextractors import ImagingExtractor
+
+# Offsets along the two spatial axes that cover each pair of pixels in an 8-connected neighborhood exactly once
+_NEIGHBOR_OFFSETS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def _get_neighbor_slices(offset: Tuple[int, int]) -> Tuple[tuple, tuple]:
+    """Return the spatial slices selecting every pixel and its neighbor at the given offset."""
+    pixel_slices, neighbor_slices = [], []
+    for axis_offset in offset:
+        if axis_offset >= 0:
+            pixel_slices.append(slice(0, -axis_offset or None))
+            neighbor_slices.append(slice(axis_offset, None))
+        else:
+            pixel_slices.append(slice(-axis_offset, None))
+            neighbor_slices.append(slice(0, axis_offset))
+    return tuple(pixel_slices), tuple(neighbor_slices)
+
+
+class SummaryImagesAccumulator:
+    """
+    Running statistics of a planar imaging video, updated one block of frames at a time.
+
+    The accumulated sums are enough to recover the mean, maximum, and standard deviation images as well as the
+    local correlation image, *i.e.*, the average correlation of each pixel with its eight neighbors.
+    All frames are expected in the NWB orientation (frames x width x height).
+    """
+
+    image_names = ("mean", "max", "std", "correlation")
+
+    def __init__(
+        self,
+        frame_shape: Tuple[int, int],
+        num_frames: int,
+        dtype: np.dtype,
+        max_block_mb: float = 64.0,
+        imaging_extractor: Optional[ImagingExtractor] = None,
+    ):
+        """
+        Parameters
+        ----------
+        frame_shape : tuple of int
+            The (width, height) of a single frame.
+        num_frames : int
+            The total number of frames expected before the images are complete.
+        dtype : numpy.dtype
+            The dtype of the frames; the max image retains it.
+        max_block_mb : float, default: 64.0
+            Upper bound on the size in megabytes (MB) of the temporary float64 copies used to update the sums.
+        imaging_extractor : ImagingExtractor, optional
+            The source of the accumulated frames. `get_complete_images` reads the frames from it directly if they
+            have not all been accumulated by the time the images are needed.
+        """
+        assert len(frame_shape) == 2, "Summary images can only be computed for planar imaging data!"
+        self.frame_shape = tuple(frame_shape)
+        self.num_frames = num_frames
+        self.dtype = np.dtype(dtype)
+        self.max_block_mb = max_block_mb
+        self.imaging_extractor = imaging_extractor
+        self._complete_images = None
+
+        self.num_frames_accumulated = 0
+        self._shift = None  # The first frame; shifting the data improves the numerical stability of the variances
+        self._sum = np.zeros(shape=self.frame_shape, dtype="float64")
+        self._sum_of_squares = np.zeros(shape=self.frame_shape, dtype="float64")
+        self._max = np.full(shape=self.frame_shape, fill_value=self._get_dtype_minimum(), dtype=self.dtype)
+        self._neighbor_slices = [_get_neighbor_slices(offset=offset) for offset in _NEIGHBOR_OFFSETS]
+        self._sum_of_neighbor_products = [
+            np.zeros(shape=self._sum[pixel_slices].shape, dtype="float64") for pixel_slices, _ in self._neighbor_slices
+        ]
+        self._images = None
+
+    def _get_dtype_minimum(self):
+        if np.issubdtype(self.dtype, np.integer):
+            return np.iinfo(self.dtype).min
+        return -np.inf
+
+    @property
+    def is_complete(self) -> bool:
+        return self.num_frames_accumulated == self.num_frames
+
+    def update(self, frames: np.ndarray):
+        """Accumulate the statistics of a block of consecutive frames."""
+        assert frames.shape[1:] == self.frame_shape, (
+            f"The shape of the frames ({frames.shape[1:]}) does not match the "
+            f"frame_shape of the accumulator ({self.frame_shape})!"
+        )
+        if frames.shape[0] == 0:
+            return
+        if self._shift is None:
+            self._shift = frames[0].astype("float64")
+
+        self._max = np.maximum(self._max, frames.max(axis=0))
+
+        frames_per_block = max(1, int(self.max_block_mb * 1e6 // (np.prod(self.frame_shape) * 8)))
+        for block_start in range(0, frames.shape[0], frames_per_block):
+            block = frames[block_start : block_start + frames_per_block].astype("float64") - self._shift
+            self._sum += block.sum(axis=0)
+            self._sum_of_squares += np.square(block).sum(axis=0)
+            for (pixel_slices, neighbor_slices), sum_of_products in zip(
+                self._neighbor_slices, self._sum_of_neighbor_products
+            ):
+                sum_of_products += np.einsum(
+                    "tij,tij->ij", block[(slice(None),) + pixel_slices], block[(slice(None),) + neighbor_slices]
+                )
+
+        self.num_frames_accumulated += frames.shape[0]
+        self._images = None
+
+    def get_images(self) -> Dict[str, np.ndarray]:
+        """Return the summary images in the NWB orientation (width x height), keyed by image name."""
+        assert self.num_frames_accumulated > 0, "No frames have been accumulated yet!"
+        if self._images is not None:
+            return self._images
+
+        num_frames = self.num_frames_accumulated
+        shifted_mean = self._sum / num_frames
+        variance = np.maximum(self._sum_of_squares / num_frames - np.square(shifted_mean), 0.0)
+        std = np.sqrt(variance)
+
+        correlation_sum = np.zeros(shape=self.frame_shape, dtype="float64")
+        neighbor_count = np.zeros(shape=self.frame_shape, dtype="float64")
+        for (pixel_slices, neighbor_slices), sum_of_products in zip(
+            self._neighbor_slices, self._sum_of_neighbor_products
+        ):
+            covariance = sum_of_products / num_frames - shifted_mean[pixel_slices] * shifted_mean[neighbor_slices]
+            std_product = std[pixel_slices] * std[neighbor_slices]
+            correlation = np.divide(covariance, std_product, out=np.zeros_like(covariance), where=std_product > 0)
+            correlation_sum[pixel_slices] += correlation
+            correlation_sum[neighbor_slices] += correlation
+            neighbor_count[pixel_slices] += 1
+            neighbor_count[neighbor_slices] += 1
+
+        self._images = dict(
+            mean=self._shift + shifted_mean,
+            max=self._max,
+            std=std,
+            correlation=np.divide(
+                correlation_sum, neighbor_count, out=np.zeros_like(correlation_sum), where=neighbor_count > 0
+            ),
+        )
+        return self._images
+
+    def get_complete_images(self) -> Dict[str, np.ndarray]:
+        """
+        Return the summary images of all the frames, in the NWB orientation (width x height), keyed by image name.
+
+        If not all the frames have been accumulated yet, e.g., when the NWBFile is written with exhaust_dci=False and
+        the images are written before the end of the TwoPhotonSeries, the frames are read once more from the
+        imaging extractor to compute the images directly.
+        """
+        if self.is_complete:
+            return self.get_images()
+        assert self.imaging_extractor is not None, (
+            f"The summary images are needed after only {self.num_frames_accumulated} of {self.num_frames} frames "
+            "were accumulated, and there is no imaging extractor to read the frames from!"
+        )
+        if self._complete_images is None:
+            accumulator = SummaryImagesAccumulator(
+                frame_shape=self.frame_shape,
+                num_frames=self.num_frames,
+                dtype=self.dtype,
+                max_block_mb=self.max_block_mb,
+            )
+            frames_per_block = max(1, int(self.max_block_mb * 1e6 // (np.prod(self.frame_shape) * self.dtype.itemsize)))
+            for start_frame in range(0, self.num_frames, frames_per_block):
+                end_frame = min(start_frame + frames_per_block, self.num_frames)
+                video = self.imaging_extractor.get_video(start_frame=start_frame, end_frame=end_frame)
+                accumulator.update(frames=video.transpose((0, 2, 1)))  # ROIExtractors convention is flipped
+            self._complete_images = accumulator.get_images()
+        return self._complete_images
+
+
+class SummaryImageDataChunkIterator(GenericDataChunkIterator):
+    """
+    DataChunkIterator that writes one of the images of a SummaryImagesAccumulator.
+
+    The image is only read from the accumulator once the dataset is being written, which lets the summary images be
+    attached to an NWBFile before the frames they summarize have been iterated.
+    The default write of an NWBFile exhausts the acquisition group, which holds the TwoPhotonSeries,
+    before the processing modules. Otherwise the images are computed directly from the frames of the imaging
+    extractor of the accumulator (see `SummaryImagesAccumulator.get_complete_images`).
+    """
+
+    def __init__(self, summary_images_accumulator: SummaryImagesAccumulator, image_name: str):
+        assert (
+            image_name in SummaryImagesAccumulator.image_names
+        ), f"'image_name' must be one of {SummaryImagesAccumulator.image_names}!"
+        self.summary_images_accumulator = summary_images_accumulator
+        self.image_name = image_name
+        image_shape = self._get_maxshape()
+        super().__init__(buffer_shape=image_shape, chunk_shape=image_shape)
+
+    def _get_maxshape(self) -> tuple:
+        return self.summary_images_accumulator.frame_shape
+
+    def _get_dtype(self) -> np.dtype:
+        return self.summary_images_accumulator.dtype if self.image_name == "max" else np.dtype("float64")
+
+    def _get_data(self, selection: Tuple[slice]) -> np.ndarray:
+        return self.summary_images_accumulator.get_complete_images()[self.image_name][selection]
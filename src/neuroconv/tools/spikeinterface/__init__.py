@@ -9,4 +9,8 @@ from .spikeinterface import (
     write_recording,
     write_sorting,
     add_units_table,
+    set_dynamic_table_property,
+    add_electrodes_info,
+    add_all_to_nwbfile,
+    get_nspikes,
 )
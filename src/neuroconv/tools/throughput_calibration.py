@@ -0,0 +1,272 @@
+"""Tools for measuring the conversion rate and compression ratio of data interfaces on a sample of real data."""
+import inspect
+import json
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, Optional
+
+import h5py
+
+from .nwb_helpers import make_or_load_nwbfile
+from ..utils import dict_deep_update, load_dict_from_file, FilePathType, OptionalFolderPathType
+
+
+def get_interface_modality(data_interface) -> str:
+    """Return the modality of a data interface, named after its subpackage of neuroconv.datainterfaces."""
+    module_path = type(data_interface).__module__.split(".")
+    if "datainterfaces" in module_path and module_path.index("datainterfaces") + 1 < len(module_path):
+        return module_path[module_path.index("datainterfaces") + 1]
+    return "other"
+
+
+def _get_written_bytes(nwbfile_path: FilePathType):
+    """Return the uncompressed and stored bytes of all the datasets of a written NWBFile."""
+    uncompressed_bytes = 0
+    stored_bytes = 0
+
+    def _accumulate(name, node):
+        nonlocal uncompressed_bytes, stored_bytes
+        # Variable length strings and references have no meaningful uncompressed size
+        if isinstance(node, h5py.Dataset) and node.dtype.kind not in ("O",):
+            uncompressed_bytes += node.size * node.dtype.itemsize
+            stored_bytes += node.id.get_storage_size()
+
+    with h5py.File(name=nwbfile_path, mode="r") as file:
+        file.visititems(_accumulate)
+    return uncompressed_bytes, stored_bytes
+
+
+def _get_path_bytes(path: Path) -> int:
+    """Return the size of a file, or the total size of the files in a folder."""
+    if path.is_file():
+        return path.stat().st_size
+    return sum(
+        (Path(folder) / file_name).stat().st_size for folder, _, file_names in os.walk(path) for file_name in file_names
+    )
+
+
+def get_interface_source_bytes(data_interface) -> int:
+    """
+    Return the size on disk of the source data of a data interface.
+
+    The source files are those reported by `BaseDataInterface.get_source_file_paths`, each counted once.
+    """
+    source_paths = {Path(path).resolve() for path in data_interface.get_source_file_paths() if Path(path).exists()}
+    return sum(_get_path_bytes(path=path) for path in source_paths)
+
+
+def calibrate_conversion_throughput(
+    converter, metadata: Optional[dict] = None, conversion_options: Optional[dict] = None, stub_test: bool = True
+) -> Dict[str, dict]:
+    """
+    Measure the conversion rate and compression ratio of each data interface of a converter.
+
+    Each interface is converted on its own into a temporary NWBFile, and the uncompressed and stored bytes of the
+    written datasets are read back from the file.
+
+    The rates are measured against the size of the source data, which is what the conversion estimators take as
+    'total_mb'. An interface that reports the fraction of its source data read by a stub (see
+    `BaseDataInterface.get_stub_fraction`) is converted as a stub if it supports the 'stub_test' conversion option,
+    and the source bytes it read are taken as the size of its source files (see
+    `BaseDataInterface.get_source_file_paths`) scaled by that fraction. The other interfaces are converted in full.
+
+    The time and bytes of writing an NWBFile with the metadata alone are measured first and subtracted from those of
+    each interface, so that small conversions do not mostly measure this fixed overhead. The time is the fastest of
+    three runs, so that the warm-up of the first write is not counted as overhead.
+
+    Parameters
+    ----------
+    converter: NWBConverter
+        The converter of a sample session of the real data.
+    metadata: dict, optional
+        The metadata of the sample session. The default is the automatically extracted metadata.
+    conversion_options: dict, optional
+        Similar to source_data, a dictionary containing keywords for each interface for which non-default
+        conversion specification is requested.
+    stub_test: bool, default: True
+        Whether to only convert a stub of the data of the interfaces that support it.
+
+    Returns
+    -------
+    measurements: dict
+        For each interface, its modality, the 'source_bytes' it read, the written 'bytes' and 'stored_bytes' and the
+        'seconds' it took, net of the overhead of writing the metadata.
+    """
+    if metadata is None:
+        metadata = converter.get_metadata()
+    conversion_options_to_run = dict_deep_update(converter.get_conversion_options(), conversion_options or dict())
+
+    measurements = dict()
+    with TemporaryDirectory() as temporary_folder_path:
+        baseline_nwbfile_path = Path(temporary_folder_path) / "baseline.nwb"
+        # The fastest of a few runs is the overhead itself, without the warm-up and noise of any single run
+        baseline_seconds = float("inf")
+        for _ in range(3):
+            start_time = perf_counter()
+            with make_or_load_nwbfile(
+                nwbfile_path=str(baseline_nwbfile_path), metadata=metadata, overwrite=True, verbose=False
+            ):
+                pass
+            baseline_seconds = min(baseline_seconds, perf_counter() - start_time)
+        baseline_bytes, baseline_stored_bytes = _get_written_bytes(nwbfile_path=baseline_nwbfile_path)
+
+        for interface_name, data_interface in converter.data_interface_objects.items():
+            interface_conversion_options = dict(conversion_options_to_run.get(interface_name, dict()))
+            source_fraction = 1.0
+            if stub_test and "stub_test" in inspect.signature(data_interface.run_conversion).parameters:
+                stub_fraction = data_interface.get_stub_fraction(**interface_conversion_options)
+                if stub_fraction is not None:
+                    interface_conversion_options.update(stub_test=True)
+                    source_fraction = stub_fraction
+            nwbfile_path = Path(temporary_folder_path) / f"{interface_name}.nwb"
+
+            start_time = perf_counter()
+            data_interface.run_conversion(
+                nwbfile_path=str(nwbfile_path), metadata=metadata, overwrite=True, **interface_conversion_options
+            )
+            seconds = perf_counter() - start_time
+
+            uncompressed_bytes, stored_bytes = _get_written_bytes(nwbfile_path=nwbfile_path)
+            measurements[interface_name] = dict(
+                modality=get_interface_modality(data_interface=data_interface),
+                source_bytes=get_interface_source_bytes(data_interface=data_interface) * source_fraction,
+                bytes=max(uncompressed_bytes - baseline_bytes, 0),
+                stored_bytes=max(stored_bytes - baseline_stored_bytes, 0),
+                seconds=max(seconds - baseline_seconds, 0.0),
+            )
+    return measurements
+
+
+def calibrate_conversion_from_yaml(
+    specification_file_path: FilePathType,
+    data_folder_path: OptionalFolderPathType = None,
+    number_of_sessions: int = 1,
+    stub_test: bool = True,
+) -> dict:
+    """
+    Measure a calibration profile from the first sessions of a yaml specification file.
+
+    Parameters
+    ----------
+    specification_file_path : FilePathType
+        File path leading to .yml specification file for NWB conversion.
+    data_folder_path : FolderPathType, optional
+        Folder path leading to root location of the data files.
+        The default is the parent directory of the specification_file_path.
+    number_of_sessions : int, default: 1
+        The number of sessions, in order of the specification, to convert for the calibration.
+    stub_test : bool, default: True
+        Whether to only convert a stub of the data of the interfaces that support it.
+
+    Returns
+    -------
+    calibration_profile: dict
+        See `get_calibration_profile`.
+    """
+    from .yaml_conversion_specification.yaml_conversion_specification import (
+        load_specification,
+        iterate_session_conversions,
+    )
+
+    if data_folder_path is None:
+        data_folder_path = Path(specification_file_path).parent
+
+    specification = load_specification(specification_file_path=specification_file_path)
+    all_measurements = []
+    session_conversions = iterate_session_conversions(specification=specification, data_folder_path=data_folder_path)
+    for _, converter_class, source_data, metadata_sources, conversion_options in session_conversions:
+        if len(all_measurements) == number_of_sessions:
+            break
+        converter = converter_class(source_data=source_data, verbose=False)
+        metadata = converter.get_metadata()
+        for metadata_source in metadata_sources:
+            metadata = dict_deep_update(metadata, metadata_source)
+        all_measurements.append(
+            calibrate_conversion_throughput(
+                converter=converter, metadata=metadata, conversion_options=conversion_options, stub_test=stub_test
+            )
+        )
+    return get_calibration_profile(
+        measurements=[measurement for measurements in all_measurements for measurement in measurements.values()]
+    )
+
+
+def get_calibration_profile(measurements) -> Dict[str, dict]:
+    """
+    Aggregate measurements of calibrate_conversion_throughput into the conversion rate and compression ratio of each
+    modality.
+
+    Parameters
+    ----------
+    measurements: list of dict
+        The measurements of any number of interfaces and sessions.
+
+    Returns
+    -------
+    calibration_profile: dict
+        For each modality, the 'conversion_rate_mb' (MB of source data per second) and 'compression_ratio' (source
+        bytes over stored bytes) over all of its measurements, along with the total 'source_bytes', 'bytes',
+        'stored_bytes' and 'seconds' they are based on.
+    """
+    calibration_profile = dict()
+    for measurement in measurements:
+        totals = calibration_profile.setdefault(
+            measurement["modality"], dict(source_bytes=0, bytes=0, stored_bytes=0, seconds=0.0)
+        )
+        for key in ("source_bytes", "bytes", "stored_bytes", "seconds"):
+            totals[key] += measurement[key]
+    for totals in calibration_profile.values():
+        totals.update(
+            conversion_rate_mb=totals["source_bytes"] / 1e6 / totals["seconds"] if totals["seconds"] else None,
+            compression_ratio=totals["source_bytes"] / totals["stored_bytes"] if totals["stored_bytes"] else None,
+        )
+    return calibration_profile
+
+
+def save_calibration_profile(calibration_profile: dict, file_path: FilePathType):
+    """Save a calibration profile to a .json file, which can be read back with `load_calibration_profile`."""
+    with open(file=file_path, mode="w") as file:
+        json.dump(obj=calibration_profile, fp=file, indent=4)
+
+
+def load_calibration_profile(file_path: FilePathType) -> dict:
+    """Load a calibration profile saved by `save_calibration_profile`."""
+    return load_dict_from_file(file_path=file_path)
+
+
+def get_calibrated_rates(calibration_profile: dict, modality_mb: Dict[str, float]) -> Dict[str, float]:
+    """
+    Combine the calibrated rates of the modalities of a dataset into the rates of the whole dataset.
+
+    The conversion times and compressed sizes of the modalities are summed, so the combined rates are weighted by the
+    amount of data of each modality.
+
+    Parameters
+    ----------
+    calibration_profile: dict
+        See `get_calibration_profile`.
+    modality_mb: dict
+        The amount of source data (in MB) of each modality of the dataset.
+
+    Returns
+    -------
+    rates: dict
+        The 'conversion_rate_mb' and 'compression_ratio' of the dataset, to be passed on to
+        `estimate_total_conversion_runtime` or `estimate_s3_conversion_cost`.
+    """
+    missing_modalities = [
+        modality
+        for modality in modality_mb
+        if calibration_profile.get(modality, dict()).get("conversion_rate_mb") is None
+        or calibration_profile[modality].get("compression_ratio") is None
+    ]
+    assert not missing_modalities, f"The calibration profile has no rates for the modalities {missing_modalities}!"
+
+    total_mb = sum(modality_mb.values())
+    conversion_seconds = sum(
+        mb / calibration_profile[modality]["conversion_rate_mb"] for modality, mb in modality_mb.items()
+    )
+    compressed_mb = sum(mb / calibration_profile[modality]["compression_ratio"] for modality, mb in modality_mb.items())
+    return dict(conversion_rate_mb=total_mb / conversion_seconds, compression_ratio=total_mb / compressed_mb)
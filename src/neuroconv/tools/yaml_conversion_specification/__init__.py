@@ -1 +1 @@
-from .yaml_conversion_specification import run_conversion_from_yaml
+from .yaml_conversion_specification import run_conversion_from_yaml, plan_conversion_from_yaml
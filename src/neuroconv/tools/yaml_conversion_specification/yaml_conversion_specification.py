@@ -1,5 +1,7 @@
 """Authors: Cody Baker, Alessio Buccino."""
 import sys
+import json
+from contextlib import redirect_stdout
 from pathlib import Path
 from importlib import import_module
 from itertools import chain
@@ -8,11 +10,9 @@ from typing import Optional
 from warnings import warn
 
 import click
-from dandi.organize import create_unique_filenames_from_metadata
-from dandi.metadata import _get_pynwb_metadata
 
-from ...nwbconverter import NWBConverter
-from ...utils import dict_deep_update, load_dict_from_file, FilePathType, OptionalFolderPathType
+from ...utils import dict_deep_update, load_dict_from_file, FilePathType, FolderPathType, OptionalFolderPathType
+from ...utils.json_schema import NWBMetaDataEncoder
 
 
 @click.command()
@@ -29,11 +29,17 @@ from ...utils import dict_deep_update, load_dict_from_file, FilePathType, Option
     type=click.Path(writable=True),
 )
 @click.option("--overwrite", help="Overwrite an existing NWBFile at the location.", is_flag=True)
+@click.option(
+    "--plan",
+    help="Print a JSON plan of the datasets, sizes, runtime and memory of each session instead of converting them.",
+    is_flag=True,
+)
 def run_conversion_from_yaml_cli(
     specification_file_path: str,
     data_folder_path: Optional[str] = None,
     output_folder_path: Optional[str] = None,
     overwrite: bool = False,
+    plan: bool = False,
 ):
     """
     Run the tool function 'run_conversion_from_yaml' via the command line.
@@ -41,6 +47,16 @@ def run_conversion_from_yaml_cli(
     specification-file-path :
     Path to the .yml specification file.
     """
+    if plan:
+        # Anything printed while planning is redirected, so that the output is only the JSON plan
+        with redirect_stdout(sys.stderr):
+            conversion_plan = plan_conversion_from_yaml(
+                specification_file_path=specification_file_path,
+                data_folder_path=data_folder_path,
+                output_folder_path=output_folder_path,
+            )
+        click.echo(json.dumps(conversion_plan, cls=NWBMetaDataEncoder, indent=2))
+        return
     run_conversion_from_yaml(
         specification_file_path=specification_file_path,
         data_folder_path=data_folder_path,
@@ -96,6 +112,45 @@ def run_conversion_from_yaml(
         output_folder_path = Path(specification_file_path).parent
     else:
         output_folder_path = Path(output_folder_path)
+    # Imported here so that the command line interface starts without loading pynwb and dandi
+    from dandi.organize import create_unique_filenames_from_metadata
+    from dandi.metadata import _get_pynwb_metadata
+
+    specification = load_specification(specification_file_path=specification_file_path)
+    for nwbfile_name, converter_class, source_data, metadata_sources, conversion_options in iterate_session_conversions(
+        specification=specification, data_folder_path=data_folder_path
+    ):
+        converter = converter_class(source_data=source_data)
+        metadata = converter.get_metadata()
+        for metadata_source in metadata_sources:
+            metadata = dict_deep_update(metadata, metadata_source)
+        converter.run_conversion(
+            nwbfile_path=output_folder_path / f"{nwbfile_name}.nwb",
+            metadata=metadata,
+            overwrite=overwrite,
+            conversion_options=conversion_options,
+        )
+    # To properly mimic a true dandi organization, the full directory must be populated with NWBFiles.
+    all_nwbfile_paths = [nwbfile_path for nwbfile_path in output_folder_path.iterdir() if nwbfile_path.suffix == ".nwb"]
+    if any(["temp_nwbfile_name_" in nwbfile_path.stem for nwbfile_path in all_nwbfile_paths]):
+        dandi_metadata_list = []
+        for nwbfile_path in all_nwbfile_paths:
+            dandi_metadata = _get_pynwb_metadata(path=nwbfile_path)
+            dandi_metadata.update(path=nwbfile_path)
+            dandi_metadata_list.append(dandi_metadata)
+        named_dandi_metadata_list = create_unique_filenames_from_metadata(metadata=dandi_metadata_list)
+
+        for named_dandi_metadata in named_dandi_metadata_list:
+            if "temp_nwbfile_name_" in named_dandi_metadata["path"].stem:
+                dandi_filename = named_dandi_metadata["dandi_filename"].replace(" ", "_")
+                assert (
+                    dandi_filename != ".nwb"
+                ), f"Not enough metadata available to assign name to {str(named_dandi_metadata['path'])}!"
+                named_dandi_metadata["path"].rename(str(output_folder_path / dandi_filename))
+
+
+def load_specification(specification_file_path: FilePathType) -> dict:
+    """Load a .yml specification file and validate it against the conversion specification schema."""
     specification = load_dict_from_file(file_path=specification_file_path)
     schema_folder = Path(__file__).parent.parent.parent / "schemas"
     specification_schema = load_dict_from_file(file_path=schema_folder / "yaml_conversion_specification_schema.json")
@@ -107,6 +162,27 @@ def run_conversion_from_yaml(
         schema=specification_schema,
         resolver=RefResolver(base_uri=sys_uri_base + str(schema_folder) + "/", referrer=specification_schema),
     )
+    return specification
+
+
+def iterate_session_conversions(specification: dict, data_folder_path: FolderPathType):
+    """
+    Resolve the conversion of each session of a specification.
+
+    Yields
+    ------
+    nwbfile_name: str
+        The name of the output NWBFile, without suffix. Sessions without one get a temporary name.
+    converter_class: type
+        The NWBConverter class of the data interfaces of the session.
+    source_data: dict
+        The source data of the session, with the paths resolved against the data_folder_path.
+    metadata_sources: list of dict
+        The global, experiment and session metadata, to be applied in order over the automatic metadata.
+    conversion_options: dict
+        The conversion options of the session.
+    """
+    from ...nwbconverter import NWBConverter
 
     global_metadata = specification.get("metadata", dict())
     global_data_interfaces = specification.get("data_interfaces")
@@ -142,31 +218,84 @@ def run_conversion_from_yaml(
                         source_data[interface_name].update({key: [str(Path(data_folder_path) / x) for x in value]})
                     else:
                         source_data[interface_name].update({key: str(Path(data_folder_path) / value)})
-            converter = CustomNWBConverter(source_data=source_data)
+            nwbfile_name = session.get("nwbfile_name", f"temp_nwbfile_name_{file_counter}").strip(".nwb")
+            metadata_sources = [global_metadata, experiment_metadata, session.get("metadata", dict())]
+            yield nwbfile_name, CustomNWBConverter, source_data, metadata_sources, session.get(
+                "conversion_options", dict()
+            )
+
+
+def plan_conversion_from_yaml(
+    specification_file_path: FilePathType,
+    data_folder_path: OptionalFolderPathType = None,
+    output_folder_path: OptionalFolderPathType = None,
+    number_of_sample_chunks: int = 3,
+    conversion_rate_mb: float = 17.0,
+) -> dict:
+    """
+    Plan the conversion of a yaml specification file without writing any NWBFile.
+
+    Each session is resolved as by run_conversion_from_yaml and described by NWBConverter.get_conversion_plan from
+    the headers of its source files. A session that cannot be resolved is reported with its error instead.
+
+    Parameters
+    ----------
+    specification_file_path : FilePathType
+        File path leading to .yml specification file for NWB conversion.
+    data_folder_path : FolderPathType, optional
+        Folder path leading to root location of the data files.
+        The default is the parent directory of the specification_file_path.
+    output_folder_path : FolderPathType, optional
+        Folder path leading to the desired output location of the .nwb files.
+        The default is the parent directory of the specification_file_path.
+    number_of_sample_chunks : int, default: 3
+        The number of chunks of each dataset compressed to estimate its compressed size.
+    conversion_rate_mb : float, default: 17.0
+        Estimate of the conversion rate (in MB/s) of the source data, used for the estimated runtimes.
+
+    Returns
+    -------
+    plan: dict
+        The plan of each session, along with the estimated totals over all sessions.
+    """
+    if data_folder_path is None:
+        data_folder_path = Path(specification_file_path).parent
+    output_folder_path = (
+        Path(specification_file_path).parent if output_folder_path is None else Path(output_folder_path)
+    )
+
+    specification = load_specification(specification_file_path=specification_file_path)
+    sessions = []
+    for nwbfile_name, converter_class, source_data, metadata_sources, conversion_options in iterate_session_conversions(
+        specification=specification, data_folder_path=data_folder_path
+    ):
+        session_plan = dict(nwbfile_path=str(output_folder_path / f"{nwbfile_name}.nwb"), source_data=source_data)
+        try:
+            converter = converter_class(source_data=source_data, verbose=False)
             metadata = converter.get_metadata()
-            for metadata_source in [global_metadata, experiment_metadata, session.get("metadata", dict())]:
+            for metadata_source in metadata_sources:
                 metadata = dict_deep_update(metadata, metadata_source)
-            nwbfile_name = session.get("nwbfile_name", f"temp_nwbfile_name_{file_counter}").strip(".nwb")
-            converter.run_conversion(
-                nwbfile_path=output_folder_path / f"{nwbfile_name}.nwb",
-                metadata=metadata,
-                overwrite=overwrite,
-                conversion_options=session.get("conversion_options", dict()),
+            session_plan.update(
+                converter.get_conversion_plan(
+                    metadata=metadata,
+                    conversion_options=conversion_options,
+                    number_of_sample_chunks=number_of_sample_chunks,
+                    conversion_rate_mb=conversion_rate_mb,
+                )
             )
-    # To properly mimic a true dandi organization, the full directory must be populated with NWBFiles.
-    all_nwbfile_paths = [nwbfile_path for nwbfile_path in output_folder_path.iterdir() if nwbfile_path.suffix == ".nwb"]
-    if any(["temp_nwbfile_name_" in nwbfile_path.stem for nwbfile_path in all_nwbfile_paths]):
-        dandi_metadata_list = []
-        for nwbfile_path in all_nwbfile_paths:
-            dandi_metadata = _get_pynwb_metadata(path=nwbfile_path)
-            dandi_metadata.update(path=nwbfile_path)
-            dandi_metadata_list.append(dandi_metadata)
-        named_dandi_metadata_list = create_unique_filenames_from_metadata(metadata=dandi_metadata_list)
+        except Exception as exception:
+            session_plan.update(error=f"{type(exception).__name__}: {exception}")
+        sessions.append(session_plan)
 
-        for named_dandi_metadata in named_dandi_metadata_list:
-            if "temp_nwbfile_name_" in named_dandi_metadata["path"].stem:
-                dandi_filename = named_dandi_metadata["dandi_filename"].replace(" ", "_")
-                assert (
-                    dandi_filename != ".nwb"
-                ), f"Not enough metadata available to assign name to {str(named_dandi_metadata['path'])}!"
-                named_dandi_metadata["path"].rename(str(output_folder_path / dandi_filename))
+    planned_sessions = [session_plan for session_plan in sessions if "error" not in session_plan]
+    compressed_bytes = [session_plan["estimated_compressed_bytes"] for session_plan in planned_sessions]
+    return dict(
+        sessions=sessions,
+        number_of_errors=len(sessions) - len(planned_sessions),
+        total_bytes=sum(session_plan["total_bytes"] for session_plan in planned_sessions),
+        estimated_compressed_bytes=None if None in compressed_bytes else sum(compressed_bytes),
+        estimated_runtime=sum(session_plan["estimated_runtime"] for session_plan in planned_sessions),
+        estimated_peak_memory_bytes=max(
+            [session_plan["estimated_peak_memory_bytes"] for session_plan in planned_sessions], default=0
+        ),
+    )
@@ -17,7 +17,10 @@ from .json_schema import (
     unroot_schema,
     fill_defaults,
     get_metadata_schema_for_icephys,
+    get_schema_validator,
+    validate_with_cached_validator,
 )
 from .globbing import decompose_f_string, parse_f_string
+from .header_cache import HeaderCache
 
 from .checks import calculate_regular_series_rate
@@ -6,7 +6,6 @@ from copy import deepcopy
 from pathlib import Path
 
 import yaml
-import numpy as np
 
 from .types import FilePathType
 
@@ -87,23 +86,78 @@ def append_replace_dict_in_list(ls, d, compare_key, list_dict_deep_update: bool
     """
     if not isinstance(ls, list):
         return d
-    if isinstance(d, collections.abc.Mapping):
-        indxs = np.where(
-            [d.get(compare_key, None) == i[compare_key] for i in ls if isinstance(i, collections.abc.Mapping)]
-        )[0]
-        if len(indxs) > 0:
-            for idx in indxs:
-                if list_dict_deep_update:
-                    ls[idx] = dict_deep_update(ls[idx], d)
-                else:
-                    ls[idx] = d
-        else:
-            ls.append(d)
-    elif not (d in ls and remove_repeats):
-        ls.append(d)
+    _IndexedList(ls=ls, compare_key=compare_key).append_replace(
+        d, list_dict_deep_update=list_dict_deep_update, remove_repeats=remove_repeats
+    )
     return ls
 
 
+def _is_hashable(value) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _IndexedList:
+    """
+    Index the elements of a list for merging many values into it.
+
+    The dicts are indexed by their value of the compare key and the other hashable elements by themselves, so that
+    each value is matched in constant time instead of by scanning the list.
+    """
+
+    def __init__(self, ls: list, compare_key: str):
+        self.ls = ls
+        self.compare_key = compare_key
+        self.dict_indices = dict()  # compare key value -> positions of the dicts with that value
+        self.unhashable_key_indices = []  # positions of the dicts whose compare key value is unhashable
+        self.hashable_values = set()
+        for index, value in enumerate(ls):
+            self._add_to_index(index=index, value=value)
+
+    def _add_to_index(self, index: int, value):
+        if isinstance(value, collections.abc.Mapping):
+            if self.compare_key not in value:
+                return
+            key = value[self.compare_key]
+            if _is_hashable(key):
+                self.dict_indices.setdefault(key, []).append(index)
+            else:
+                self.unhashable_key_indices.append(index)
+        elif _is_hashable(value):
+            self.hashable_values.add(value)
+
+    def _find_dict_indices(self, key) -> list:
+        indices = [index for index in self.unhashable_key_indices if self.ls[index][self.compare_key] == key]
+        if _is_hashable(key):
+            indices.extend(self.dict_indices.get(key, []))
+        else:
+            indices.extend(
+                index for dict_key, key_indices in self.dict_indices.items() if dict_key == key for index in key_indices
+            )
+        return sorted(indices)
+
+    def _contains(self, value) -> bool:
+        if _is_hashable(value):
+            return value in self.hashable_values
+        return value in self.ls
+
+    def append_replace(self, value, list_dict_deep_update: bool = True, remove_repeats: bool = True):
+        """Update the list with a single value, following append_replace_dict_in_list."""
+        if isinstance(value, collections.abc.Mapping):
+            indices = self._find_dict_indices(key=value.get(self.compare_key, None))
+            for index in indices:
+                self.ls[index] = dict_deep_update(self.ls[index], value) if list_dict_deep_update else value
+            if indices:
+                return
+        elif remove_repeats and self._contains(value):
+            return
+        self.ls.append(value)
+        self._add_to_index(index=len(self.ls) - 1, value=value)
+
+
 def dict_deep_update(
     d: collections.abc.Mapping,
     u: collections.abc.Mapping,
@@ -129,7 +183,8 @@ def dict_deep_update(
     remove_repeats: bool
         for updating list in d[key] with list in u[key]: if true then remove repeats: list(set(ls))
     copy: bool
-        whether to deepcopy the input dict d
+        whether to deepcopy the input dict d. The copy is made once, and the nested dicts of the copy are then updated
+        in place
     compare_key: str
         the key that is used to compare dicts (and perform update op) and update d[key] when it is a list if dicts.
         example:
@@ -185,15 +240,30 @@ def dict_deep_update(
             sub_dict_to_update = dict_to_update.get(key_to_update, dict())
             sub_dict_with_update_values = update_values
             dict_to_update[key_to_update] = dict_deep_update(
-                sub_dict_to_update, sub_dict_with_update_values, append_list=append_list, remove_repeats=remove_repeats
+                sub_dict_to_update,
+                sub_dict_with_update_values,
+                append_list=append_list,
+                remove_repeats=remove_repeats,
+                copy=False,
             )
         # Update with list calls the append_replace_dict_in_list function
         elif append_list and isinstance(update_values, list):
-            for value in update_values:
-                dict_or_list_of_dicts = dict_to_update.get(key_to_update, [])
-                dict_to_update[key_to_update] = append_replace_dict_in_list(
-                    dict_or_list_of_dicts, value, compare_key, list_dict_deep_update, remove_repeats
-                )
+            list_to_update = dict_to_update.get(key_to_update, [])
+            if not update_values:  # Nothing to merge, and a missing key is not added
+                continue
+            if isinstance(list_to_update, list):
+                indexed_list = _IndexedList(ls=list(list_to_update), compare_key=compare_key)
+                for value in update_values:
+                    indexed_list.append_replace(
+                        value, list_dict_deep_update=list_dict_deep_update, remove_repeats=remove_repeats
+                    )
+                dict_to_update[key_to_update] = indexed_list.ls
+            else:
+                for value in update_values:
+                    dict_or_list_of_dicts = dict_to_update.get(key_to_update, [])
+                    dict_to_update[key_to_update] = append_replace_dict_in_list(
+                        dict_or_list_of_dicts, value, compare_key, list_dict_deep_update, remove_repeats
+                    )
         # Update with something else
         else:
             dict_to_update[key_to_update] = update_values
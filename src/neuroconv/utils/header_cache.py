@@ -0,0 +1,64 @@
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Union
+from pathlib import Path
+
+
+class HeaderCache:
+    """
+    Memoize the headers and sidecar files read from data files, by path and reader.
+
+    A cached value is reused only while the modification time and size of the path are unchanged, so a file rewritten
+    in between is read again. The least recently used values are evicted beyond `maxsize` entries.
+
+    The cached values are shared by every caller and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Union[str, Path], reader: Callable[[str], Any]) -> Any:
+        """
+        Return reader(path), calling the reader only if the path changed since it was last read with it.
+
+        Parameters
+        ----------
+        path: str or Path
+            The file (or folder) to read.
+        reader: callable
+            A function taking the path as a string. It is part of the key, so it should be defined at module level
+            rather than as a lambda created on every call.
+        """
+        path = os.path.abspath(str(path))
+        path_stat = os.stat(path)
+        key = (path, reader)
+        signature = (path_stat.st_mtime_ns, path_stat.st_size)
+        with self._lock:
+            if key in self._values and self._values[key][0] == signature:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return self._values[key][1]
+            self.misses += 1
+        value = reader(path)
+        with self._lock:
+            self._values[key] = (signature, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Forget all the cached values."""
+        with self._lock:
+            self._values.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by all the data interfaces and their helpers, so that the headers of a file are parsed once per process
+header_cache = HeaderCache()
@@ -3,11 +3,11 @@ import collections.abc
 import json
 import inspect
 from datetime import datetime
-import numpy as np
+from functools import lru_cache
 
-import pynwb
-from pynwb.device import Device
-from pynwb.icephys import IntracellularElectrode
+import numpy as np
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 
 from .dict import dict_deep_update
 from .types import FilePathType, FolderPathType
@@ -40,10 +40,21 @@ def get_base_schema(tag=None, root=False, id_=None, **kwargs) -> dict:
     return base_schema
 
 
+def _copy_schema(schema):
+    """Copy the dictionaries and lists of a cached schema, so that callers may modify it freely."""
+    if isinstance(schema, dict):
+        return {key: _copy_schema(value) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_copy_schema(value) for value in schema]
+    return schema
+
+
 def get_schema_from_method_signature(class_method: classmethod, exclude: list = None) -> dict:
     """
     Take a class method and return a json-schema of the input args.
 
+    The schema is inferred once per method and list of excluded arguments; a copy of it is returned on every call.
+
     Parameters
     ----------
     class_method: function
@@ -52,10 +63,14 @@ def get_schema_from_method_signature(class_method: classmethod, exclude: list =
     -------
     dict
     """
-    if exclude is None:
-        exclude = ["self", "kwargs"]
-    else:
-        exclude = exclude + ["self", "kwargs"]
+    exclude = tuple() if exclude is None else tuple(exclude)
+    return _copy_schema(
+        _get_schema_from_method_signature(class_method=class_method, exclude=exclude + ("self", "kwargs"))
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_schema_from_method_signature(class_method: classmethod, exclude: tuple) -> dict:
     input_schema = get_base_schema()
     annotation_json_type_map = dict(
         bool="boolean",
@@ -143,8 +158,66 @@ def unroot_schema(schema: dict):
     return {k: v for k, v in schema.items() if k in terms}
 
 
+def _compile_validator(schema: dict):
+    validator_class = validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+@lru_cache(maxsize=128)
+def _get_cached_validator(serialized_schema: str):
+    return _compile_validator(schema=json.loads(serialized_schema))
+
+
+def get_schema_validator(schema: dict):
+    """
+    Return a jsonschema validator for the schema, compiled once per distinct schema.
+
+    The schema is checked against its meta-schema only when the validator is first compiled, instead of on every
+    call to jsonschema.validate.
+
+    Parameters
+    ----------
+    schema: dict
+    """
+    try:
+        serialized_schema = json.dumps(schema, cls=NWBMetaDataEncoder, sort_keys=True)
+    except TypeError:  # Default values that cannot be serialized
+        return _compile_validator(schema=schema)
+    return _get_cached_validator(serialized_schema=serialized_schema)
+
+
+def validate_with_cached_validator(instance, schema: dict):
+    """
+    Validate the instance against the schema with a cached validator.
+
+    Raises the same jsonschema.ValidationError as jsonschema.validate.
+
+    Parameters
+    ----------
+    instance: object
+    schema: dict
+    """
+    error = best_match(get_schema_validator(schema=schema).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
 def get_schema_from_hdmf_class(hdmf_class):
-    """Get metadata schema from hdmf class."""
+    """
+    Get metadata schema from hdmf class.
+
+    The schema is inferred once per class; a copy of it is returned on every call.
+    """
+    return _copy_schema(_get_schema_from_hdmf_class(hdmf_class=hdmf_class))
+
+
+@lru_cache(maxsize=None)
+def _get_schema_from_hdmf_class(hdmf_class) -> dict:
+    # pynwb is imported where it is needed, so that importing the utils does not load it
+    from pynwb.base import TimeSeries
+    from pynwb.ophys import PlaneSegmentation
+
     schema = get_base_schema()
     schema["tag"] = hdmf_class.__module__ + "." + hdmf_class.__name__
 
@@ -179,13 +252,13 @@ def get_schema_from_hdmf_class(hdmf_class):
         ):
             schema_arg[docval_arg["name"]].update(type="string", format="date-time")
         # if TimeSeries, skip it
-        elif docval_arg["type"] is pynwb.base.TimeSeries or (
-            isinstance(docval_arg["type"], tuple) and pynwb.base.TimeSeries in docval_arg["type"]
+        elif docval_arg["type"] is TimeSeries or (
+            isinstance(docval_arg["type"], tuple) and TimeSeries in docval_arg["type"]
         ):
             continue
         # if PlaneSegmentation, skip it
-        elif docval_arg["type"] is pynwb.ophys.PlaneSegmentation or (
-            isinstance(docval_arg["type"], tuple) and pynwb.ophys.PlaneSegmentation in docval_arg["type"]
+        elif docval_arg["type"] is PlaneSegmentation or (
+            isinstance(docval_arg["type"], tuple) and PlaneSegmentation in docval_arg["type"]
         ):
             continue
         else:
@@ -199,7 +272,7 @@ def get_schema_from_hdmf_class(hdmf_class):
                 item = docval_arg_type[np.where(is_nwb)[0][0]]
                 # if it is child
                 if docval_arg["name"] in pynwb_children_fields:
-                    items = get_schema_from_hdmf_class(item)
+                    items = _get_schema_from_hdmf_class(hdmf_class=item)
                     schema_arg[docval_arg["name"]].update(type="array", items=items, minItems=1, maxItems=1)
                 # if it is link
                 else:
@@ -290,6 +363,9 @@ def get_schema_for_NWBFile():
 
 
 def get_metadata_schema_for_icephys():
+    from pynwb.device import Device
+    from pynwb.icephys import IntracellularElectrode
+
     schema = get_base_schema(tag="Icephys")
     schema["required"] = ["Device", "Electrode"]
     schema["properties"] = dict(
@@ -0,0 +1,96 @@
+from pathlib import Path
+from tempfile import mkdtemp
+
+import numpy as np
+from hdmf.testing import TestCase
+from numpy.testing import assert_array_equal
+
+from neuroconv.datainterfaces import AxonaLFPDataInterface
+from neuroconv.datainterfaces.ecephys.axona.axona_utils import (
+    AxonaLFPRecordingExtractor,
+    get_all_file_paths,
+    read_all_eeg_file_lfp_data,
+    read_bin_file_position_data,
+)
+
+
+class TestReadBinFilePositionData(TestCase):
+    def setUp(self):
+        self.test_dir = Path(mkdtemp())
+        self.number_of_packets = 100
+        self.raw_rate = 48000
+        with open(self.test_dir / "session.set", "w") as set_file:
+            set_file.write(f"trial_date Friday, 15 Aug 2014\r\nrawRate {self.raw_rate}\r\n")
+
+        packet_dtype = np.dtype(
+            [
+                ("id", "S4"),
+                ("packet", "<i4"),
+                ("di", "<i2"),
+                ("si", "<i2"),
+                ("pos", "<i4"),
+                ("coordinates", "<i2", 8),
+                ("ephys", np.byte, 384),
+                ("trailer", np.byte, 16),
+            ]
+        )
+        rng = np.random.default_rng(seed=0)
+        self.packets = np.zeros(shape=self.number_of_packets, dtype=packet_dtype)
+        self.packets["id"] = np.where(rng.random(self.number_of_packets) < 0.3, b"ADU2", b"ADU1")
+        self.packets["coordinates"] = rng.integers(-1000, 1000, size=(self.number_of_packets, 8))
+        self.packets["ephys"] = rng.integers(-128, 127, size=(self.number_of_packets, 384))
+        self.bin_file_path = str(self.test_dir / "session.bin")
+        self.packets.tofile(self.bin_file_path)
+
+    def test_read_bin_file_position_data(self):
+        position_packets = np.flatnonzero(self.packets["id"] == b"ADU2")[::2]
+        # Columns of the file are X, Y, x, y, PX, px, tot_px, unused and are flipped pairwise
+        expected_coordinates = self.packets["coordinates"][position_packets][:, [1, 0, 3, 2, 5, 4, 7, 6]]
+        expected_times = (position_packets / (self.raw_rate / 3000)).astype("int64")
+
+        for packets_per_chunk in (7, 2**16):
+            position_data = read_bin_file_position_data(
+                bin_file_path=self.bin_file_path, packets_per_chunk=packets_per_chunk
+            )
+            self.assertEqual(position_data.shape, (len(position_packets), 9))
+            assert_array_equal(position_data[:, 0], expected_times)
+            assert_array_equal(position_data[:, 1:], expected_coordinates)
+
+
+class TestAxonaLFPRecordingExtractor(TestCase):
+    def setUp(self):
+        self.test_dir = Path(mkdtemp())
+        self.number_of_samples = 500
+        self.file_names = ["session.eeg", "session.eeg2", "session.eeg10"]
+        rng = np.random.default_rng(seed=0)
+        self.lfp_data = rng.integers(-128, 127, size=(len(self.file_names), self.number_of_samples), dtype="int8")
+        for file_name, channel_data in zip(self.file_names, self.lfp_data):
+            self.write_eeg_file(file_path=self.test_dir / file_name, channel_data=channel_data)
+        # Files in subdirectories belong to other sessions
+        (self.test_dir / "other_session").mkdir()
+        self.write_eeg_file(file_path=self.test_dir / "other_session" / "session.eeg3", channel_data=self.lfp_data[0])
+
+    @staticmethod
+    def write_eeg_file(file_path: Path, channel_data: np.ndarray):
+        header = f"trial_date Friday, 15 Aug 2014\r\nsample_rate 250.0 hz\r\nnum_EEG_samples {len(channel_data)}\r\n"
+        with open(file_path, "wb") as eeg_file:
+            eeg_file.write(header.encode() + b"data_start" + channel_data.tobytes() + b"\r\ndata_end\r\n")
+
+    def test_get_all_file_paths(self):
+        self.assertEqual(get_all_file_paths(self.test_dir / "session.eeg"), self.file_names)
+
+    def test_recording_extractor(self):
+        recording = AxonaLFPRecordingExtractor(file_path=self.test_dir / "session.eeg")
+        self.assertEqual(recording.get_sampling_frequency(), 250.0)
+        self.assertEqual(recording.get_num_samples(), self.number_of_samples)
+        assert_array_equal(recording.get_channel_ids(), [0, 1, 2])
+        assert_array_equal(recording.get_traces(), self.lfp_data.T)
+        assert_array_equal(
+            recording.get_traces(start_frame=10, end_frame=20, channel_ids=[2, 0]), self.lfp_data[[2, 0], 10:20].T
+        )
+        assert_array_equal(read_all_eeg_file_lfp_data(self.test_dir / "session.eeg"), self.lfp_data)
+
+    def test_lfp_interface(self):
+        interface = AxonaLFPDataInterface(file_path=str(self.test_dir / "session.eeg"))
+        self.assertIsInstance(interface.recording_extractor, AxonaLFPRecordingExtractor)
+        assert_array_equal(interface.recording_extractor.get_traces(), self.lfp_data.T)
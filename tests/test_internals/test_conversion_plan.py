@@ -0,0 +1,126 @@
+import json
+from pathlib import Path
+from tempfile import mkdtemp
+
+import numpy as np
+import tifffile
+from click.testing import CliRunner
+from h5py._hl.filters import guess_chunk
+from hdmf.testing import TestCase
+
+from neuroconv import NWBConverter, plan_conversion_from_yaml
+from neuroconv.datainterfaces import AxonaLFPDataInterface, TiffImagingInterface
+from neuroconv.tools.yaml_conversion_specification.yaml_conversion_specification import run_conversion_from_yaml_cli
+
+
+class TestConversionPlan(TestCase):
+    def setUp(self):
+        self.test_dir = Path(mkdtemp())
+        self.number_of_samples = 1000
+        self.file_names = ["session.eeg", "session.eeg2"]
+        rng = np.random.default_rng(seed=0)
+        self.lfp_data = rng.integers(-4, 4, size=(len(self.file_names), self.number_of_samples), dtype="int8")
+        for file_name, channel_data in zip(self.file_names, self.lfp_data):
+            header = (
+                f"trial_date Friday, 15 Aug 2014\r\nsample_rate 250.0 hz\r\nnum_EEG_samples {len(channel_data)}\r\n"
+            )
+            with open(self.test_dir / file_name, "wb") as eeg_file:
+                eeg_file.write(header.encode() + b"data_start" + channel_data.tobytes() + b"\r\ndata_end\r\n")
+
+        self.specification_file_path = self.test_dir / "specification.yml"
+        with open(self.specification_file_path, "w") as specification_file:
+            specification_file.write(
+                "metadata:\n"
+                "  NWBFile:\n"
+                "    session_start_time: '2014-08-15T00:00:00'\n"
+                "experiments:\n"
+                "  lfp:\n"
+                "    data_interfaces:\n"
+                "      - AxonaLFPDataInterface\n"
+                "    sessions:\n"
+                "      - nwbfile_name: session_one.nwb\n"
+                "        source_data:\n"
+                "          AxonaLFPDataInterface:\n"
+                "            file_path: session.eeg\n"
+                "      - nwbfile_name: session_two.nwb\n"
+                "        source_data:\n"
+                "          AxonaLFPDataInterface:\n"
+                "            file_path: missing_session/session.eeg\n"
+            )
+
+    def assert_lfp_dataset_plan(self, dataset_plan: dict):
+        self.assertEqual(dataset_plan["name"], "ElectricalSeries_lfp")
+        self.assertEqual(dataset_plan["shape"], [self.number_of_samples, len(self.file_names)])
+        self.assertEqual(dataset_plan["compression"], "gzip")
+        self.assertEqual(dataset_plan["bytes"], self.lfp_data.nbytes * np.dtype(dataset_plan["dtype"]).itemsize)
+        self.assertLess(dataset_plan["estimated_compressed_bytes"], dataset_plan["bytes"])
+
+    def test_converter_get_conversion_plan(self):
+        class LFPConverter(NWBConverter):
+            data_interface_classes = dict(LFP=AxonaLFPDataInterface)
+
+        converter = LFPConverter(source_data=dict(LFP=dict(file_path=str(self.test_dir / "session.eeg"))))
+        plan = converter.get_conversion_plan()
+
+        self.assertEqual(plan["interfaces_without_datasets"], [])
+        self.assertEqual(len(plan["datasets"]["LFP"]), 1)
+        self.assert_lfp_dataset_plan(dataset_plan=plan["datasets"]["LFP"][0])
+        self.assertEqual(plan["total_bytes"], plan["datasets"]["LFP"][0]["bytes"])
+        self.assertEqual(plan["estimated_runtime"], plan["total_bytes"] / 1e6 / 17.0)
+        self.assertGreater(plan["estimated_peak_memory_bytes"], 0)
+        self.assertEqual(list(self.test_dir.glob("*.nwb")), [])
+
+    def test_recording_datasets_follow_conversion_options(self):
+        interface = AxonaLFPDataInterface(file_path=str(self.test_dir / "session.eeg"))
+        self.assertEqual(interface.get_datasets(write_electrical_series=False), dict())
+
+        # The original DataChunkIterator reads all the traces at once and lets h5py guess the chunks
+        traces_shape = (self.number_of_samples, len(self.file_names))
+        data_chunk_iterator = interface.get_datasets(iterator_type="v1")["ElectricalSeries_lfp"].data
+        self.assertEqual(data_chunk_iterator.buffer_shape, traces_shape)
+        self.assertEqual(data_chunk_iterator.chunk_shape, guess_chunk(traces_shape, None, self.lfp_data.itemsize))
+
+        with self.assertRaisesWith(ValueError, "iterator_type v3 should be either 'v1', 'v2' (recommended) or None"):
+            interface.get_datasets(iterator_type="v3")
+
+    def test_imaging_datasets_with_summary_images(self):
+        file_path = self.test_dir / "imaging.tif"
+        tifffile.imwrite(file_path, np.zeros((10, 8, 6), dtype="uint16"), photometric="minisblack")
+        interface = TiffImagingInterface(file_path=str(file_path), sampling_frequency=30.0, verbose=False)
+        self.assertEqual(list(interface.get_datasets()), ["TwoPhotonSeries"])
+
+        datasets = interface.get_datasets(compute_summary_images=True)
+        self.assertEqual(
+            list(datasets),
+            [
+                "TwoPhotonSeries",
+                "summary_images/mean",
+                "summary_images/max",
+                "summary_images/std",
+                "summary_images/correlation",
+            ],
+        )
+        self.assertEqual(datasets["summary_images/max"].data.maxshape, (6, 8))
+        self.assertEqual(datasets["summary_images/max"].data.dtype, np.dtype("uint16"))
+        self.assertEqual(datasets["summary_images/mean"].data.dtype, np.dtype("float64"))
+
+    def test_plan_conversion_from_yaml(self):
+        plan = plan_conversion_from_yaml(specification_file_path=self.specification_file_path)
+
+        planned_session, missing_session = plan["sessions"]
+        self.assertEqual(planned_session["nwbfile_path"], str(self.test_dir / "session_one.nwb"))
+        self.assertEqual(planned_session["metadata_errors"], [])
+        self.assert_lfp_dataset_plan(dataset_plan=planned_session["datasets"]["AxonaLFPDataInterface"][0])
+        self.assertIn("error", missing_session)
+        self.assertEqual(plan["number_of_errors"], 1)
+        self.assertEqual(plan["total_bytes"], planned_session["total_bytes"])
+        self.assertEqual(list(self.test_dir.glob("*.nwb")), [])
+
+    def test_plan_conversion_from_yaml_cli(self):
+        result = CliRunner().invoke(run_conversion_from_yaml_cli, [str(self.specification_file_path), "--plan"])
+
+        self.assertEqual(result.exit_code, 0, msg=result.output)
+        plan = json.loads(result.stdout)
+        self.assertEqual(len(plan["sessions"]), 2)
+        self.assertEqual(plan["number_of_errors"], 1)
+        self.assertEqual(list(self.test_dir.glob("*.nwb")), [])
@@ -4,6 +4,7 @@ from pathlib import Path
 from datetime import datetime
 
 from pynwb import NWBFile
+from jsonschema import ValidationError
 
 from neuroconv import NWBConverter
 from neuroconv.basedatainterface import BaseDataInterface
@@ -42,3 +43,40 @@ def test_converter():
         converter.run_conversion(nwbfile_path=nwbfile_path, overwrite=True, metadata=metadata)
 
         rmtree(test_dir)
+
+
+def test_converter_metadata_schema_cache():
+    class CountingInterface(BaseDataInterface):
+        number_of_metadata_calls = 0
+
+        def get_metadata(self):
+            CountingInterface.number_of_metadata_calls += 1
+            return super().get_metadata()
+
+        def run_conversion(self, nwbfile: NWBFile, metadata: dict):
+            pass
+
+    class CountingNWBConverter(NWBConverter):
+        data_interface_classes = dict(Counting=CountingInterface)
+
+    converter = CountingNWBConverter(source_data=dict(Counting=dict()))
+    metadata = converter.get_metadata()
+    metadata["NWBFile"]["session_start_time"] = datetime.now().astimezone()
+    for _ in range(3):
+        converter.validate_metadata(metadata=metadata)
+    assert CountingInterface.number_of_metadata_calls == 2
+
+    metadata_schema = converter.get_metadata_schema()
+    metadata_schema["properties"].pop("NWBFile")
+    assert "NWBFile" in converter.get_metadata_schema()["properties"]
+
+    metadata["NWBFile"]["unknown_field"] = 1
+    try:
+        converter.validate_metadata(metadata=metadata)
+        assert False, "The invalid metadata was not caught!"
+    except ValidationError:
+        pass
+
+    converter.data_interface_objects = dict(Counting=CountingInterface())
+    converter.get_metadata_schema()
+    assert CountingInterface.number_of_metadata_calls == 3
@@ -0,0 +1,108 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest.mock import Mock
+
+from hdmf.testing import TestCase
+
+from neuroconv.basedatainterface import BaseDataInterface
+from neuroconv.datainterfaces.ecephys.neuralynx.neuralynxdatainterface import get_filtering, get_metadata
+from neuroconv.datainterfaces.ecephys.openephys.openephysdatainterface import (
+    get_settings_file_path,
+    read_session_start_time,
+)
+from neuroconv.utils import HeaderCache
+
+
+def read_text(file_path: str) -> str:
+    return Path(file_path).read_text()
+
+
+class TestHeaderCache(TestCase):
+    def setUp(self):
+        self.test_dir = Path(mkdtemp())
+        self.file_path = self.test_dir / "header.txt"
+        self.file_path.write_text("first")
+
+    def test_header_cache(self):
+        header_cache = HeaderCache()
+        reader = Mock(side_effect=read_text)
+        self.assertEqual(header_cache.get(path=self.file_path, reader=reader), "first")
+        self.assertEqual(header_cache.get(path=str(self.file_path), reader=reader), "first")
+        self.assertEqual(reader.call_count, 1)
+        self.assertEqual((header_cache.hits, header_cache.misses), (1, 1))
+
+        # Each reader of a path is cached separately
+        self.assertEqual(header_cache.get(path=self.file_path, reader=read_text), "first")
+        self.assertEqual(header_cache.misses, 2)
+
+    def test_header_cache_invalidated_by_modification(self):
+        header_cache = HeaderCache()
+        header_cache.get(path=self.file_path, reader=read_text)
+        self.file_path.write_text("second")
+        modification_time_ns = os.stat(self.file_path).st_mtime_ns + 10**9
+        os.utime(self.file_path, ns=(modification_time_ns, modification_time_ns))
+        self.assertEqual(header_cache.get(path=self.file_path, reader=read_text), "second")
+
+    def test_header_cache_eviction(self):
+        header_cache = HeaderCache(maxsize=2)
+        file_paths = [self.test_dir / f"header{index}.txt" for index in range(3)]
+        for file_path in file_paths:
+            file_path.write_text(file_path.stem)
+            header_cache.get(path=file_path, reader=read_text)
+        header_cache.get(path=file_paths[2], reader=read_text)
+        self.assertEqual(header_cache.hits, 1)
+        header_cache.get(path=file_paths[0], reader=read_text)
+        self.assertEqual(header_cache.misses, 4)
+
+        header_cache.clear()
+        header_cache.get(path=file_paths[2], reader=read_text)
+        self.assertEqual((header_cache.hits, header_cache.misses), (0, 1))
+
+    def test_neuralynx_header_read_once(self):
+        header = (
+            "######## Neuralynx Data File Header\n"
+            "-FileVersion 3.4\n"
+            "-TimeCreated 2020/01/02 03:04:05\n"
+            "-SessionUUID 1234\n"
+            "-DspLowCutFrequency 0.1\n"
+            "-DspHighCutFrequency 9000\n"
+        )
+        channel_path = self.test_dir / "CSC1.ncs"
+        channel_path.write_bytes(header.encode("latin1").ljust(1024 + 16, b"\x00"))
+
+        misses = BaseDataInterface.header_cache.misses
+        for _ in range(2):
+            self.assertEqual(
+                get_metadata(folder_path=self.test_dir),
+                dict(session_start_time=datetime(2020, 1, 2, 3, 4, 5), session_id="1234"),
+            )
+            self.assertEqual(
+                get_filtering(channel_path=channel_path), '{"DspLowCutFrequency": "0.1", "DspHighCutFrequency": "9000"}'
+            )
+        self.assertEqual(BaseDataInterface.header_cache.misses, misses + 1)
+
+    def test_openephys_session_start_time_keyed_on_settings_file(self):
+        session_path = self.test_dir / "Record Node 101"
+        (session_path / "experiment1").mkdir(parents=True)
+        settings_file_path = session_path / "settings.xml"
+        settings_file_path.write_text("<SETTINGS><INFO><DATE>2 Jan 2020 03:04:05</DATE></INFO></SETTINGS>")
+
+        self.assertEqual(get_settings_file_path(folder_path=session_path), settings_file_path)
+        header_cache = HeaderCache()
+        self.assertEqual(
+            header_cache.get(path=settings_file_path, reader=read_session_start_time), datetime(2020, 1, 2, 3, 4, 5)
+        )
+
+        (session_path / "experiment1" / "structure.oebin").write_text("{}")
+        (session_path / "notes.txt").write_text("notes")
+        header_cache.get(path=get_settings_file_path(folder_path=session_path), reader=read_session_start_time)
+        self.assertEqual((header_cache.hits, header_cache.misses), (1, 1))
+
+        settings_file_path.write_text("<SETTINGS><INFO><DATE>12 Feb 2021 13:14:15</DATE></INFO></SETTINGS>")
+        os.utime(settings_file_path, ns=(0, 0))
+        self.assertEqual(
+            header_cache.get(path=settings_file_path, reader=read_session_start_time), datetime(2021, 2, 12, 13, 14, 15)
+        )
+        self.assertEqual(header_cache.misses, 2)
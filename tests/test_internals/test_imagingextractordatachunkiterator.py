@@ -185,3 +185,45 @@ class TestImagingExtractorDataChunkIterator(TestCase):
 
         self.assertEqual(dci.display_progress, True)
         self.assertEqual(dci.progress_bar.desc, "Test Progress Bar")
+
+    @parameterized.expand(
+        input=[
+            param(buffer_shape=(9, 10, 10), chunk_shape=(3, 10, 10), case_name="full_frame_buffers"),
+            param(buffer_shape=(10, 5, 5), chunk_shape=(5, 5, 5), case_name="partial_frame_buffers"),
+        ],
+        name_func=custom_name_func,
+    )
+    def test_summary_images(self, buffer_shape, chunk_shape, case_name=""):
+        """Test that the summary images accumulated during the iteration match those of the full video."""
+        imaging_extractor = generate_dummy_imaging_extractor(num_frames=27, num_columns=10, num_rows=10)
+        dci = ImagingExtractorDataChunkIterator(
+            imaging_extractor=imaging_extractor,
+            buffer_shape=buffer_shape,
+            chunk_shape=chunk_shape,
+            compute_summary_images=True,
+        )
+        for _ in dci:
+            pass
+
+        accumulator = dci.summary_images_accumulator
+        assert accumulator.is_complete
+        images = accumulator.get_images()
+
+        video = imaging_extractor.get_video().transpose((0, 2, 1)).astype("float64")
+        np.testing.assert_allclose(images["mean"], video.mean(axis=0))
+        np.testing.assert_allclose(images["max"], video.max(axis=0))
+        np.testing.assert_allclose(images["std"], video.std(axis=0))
+
+        # Brute force average correlation of each pixel with its 8-connected neighbors
+        num_columns, num_rows = video.shape[1:]
+        expected_correlation = np.zeros(shape=(num_columns, num_rows))
+        for x in range(num_columns):
+            for y in range(num_rows):
+                neighbor_correlations = [
+                    np.corrcoef(video[:, x, y], video[:, x + dx, y + dy])[0, 1]
+                    for dx in (-1, 0, 1)
+                    for dy in (-1, 0, 1)
+                    if (dx, dy) != (0, 0) and 0 <= x + dx < num_columns and 0 <= y + dy < num_rows
+                ]
+                expected_correlation[x, y] = np.mean(neighbor_correlations)
+        np.testing.assert_allclose(images["correlation"], expected_correlation, atol=1e-10)
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+import unittest
+
+from parameterized import parameterized
+
+HEAVY_MODULES = ["pynwb", "spikeinterface", "spikeextractors", "roiextractors", "neo", "cv2", "dandi"]
+
+
+def get_loaded_heavy_modules(statement: str) -> list:
+    """Run the import statement in a fresh interpreter and return the heavy modules it loaded."""
+    script = f"import sys\n{statement}\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+class TestLazyImports(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("import neuroconv",),
+            ("import neuroconv.datainterfaces",),
+            ("import neuroconv.tools",),
+            ("from neuroconv.tools.yaml_conversion_specification import run_conversion_from_yaml",),
+        ]
+    )
+    def test_import_does_not_load_heavy_modules(self, statement):
+        self.assertEqual(get_loaded_heavy_modules(statement=statement), [])
+
+    def test_interface_access_loads_only_its_dependencies(self):
+        loaded_modules = get_loaded_heavy_modules(statement="from neuroconv import MovieInterface")
+        self.assertIn("cv2", loaded_modules)
+        self.assertNotIn("spikeinterface", loaded_modules)
+
+    def test_lazy_attributes(self):
+        import neuroconv
+        from neuroconv.datainterfaces import interface_modules
+        from neuroconv.tools.spikeinterface import spikeinterface
+
+        self.assertIs(neuroconv.spikeinterface, spikeinterface)
+        self.assertEqual([interface.__name__ for interface in neuroconv.interface_list], list(interface_modules))
+        self.assertIn("MovieInterface", dir(neuroconv))
+        with self.assertRaises(AttributeError):
+            neuroconv.NotAnInterface
+
+    @parameterized.expand(
+        [
+            ("spikeinterface", ["write_recording", "add_electrodes_info", "add_all_to_nwbfile", "get_nspikes"]),
+            ("roiextractors", ["write_imaging", "get_default_ophys_metadata"]),
+            ("neo", ["write_neo_to_nwb", "get_nwb_metadata", "add_all_to_nwbfile"]),
+        ]
+    )
+    def test_tool_functions_are_attributes_of_the_tools(self, tool_name, function_names):
+        # The subpackage is bound as the attribute of neuroconv.tools, whether it is imported directly or lazily
+        for statement in [f"import neuroconv.tools.{tool_name}", "import neuroconv.tools"]:
+            script = (
+                f"{statement}\nimport neuroconv\ntool = getattr(neuroconv.tools, {tool_name!r})\n"
+                f"print(' '.join(name for name in {function_names!r} if callable(getattr(tool, name, None))))"
+            )
+            result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+            self.assertEqual(result.stdout.split(), function_names)
+
+    @parameterized.expand(
+        [
+            ("neuroconv", ["NWBConverter", "run_conversion_from_yaml", "MovieInterface", "interface_list", "neo"]),
+            ("neuroconv.datainterfaces", ["AxonaLFPDataInterface", "interface_list"]),
+            ("neuroconv.tools", ["run_conversion_from_yaml", "spikeinterface", "roiextractors", "neo"]),
+        ]
+    )
+    def test_star_import(self, module_name, expected_names):
+        script = (
+            f"from {module_name} import *\nprint(' '.join(name for name in {expected_names!r} if name in globals()))"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), expected_names)
@@ -3,13 +3,23 @@ import json
 from pathlib import Path
 from typing import Union
 from copy import deepcopy
+from datetime import datetime
+from time import perf_counter
+
+import pytest
+from jsonschema import ValidationError, validate
 
 from neuroconv.utils import (
     get_schema_from_method_signature,
     dict_deep_update,
     fill_defaults,
     load_dict_from_file,
+    get_base_schema,
+    get_schema_validator,
+    validate_with_cached_validator,
+    get_schema_from_hdmf_class,
 )
+from neuroconv.utils.json_schema import _get_schema_from_hdmf_class, _get_schema_from_method_signature
 
 
 def compare_dicts(a: dict, b: dict):
@@ -132,6 +142,51 @@ def test_dict_deep_update_4():
     compare_dicts(result4, correct_result)
 
 
+def test_dict_deep_update_copy():
+    # 5. the output is a deep copy of d, so mutating any of its values leaves the inputs unchanged
+    a5 = dict(a=dict(b=dict(c=[1]), d=[1, 2]), e=dict(f=[dict(name="x", g=1)]))
+    b5 = dict(a=dict(d=[3]), e=dict(f=[dict(name="x", h=2)]))
+    a5_copy, b5_copy = deepcopy(a5), deepcopy(b5)
+    result5 = dict_deep_update(a5, b5)
+    assert result5 == dict(a=dict(b=dict(c=[1]), d=[1, 2, 3]), e=dict(f=[dict(name="x", g=1, h=2)]))
+    result5["a"]["b"]["c"].append(2)
+    result5["a"]["d"].append(4)
+    result5["e"]["f"][0]["g"] = 3
+    assert a5 == a5_copy and b5 == b5_copy
+
+    # dicts are matched on the compare key among lists that also contain other values
+    result5 = dict_deep_update(dict(ls=["x", dict(name="x", g=1)]), dict(ls=[dict(name="x", g=2), "y"]))
+    assert result5 == dict(ls=["x", dict(name="x", g=2), "y"])
+
+
+def test_dict_deep_update_benchmark():
+    """Test that the metadata of a thousand electrodes is merged in a fraction of a second."""
+
+    def get_ecephys_metadata(description: str, num_electrodes: int = 1000):
+        return dict(
+            Ecephys=dict(
+                Device=[dict(name="Device", description=description)],
+                ElectrodeGroup=[
+                    dict(name=f"ElectrodeGroup{index}", description=description, location="unknown", device="Device")
+                    for index in range(num_electrodes)
+                ],
+                Electrodes=[
+                    dict(name=f"channel{index}", description=description, data=[index])
+                    for index in range(num_electrodes)
+                ],
+            )
+        )
+
+    metadata = get_ecephys_metadata(description="old")
+    start_time = perf_counter()
+    result = dict_deep_update(metadata, get_ecephys_metadata(description="new"))
+    elapsed_time = perf_counter() - start_time
+
+    assert elapsed_time < 0.25
+    assert result == get_ecephys_metadata(description="new")
+    assert metadata == get_ecephys_metadata(description="old")
+
+
 def test_fill_defaults():
 
     schema = dict(
@@ -214,3 +269,60 @@ def test_load_metadata_from_file():
 
     m2 = load_dict_from_file(file_path=json_file_path)
     compare_dicts_2(m0, m2)
+
+
+def test_validate_with_cached_validator():
+    schema = get_base_schema(
+        root=True,
+        properties=dict(
+            session_start_time=dict(type="string", format="date-time", default=datetime(2020, 1, 1)),
+            rate=dict(type="number"),
+        ),
+        required=["session_start_time"],
+    )
+    validator = get_schema_validator(schema=deepcopy(schema))
+    assert get_schema_validator(schema=deepcopy(schema)) is validator
+
+    validate_with_cached_validator(instance=dict(session_start_time="2020-01-01T00:00:00", rate=1.0), schema=schema)
+    for invalid_instance in (dict(rate="fast"), dict(session_start_time="", unknown=1)):
+        with pytest.raises(ValidationError) as error:
+            validate(instance=invalid_instance, schema=schema)
+        with pytest.raises(ValidationError) as cached_error:
+            validate_with_cached_validator(instance=invalid_instance, schema=schema)
+        assert cached_error.value.message == error.value.message
+
+
+def test_get_schema_from_hdmf_class_cache():
+    from pynwb.ophys import ImagingPlane, TwoPhotonSeries
+
+    schema = get_schema_from_hdmf_class(TwoPhotonSeries)
+    cache_info = _get_schema_from_hdmf_class.cache_info()
+    assert get_schema_from_hdmf_class(TwoPhotonSeries) == schema
+    assert _get_schema_from_hdmf_class.cache_info().hits == cache_info.hits + 1
+
+    # The returned schemas are copies that can be modified without affecting the cache
+    schema["properties"].pop("name")
+    schema["required"].append("unknown")
+    second_schema = get_schema_from_hdmf_class(TwoPhotonSeries)
+    assert "name" in second_schema["properties"]
+    assert "unknown" not in second_schema["required"]
+    imaging_plane_schema = get_schema_from_hdmf_class(ImagingPlane)
+    imaging_plane_schema["properties"]["optical_channel"]["items"]["required"].clear()
+    assert get_schema_from_hdmf_class(ImagingPlane)["properties"]["optical_channel"]["items"]["required"]
+
+
+def test_get_schema_from_method_signature_cache():
+    def method(self, a: int, b: str = "b", c: float = None):
+        pass
+
+    schema = get_schema_from_method_signature(method, exclude=["c"])
+    cache_info = _get_schema_from_method_signature.cache_info()
+    schema["properties"].pop("a")
+    assert get_schema_from_method_signature(method, exclude=["c"]) == dict(
+        required=["a"],
+        properties=dict(a=dict(type="number"), b=dict(type="string", default="b")),
+        type="object",
+        additionalProperties=False,
+    )
+    assert _get_schema_from_method_signature.cache_info().hits == cache_info.hits + 1
+    assert "c" in get_schema_from_method_signature(method)["properties"]
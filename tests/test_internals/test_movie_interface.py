@@ -4,11 +4,18 @@ from hdmf.testing import TestCase
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 from pynwb import NWBHDF5IO
 
 from neuroconv import NWBConverter, MovieInterface
+from neuroconv.datainterfaces.behavior.movie.movie_utils import (
+    VideoCaptureContext,
+    get_encoded_movie_frames,
+    get_frames_data_chunk_iterator,
+    write_encoded_movie,
+)
 
 try:
     import cv2
@@ -92,6 +99,141 @@ class TestMovieInterface(TestCase):
                 assert movie_interface_name in mod
                 assert self.starting_times[no] == mod[movie_interface_name].starting_time
 
+    def test_movie_parallel_decoding(self):
+        conversion_opts = dict(Movie=dict(starting_times=self.starting_times, external_mode=False, max_workers=2))
+        self.nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            overwrite=True,
+            conversion_options=conversion_opts,
+            metadata=self.metadata,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            for movie_file, movie_metadata in zip(self.movie_files, self.metadata["Behavior"]["Movies"]):
+                with VideoCaptureContext(movie_file) as video_capture_ob:
+                    expected_frames = np.array(list(video_capture_ob))
+                np.testing.assert_array_equal(nwbfile.acquisition[movie_metadata["name"]].data[:], expected_frames)
+
+    def test_movie_parallel_decoding_interleaves_movies(self):
+        written_movies = []
+
+        def get_logged_frames_data_chunk_iterator(frames, maxshape, desc):
+            def log_frames():
+                for frame in frames:
+                    written_movies.append(desc)
+                    yield frame
+
+            return get_frames_data_chunk_iterator(frames=log_frames(), maxshape=maxshape, desc=desc)
+
+        conversion_opts = dict(Movie=dict(starting_times=self.starting_times, external_mode=False, max_workers=2))
+        with patch(
+            "neuroconv.datainterfaces.behavior.movie.moviedatainterface.get_frames_data_chunk_iterator",
+            side_effect=get_logged_frames_data_chunk_iterator,
+        ):
+            self.nwb_converter.run_conversion(
+                nwbfile_path=self.nwbfile_path,
+                overwrite=True,
+                conversion_options=conversion_opts,
+                metadata=self.metadata,
+            )
+
+        # The frames of both movies are written in turns rather than one movie after the other
+        first_movie, second_movie = [f"Copying movie data for {Path(file).name}" for file in self.movie_files]
+        self.assertEqual(written_movies.count(first_movie), 30)
+        self.assertEqual(written_movies.count(second_movie), 30)
+        self.assertEqual(written_movies[:4], [first_movie, second_movie, first_movie, second_movie])
+
+    def test_movie_interface_writes_nwbfile(self):
+        movie_interface = self.nwb_converter.data_interface_objects["Movie"]
+        movie_interface.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            metadata=self.metadata,
+            overwrite=True,
+            starting_times=self.starting_times,
+            external_mode=False,
+            max_workers=2,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            for movie_file, movie_metadata in zip(self.movie_files, self.metadata["Behavior"]["Movies"]):
+                with VideoCaptureContext(movie_file) as video_capture_ob:
+                    expected_frames = np.array(list(video_capture_ob))
+                np.testing.assert_array_equal(nwbfile.acquisition[movie_metadata["name"]].data[:], expected_frames)
+
+    def test_single_movie_segmented_decoding(self):
+        nwb_converter = self.nwb_converter.__class__(source_data=dict(Movie=dict(file_paths=self.movie_files[:1])))
+        metadata = self.metadata
+        metadata["Behavior"]["Movies"] = metadata["Behavior"]["Movies"][:1]
+        nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            overwrite=True,
+            conversion_options=dict(Movie=dict(external_mode=False, max_workers=2)),
+            metadata=metadata,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            with VideoCaptureContext(self.movie_files[0]) as video_capture_ob:
+                expected_frames = np.array(list(video_capture_ob))
+            movie_name = metadata["Behavior"]["Movies"][0]["name"]
+            np.testing.assert_array_equal(nwbfile.acquisition[movie_name].data[:], expected_frames)
+
+    def test_movie_passthrough(self):
+        conversion_opts = dict(Movie=dict(starting_times=self.starting_times, external_mode=False, passthrough=True))
+        self.nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            overwrite=True,
+            conversion_options=conversion_opts,
+            metadata=self.metadata,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            encoded_movies = nwbfile.acquisition["EncodedMovies"]
+            for movie_file, movie_metadata in zip(self.movie_files, self.metadata["Behavior"]["Movies"]):
+                image_series = nwbfile.acquisition[movie_metadata["name"]]
+                self.assertEqual(image_series.format, "external")
+                self.assertEqual(list(image_series.external_file[:]), [str(movie_file)])
+                self.assertEqual(list(image_series.dimension), [480, 640])
+                self.assertEqual(image_series.rate, 25.0)
+
+                restored_movie_file = self.test_dir / "restored.avi"
+                write_encoded_movie(
+                    encoded_movies=encoded_movies,
+                    image_series_name=image_series.name,
+                    file_path=restored_movie_file,
+                    bytes_per_block=10**5,
+                )
+                self.assertEqual(restored_movie_file.read_bytes(), Path(movie_file).read_bytes())
+
+                with VideoCaptureContext(movie_file) as video_capture_ob:
+                    expected_frames = np.array(list(video_capture_ob))
+                frames = np.array(
+                    list(get_encoded_movie_frames(encoded_movies=encoded_movies, image_series_name=image_series.name))
+                )
+                np.testing.assert_array_equal(frames, expected_frames)
+
+    def test_movie_passthrough_stub(self):
+        conversion_opts = dict(
+            Movie=dict(starting_times=self.starting_times, external_mode=False, passthrough=True, stub_test=True)
+        )
+        self.nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            overwrite=True,
+            conversion_options=conversion_opts,
+            metadata=self.metadata,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            encoded_movies = nwbfile.acquisition["EncodedMovies"]
+            for row, (movie_file, movie_metadata) in enumerate(
+                zip(self.movie_files, self.metadata["Behavior"]["Movies"])
+            ):
+                image_series = nwbfile.acquisition[movie_metadata["name"]]
+                with VideoCaptureContext(movie_file) as video_capture_ob:
+                    number_of_frames = video_capture_ob.get_movie_frame_count()
+                number_of_bytes = len(encoded_movies["encoded_data"][row])
+                self.assertEqual(number_of_bytes, int(np.ceil(Path(movie_file).stat().st_size * 10 / number_of_frames)))
+                self.assertEqual(image_series.rate, 25.0)
+
     def test_movie_no_starting_times(self):
         conversion_opts = dict(Movie=dict(external_mode=False))
         with self.assertRaises(ValueError):
@@ -119,6 +261,24 @@ class TestMovieInterface(TestCase):
             assert movie_interface_name in mod
             assert mod[movie_interface_name].starting_time == 0.0
 
+    def test_movie_external_mode_multiple_files(self):
+        conversion_opts = dict(Movie=dict(external_mode=True))
+        metadata = self.metadata
+        movie_interface_name = metadata["Behavior"]["Movies"][0]["name"]
+        metadata["Behavior"]["Movies"][1]["name"] = movie_interface_name
+        self.nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path,
+            overwrite=True,
+            conversion_options=conversion_opts,
+            metadata=metadata,
+        )
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            image_series = nwbfile.acquisition[movie_interface_name]
+            self.assertEqual(list(image_series.external_file[:]), self.movie_files)
+            self.assertEqual(list(image_series.starting_frame[:]), [0, 30])
+            self.assertEqual(image_series.rate, 25.0)
+
     def test_save_movie_to_custom_module(self):
         module_name = "TestModule"
         module_description = "This is a test module."
@@ -157,6 +317,27 @@ class TestMovieInterface(TestCase):
                 movie_interface_name = movie_metadata["name"]
                 assert mod[movie_interface_name].data.chunks is not None  # TODO retrive storage_layout of hdf5 dataset
 
+    def test_movie_buffered_decoding(self):
+        frame_size = 640 * 480 * 3
+        conv_ops = dict(
+            Movie=dict(
+                external_mode=False,
+                starting_times=self.starting_times,
+                chunk_data=False,
+                buffer_gb=frame_size * 4 / 1e9,
+            )
+        )
+        self.nwb_converter.run_conversion(
+            nwbfile_path=self.nwbfile_path, overwrite=True, conversion_options=conv_ops, metadata=self.metadata
+        )
+
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            for movie_file, movie_metadata in zip(self.movie_files, self.metadata["Behavior"]["Movies"]):
+                with VideoCaptureContext(movie_file) as video_capture_ob:
+                    expected_frames = np.array(list(video_capture_ob))
+                np.testing.assert_array_equal(nwbfile.acquisition[movie_metadata["name"]].data[:], expected_frames)
+
     def test_movie_external_mode(self):
         conversion_opts = dict(Movie=dict(starting_times=self.starting_times, external_mode=True))
         self.nwb_converter.run_conversion(
@@ -220,6 +401,13 @@ class TestMovieInterface(TestCase):
                 movie_interface_name = metadata["Behavior"]["Movies"][no]["name"]
                 assert mod[movie_interface_name].data.shape[0] == 10
 
+    def test_movie_stub_fraction(self):
+        movie_interface = self.nwb_converter.data_interface_objects["Movie"]
+        # The stubs decode the first 10 of the 30 frames of each movie; in external mode, nothing is decoded either way
+        self.assertAlmostEqual(movie_interface.get_stub_fraction(external_mode=False), 10 / 30)
+        self.assertAlmostEqual(movie_interface.get_stub_fraction(external_mode=False, passthrough=True), 10 / 30)
+        self.assertEqual(movie_interface.get_stub_fraction(external_mode=True), 1.0)
+
     def test_movie_irregular_timestamps(self):
         timestamps = [1, 2, 4]
         conversion_opts = dict(
@@ -1,6 +1,10 @@
+import multiprocessing
 import os
 import tempfile
+import threading
 import unittest
+from fractions import Fraction
+from unittest.mock import patch
 
 import numpy as np
 from numpy.testing import assert_array_equal
@@ -9,7 +13,19 @@ from pynwb import NWBHDF5IO
 from datetime import datetime
 from hdmf.backends.hdf5.h5_utils import H5DataIO
 
-from neuroconv.datainterfaces.behavior.movie.movie_utils import VideoCaptureContext, MovieDataChunkIterator
+from neuroconv.datainterfaces.behavior.movie.movie_utils import (
+    VideoCaptureContext,
+    BufferedMovieDecoder,
+    MovieDataChunkIterator,
+    MovieFrameIndex,
+    ParallelMovieDecoder,
+    SegmentedMovieDecoder,
+    get_frames_data_chunk_iterator,
+    get_movie_container_timestamps,
+    get_movie_keyframe_indices,
+    probe_movies,
+    _get_movie_segments,
+)
 from neuroconv.tools.nwb_helpers import make_nwbfile_from_metadata
 
 try:
@@ -19,6 +35,13 @@ try:
 except:
     CV2_INSTALLED = False
 
+try:
+    import av
+
+    PYAV_INSTALLED = True
+except ImportError:
+    PYAV_INSTALLED = False
+
 
 @unittest.skipIf(not CV2_INSTALLED, "cv2 not installed")
 class TestVideoContext(unittest.TestCase):
@@ -98,6 +121,286 @@ class TestVideoContext(unittest.TestCase):
             with self.assertRaises(AssertionError):
                 vcc.get_movie_frame(3)
 
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_container_timestamps_without_decoding(self):
+        with VideoCaptureContext(self.movie_loc) as vcc:
+            decoded_timestamps = vcc._decode_movie_timestamps()
+        with VideoCaptureContext(self.movie_loc) as vcc:
+            with patch.object(vcc, "_decode_movie_timestamps", side_effect=AssertionError("Frames were decoded!")):
+                container_timestamps = vcc.get_movie_timestamps()
+        assert_array_equal(container_timestamps, np.arange(self.number_of_frames) / self.fps)
+        np.testing.assert_allclose(container_timestamps, decoded_timestamps)
+
+    def test_timestamps_fallback_to_decoding(self):
+        with patch("neuroconv.datainterfaces.behavior.movie.movie_utils.HAVE_PYAV", False):
+            self.assertIsNone(get_movie_container_timestamps(file_path=self.movie_loc))
+            with VideoCaptureContext(self.movie_loc) as vcc:
+                timestamps = vcc.get_movie_timestamps()
+        np.testing.assert_allclose(timestamps, np.arange(self.number_of_frames) / self.fps)
+
+    def test_parallel_movie_decoder(self):
+        decoder = ParallelMovieDecoder(max_workers=1, frames_per_block=4, max_queued_blocks=2)
+        first_movie = decoder.add_movie(file_path=self.movie_loc, frame_count=self.number_of_frames)
+        second_movie = decoder.add_movie(file_path=self.movie_loc, frame_count=5)
+
+        # The second movie is decoded on request even though the only worker is still busy with the first
+        second_frames = np.array(list(second_movie))
+        first_frames = np.array(list(first_movie))
+        assert_array_equal(first_frames, np.flip(self.movie_frames, 3))
+        assert_array_equal(second_frames, np.flip(self.movie_frames[:5], 3))
+
+    def test_parallel_movie_decoder_limits_running_processes(self):
+        decoder = ParallelMovieDecoder(max_workers=1, frames_per_block=4, max_queued_blocks=2)
+        number_of_movies = 4
+        data_chunk_iterators = [
+            get_frames_data_chunk_iterator(
+                frames=decoder.add_movie(file_path=self.movie_loc, frame_count=10),
+                maxshape=(10, *self.frame_shape),
+                desc="",
+            )
+            for _ in range(number_of_movies)
+        ]
+
+        # Building the iterators of the ImageSeries does not start the decoding of any other movie
+        self.assertEqual(
+            [decoding_process.started for decoding_process in decoder._decoding_processes], [True] + [False] * 3
+        )
+        self.assertEqual(len(multiprocessing.active_children()), 1)
+        for data_chunk_iterator in data_chunk_iterators:
+            frames = np.concatenate([data_chunk.data for data_chunk in data_chunk_iterator])
+            assert_array_equal(frames, np.flip(self.movie_frames[:10], 3))
+            self.assertLessEqual(len(multiprocessing.active_children()), 1)
+
+    def test_parallel_movie_decoder_error(self):
+        decoder = ParallelMovieDecoder(max_workers=2)
+        frames = decoder.add_movie(file_path=self.movie_loc, frame_count=self.number_of_frames + 1)
+        with self.assertRaises(AssertionError):
+            next(frames)
+
+    def create_movie_with_keyframes(self):
+        """Write a movie of a slowly moving image, which MPEG-4 encodes as groups of 12 pictures."""
+        movie_file = os.path.join(self.test_dir, "test_keyframes.mp4")
+        writer = cv2.VideoWriter(
+            filename=movie_file,
+            fourcc=cv2.VideoWriter_fourcc(*"mp4v"),
+            fps=self.fps,
+            frameSize=self.frame_shape[1::-1],
+        )
+        for k in range(self.number_of_frames):
+            writer.write(np.roll(self.movie_frames[0], shift=k, axis=1))
+        writer.release()
+        return movie_file
+
+    def create_variable_frame_rate_movie(self):
+        """Write a movie whose frames are 40 ms apart, then 400 ms apart, and whose first timestamp is not zero."""
+        movie_file = os.path.join(self.test_dir, "test_variable_frame_rate.mp4")
+        with av.open(movie_file, mode="w") as container:
+            stream = container.add_stream("mpeg4", rate=self.fps)
+            stream.width, stream.height = self.frame_shape[1::-1]
+            stream.pix_fmt = "yuv420p"
+            stream.time_base = stream.codec_context.time_base = Fraction(1, 1000)
+            stream.codec_context.gop_size = 12
+            for k in range(self.number_of_frames):
+                frame = av.VideoFrame.from_ndarray(np.roll(self.movie_frames[0], shift=k, axis=1), format="bgr24")
+                frame.pts = 500 + 40 * min(k, 10) + 400 * max(k - 10, 0)
+                container.mux(stream.encode(frame))
+            container.mux(stream.encode())
+        return movie_file
+
+    def test_get_movie_segments(self):
+        keyframe_indices = np.array([0, 12, 24, 36, 48])
+        self.assertEqual(
+            _get_movie_segments(keyframe_indices=keyframe_indices, frame_count=60, frames_per_segment=30),
+            [(0, 24), (24, 48), (48, 60)],
+        )
+        # A GOP longer than frames_per_segment is never split
+        self.assertEqual(
+            _get_movie_segments(keyframe_indices=keyframe_indices, frame_count=30, frames_per_segment=5),
+            [(0, 12), (12, 24), (24, 30)],
+        )
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_keyframe_indices(self):
+        assert_array_equal(get_movie_keyframe_indices(file_path=self.create_movie_with_keyframes()), [0, 12, 24])
+        # Every frame of an intra-frame codec is a keyframe
+        assert_array_equal(get_movie_keyframe_indices(file_path=self.movie_loc), np.arange(self.number_of_frames))
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_segmented_movie_decoder(self):
+        movie_file = self.create_movie_with_keyframes()
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+
+        frame_size = np.prod(self.frame_shape)
+        decoder = SegmentedMovieDecoder(
+            file_path=movie_file,
+            frame_count=self.number_of_frames,
+            frame_shape=self.frame_shape,
+            max_workers=2,
+            max_in_flight_gb=frame_size * 12 * 3 / 1e9,
+        )
+        self.assertEqual(decoder.segments, [(0, 12), (12, 24), (24, 30)])
+        assert_array_equal(np.array(list(decoder)), expected_frames)
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_movie_frame_index_cache(self):
+        movie_file = self.create_movie_with_keyframes()
+        cache_folder = os.path.join(self.test_dir, "cache")
+        movie_frame_index = MovieFrameIndex.from_file(file_path=movie_file, cache_folder=cache_folder)
+        self.assertEqual(movie_frame_index.frame_count, self.number_of_frames)
+        assert_array_equal(movie_frame_index.keyframe_indices, [0, 12, 24])
+        self.assertEqual(movie_frame_index.get_preceding_keyframe(frame_number=23), 12)
+        self.assertEqual(len(os.listdir(cache_folder)), 1)
+
+        demux_function = "neuroconv.datainterfaces.behavior.movie.movie_utils._demux_video_packets"
+        with patch(demux_function, side_effect=AssertionError("The container was demuxed!")):
+            cached_index = MovieFrameIndex.from_file(file_path=movie_file, cache_folder=cache_folder)
+        assert_array_equal(cached_index.timestamps, movie_frame_index.timestamps)
+        assert_array_equal(cached_index.keyframe_indices, movie_frame_index.keyframe_indices)
+
+        # Modifying the movie invalidates its cached index
+        file_stat = os.stat(movie_file)
+        os.utime(movie_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1))
+        with patch(demux_function, return_value=None) as demux_mock:
+            self.assertIsNone(MovieFrameIndex.from_file(file_path=movie_file, cache_folder=cache_folder))
+        demux_mock.assert_called_once()
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_random_access_with_frame_index(self):
+        movie_file = self.create_movie_with_keyframes()
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+
+        with VideoCaptureContext(movie_file) as vcc:
+            self.assertIsNotNone(vcc.frame_index)
+            self.assertEqual(vcc.get_movie_frame_count(), self.number_of_frames)
+            next(vcc)
+            for frame_number in (17, 5, 29, 12):
+                assert_array_equal(vcc.get_movie_frame(frame_number), expected_frames[frame_number])
+            self.assertEqual(vcc.current_frame, 1)
+            assert_array_equal(np.array(list(vcc)), expected_frames[1:])
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_random_access_variable_frame_rate(self):
+        movie_file = self.create_variable_frame_rate_movie()
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+        self.assertEqual(len(expected_frames), self.number_of_frames)
+
+        with VideoCaptureContext(movie_file) as vcc:
+            for frame_number in (17, 5, 29, 12, 0, 25):
+                assert_array_equal(vcc.get_movie_frame(frame_number), expected_frames[frame_number])
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_random_access_checks_decoded_timestamps(self):
+        class LateSeekVideoCapture:
+            """Wrap a video capture so that its seeks land one frame after their target."""
+
+            def __init__(self, vc):
+                self.vc = vc
+
+            def set(self, property_id, value):
+                return self.vc.set(property_id, value) and self.vc.grab()
+
+            def __getattr__(self, name):
+                return getattr(self.vc, name)
+
+        movie_file = self.create_movie_with_keyframes()
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+
+        with VideoCaptureContext(movie_file) as vcc:
+            for frame_number in (17, 5, 24):
+                vcc.vc = LateSeekVideoCapture(vcc.vc)
+                assert_array_equal(vcc.get_movie_frame(frame_number), expected_frames[frame_number])
+
+    def test_segmented_movie_decoder_without_keyframes(self):
+        with patch("neuroconv.datainterfaces.behavior.movie.movie_utils.HAVE_PYAV", False):
+            decoder = SegmentedMovieDecoder(
+                file_path=self.movie_loc, frame_count=5, frame_shape=self.frame_shape, max_workers=2
+            )
+        self.assertIsNone(decoder.segments)
+        assert_array_equal(np.array(list(decoder)), np.flip(self.movie_frames[:5], 3))
+
+    def test_buffered_movie_decoder(self):
+        frame_size = np.prod(self.frame_shape)
+        decoder = BufferedMovieDecoder(
+            video_capture_ob=VideoCaptureContext(self.movie_loc), buffer_gb=frame_size * 8 / 1e9, frames_per_block=3
+        )
+        self.assertEqual((decoder.number_of_blocks, decoder.frames_per_block), (2, 3))
+        frames = np.array([frame.copy() for frame in decoder])
+        assert_array_equal(frames, np.flip(self.movie_frames, 3))
+
+    def test_buffered_movie_decoders_start_on_write(self):
+        def get_number_of_decoding_threads():
+            return sum(thread.name == "BufferedMovieDecoder" for thread in threading.enumerate())
+
+        data_chunk_iterators = [
+            get_frames_data_chunk_iterator(
+                frames=BufferedMovieDecoder(video_capture_ob=VideoCaptureContext(self.movie_loc), buffer_gb=0.01),
+                maxshape=(self.number_of_frames, *self.frame_shape),
+                desc="",
+            )
+            for _ in range(3)
+        ]
+
+        # No decoding thread, nor ring of decoded frames, exists until the data of a movie is written
+        self.assertEqual(get_number_of_decoding_threads(), 0)
+        # The decoding of a short movie may already be over by the first chunk, so the started decoders are counted
+        with patch.object(
+            BufferedMovieDecoder, "_decode_blocks", autospec=True, side_effect=BufferedMovieDecoder._decode_blocks
+        ) as decode_blocks:
+            for movie_index, data_chunk_iterator in enumerate(data_chunk_iterators):
+                first_data_chunk = next(data_chunk_iterator)
+                self.assertEqual(decode_blocks.call_count, movie_index + 1)
+                frames = np.concatenate(
+                    [first_data_chunk.data.copy()] + [data_chunk.data.copy() for data_chunk in data_chunk_iterator]
+                )
+                assert_array_equal(frames, np.flip(self.movie_frames, 3))
+                self.assertEqual(get_number_of_decoding_threads(), 0)
+
+    def test_buffered_movie_decoder_stops_early(self):
+        video_capture_ob = VideoCaptureContext(self.movie_loc)
+        video_capture_ob.frame_count = 10
+        decoder = BufferedMovieDecoder(video_capture_ob=video_capture_ob, buffer_gb=np.prod(self.frame_shape) * 4 / 1e9)
+        self.assertEqual(decoder.frames_per_block, 2)
+        frames = iter(decoder)
+        assert_array_equal(next(frames), np.flip(self.movie_frames[0], 2))
+        frames.close()  # Joins the decoding thread
+        self.assertFalse(video_capture_ob.isOpened())
+
+    def test_buffered_movie_decoder_memory_assertion(self):
+        with self.assertRaises(AssertionError):
+            BufferedMovieDecoder(video_capture_ob=VideoCaptureContext(self.movie_loc), buffer_gb=1e-9)
+
+    def test_probe_movies(self):
+        movie_probes = probe_movies(file_paths=[self.movie_loc, self.movie_loc], include_timestamps=True)
+        self.assertEqual([movie_probe["starting_frame"] for movie_probe in movie_probes], [0, self.number_of_frames])
+        for movie_probe in movie_probes:
+            self.assertEqual(movie_probe["fps"], self.fps)
+            self.assertEqual(movie_probe["frame_count"], self.number_of_frames)
+            self.assertEqual(movie_probe["duration"], self.number_of_frames / self.fps)
+            np.testing.assert_allclose(movie_probe["timestamps"], np.arange(self.number_of_frames) / self.fps)
+
+    def test_probe_movies_reads_headers_only(self):
+        demux_function = "neuroconv.datainterfaces.behavior.movie.movie_utils._demux_video_packets"
+        with patch(demux_function, side_effect=AssertionError("The container was demuxed!")):
+            movie_probes = probe_movies(file_paths=[self.movie_loc, self.movie_loc])
+        self.assertEqual([movie_probe["frame_count"] for movie_probe in movie_probes], [self.number_of_frames] * 2)
+        self.assertEqual([movie_probe["fps"] for movie_probe in movie_probes], [self.fps] * 2)
+
+    def test_probe_movies_reports_all_invalid_files(self):
+        missing_file = os.path.join(self.test_dir, "missing.avi")
+        invalid_file = os.path.join(self.test_dir, "invalid.avi")
+        with open(invalid_file, "w") as file:
+            file.write("not a movie")
+        with self.assertRaises(ValueError) as context:
+            probe_movies(file_paths=[self.movie_loc, missing_file, invalid_file])
+        message = str(context.exception)
+        self.assertIn("Could not probe 2 of the 3 movie files!", message)
+        self.assertIn(f"{missing_file}: The file does not exist!", message)
+        self.assertIn(f"{invalid_file}: The file could not be opened as a movie!", message)
+
     def test_stub_timestamps(self):
         with VideoCaptureContext(self.movie_loc) as vcc:
             vcc.frame_count = 3
@@ -158,6 +461,50 @@ class TestMovieInterface(unittest.TestCase):
             nwbfile = io.read()
             assert nwbfile.acquisition["imageseries"].data.shape[0] == 10
 
+    def test_iterator_roundtrip(self):
+        frame_shape = (40, 30, 3)
+        movie_file = self.create_movie(self.fps, frame_shape, self.number_of_frames)
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+
+        iterator = MovieDataChunkIterator(
+            movie_file, buffer_gb=np.prod(frame_shape) * 8 / 1e9, chunk_shape=(1, *frame_shape)
+        )
+        self.assertEqual(iterator.buffer_shape[0], 8)
+        buffers = [buffer for buffer in iterator]
+        self.assertEqual(buffers[0].data.dtype, np.dtype("uint8"))
+        # The frames are decoded into the same array for every buffer
+        self.assertTrue(np.shares_memory(buffers[0].data, buffers[1].data))
+
+        img_srs = ImageSeries(
+            name="imageseries", data=MovieDataChunkIterator(movie_file), unit="na", starting_time=None, rate=1.0
+        )
+        self.nwbfile.add_acquisition(img_srs)
+        with NWBHDF5IO(path=self.nwbfile_path, mode="w") as io:
+            io.write(self.nwbfile)
+        with NWBHDF5IO(path=self.nwbfile_path, mode="r") as io:
+            nwbfile = io.read()
+            data = nwbfile.acquisition["imageseries"].data
+            self.assertEqual(data.dtype, np.dtype("uint8"))
+            assert_array_equal(data[:], expected_frames)
+
+    @unittest.skipIf(not PYAV_INSTALLED, "av not installed")
+    def test_iterator_segmented_decoding(self):
+        frame_shape = (40, 30, 3)
+        movie_file = self.create_movie(self.fps, frame_shape, self.number_of_frames)
+        with VideoCaptureContext(movie_file) as vcc:
+            expected_frames = np.array(list(vcc))
+
+        iterator = MovieDataChunkIterator(
+            movie_file,
+            buffer_gb=np.prod(frame_shape) * 8 / 1e9,
+            chunk_shape=(1, *frame_shape),
+            max_workers=2,
+            max_in_flight_gb=np.prod(frame_shape) * 30 / 1e9,
+        )
+        frames = np.concatenate([buffer.data.copy() for buffer in iterator])
+        assert_array_equal(frames, expected_frames)
+
     def test_frame_shape_big(self):
         frame_shape = (800, 600, 3)
         movie_file = self.create_movie(self.fps, frame_shape, self.number_of_frames)
@@ -0,0 +1,218 @@
+from tempfile import mkdtemp
+from pathlib import Path
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+import tifffile
+from hdmf.testing import TestCase
+from numpy.testing import assert_array_equal
+from parameterized import parameterized, param
+from pynwb import NWBHDF5IO
+
+from neuroconv import MultiTiffImagingInterface, TiffImagingInterface
+from neuroconv.tools.roiextractors.multifileimagingextractor import MultiTiffImagingExtractor, has_single_page_frames
+
+
+class TestMultiTiffImagingExtractor(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.folder_path = Path(mkdtemp())
+        cls.num_rows = 8
+        cls.num_columns = 6
+        cls.frames_per_file = [5, 3, 7, 1]
+        cls.sampling_frequency = 30.0
+
+        rng = np.random.default_rng(seed=0)
+        cls.videos = []
+        # Names chosen so that natural sorting differs from lexicographical sorting
+        for file_index, num_frames in enumerate(cls.frames_per_file):
+            video = rng.integers(0, 2**16, size=(num_frames, cls.num_rows, cls.num_columns), dtype="uint16")
+            tifffile.imwrite(cls.folder_path / f"session_{file_index * 5}.tif", video, photometric="minisblack")
+            cls.videos.append(video)
+        cls.full_video = np.concatenate(cls.videos)
+
+        (cls.folder_path / "notes.txt").write_text("Not an imaging file.")
+
+    def setUp(self):
+        self.imaging_extractor = MultiTiffImagingExtractor(
+            folder_path=self.folder_path, sampling_frequency=self.sampling_frequency, max_workers=2
+        )
+
+    def test_file_ordering(self):
+        file_names = [file_path.name for file_path in self.imaging_extractor.file_paths]
+        self.assertEqual(file_names, ["session_0.tif", "session_5.tif", "session_10.tif", "session_15.tif"])
+
+    def test_header_properties(self):
+        self.assertEqual(self.imaging_extractor.get_num_frames(), sum(self.frames_per_file))
+        self.assertEqual(self.imaging_extractor.get_image_size(), (self.num_rows, self.num_columns))
+        self.assertEqual(self.imaging_extractor.get_dtype(), np.dtype("uint16"))
+        self.assertEqual(self.imaging_extractor.get_sampling_frequency(), self.sampling_frequency)
+
+    def test_get_full_video(self):
+        assert_array_equal(self.imaging_extractor.get_video(), self.full_video)
+
+    def test_get_video_across_file_boundaries(self):
+        for start_frame, end_frame in [(0, 5), (3, 9), (4, 16), (7, 8), (15, 16), (2, 2)]:
+            with self.subTest(start_frame=start_frame, end_frame=end_frame):
+                video = self.imaging_extractor.get_video(start_frame=start_frame, end_frame=end_frame)
+                assert_array_equal(video, self.full_video[start_frame:end_frame])
+
+    def test_get_frames(self):
+        frame_idxs = [1, 4, 5, 14, 15]
+        assert_array_equal(self.imaging_extractor.get_frames(frame_idxs=frame_idxs), self.full_video[frame_idxs])
+        assert_array_equal(self.imaging_extractor.get_frames(frame_idxs=8), self.full_video[8])
+
+    def test_get_frames_reads_runs_of_requested_frames(self):
+        frame_idxs = [14, 1, 2, 4, 2]
+        with patch.object(
+            self.imaging_extractor, "_read_frames", wraps=self.imaging_extractor._read_frames
+        ) as read_frames_mock:
+            assert_array_equal(self.imaging_extractor.get_frames(frame_idxs=frame_idxs), self.full_video[frame_idxs])
+        read_ranges = sorted(
+            (call.kwargs["file_path"].name, call.kwargs["start_frame"], call.kwargs["end_frame"])
+            for call in read_frames_mock.call_args_list
+        )
+        self.assertEqual(read_ranges, [("session_0.tif", 1, 3), ("session_0.tif", 4, 5), ("session_10.tif", 6, 7)])
+
+    def test_open_tiff_files_are_reused(self):
+        with patch.object(tifffile, "TiffFile", wraps=tifffile.TiffFile) as tiff_file_mock:
+            for start_frame in range(0, 5):
+                video = self.imaging_extractor.get_video(start_frame=start_frame, end_frame=start_frame + 1)
+                assert_array_equal(video, self.full_video[start_frame : start_frame + 1])
+        # The pages of the first file are walked by a single TiffFile instead of one per read
+        self.assertEqual(tiff_file_mock.call_count, 1)
+
+    def test_open_tiff_files_are_bounded(self):
+        self.imaging_extractor.max_open_files = 1
+        for _ in range(2):
+            assert_array_equal(self.imaging_extractor.get_video(), self.full_video)
+        self.assertEqual(len(self.imaging_extractor._open_files), 1)
+
+    def test_open_tiff_files_are_not_closed_while_read(self):
+        imaging_extractor = MultiTiffImagingExtractor(
+            folder_path=self.folder_path, sampling_frequency=self.sampling_frequency, max_workers=4
+        )
+        imaging_extractor.max_open_files = 1
+        with patch.object(tifffile, "TiffFile", wraps=tifffile.TiffFile) as tiff_file_mock:
+            assert_array_equal(imaging_extractor.get_video(), self.full_video)
+        # Each file is opened once even though more files than max_open_files are read at the same time
+        self.assertEqual(tiff_file_mock.call_count, len(self.frames_per_file))
+        self.assertEqual(len(imaging_extractor._open_files), 1)
+
+    def test_evenly_spaced_tiff_pages_are_counted_without_walking(self):
+        # The pages after the first are evenly spaced in the files written by tifffile.imwrite
+        with patch.object(tifffile.TiffPages, "__len__", side_effect=AssertionError("The pages were walked!")):
+            imaging_extractor = MultiTiffImagingExtractor(
+                folder_path=self.folder_path, sampling_frequency=self.sampling_frequency, file_pattern="session_10.tif"
+            )
+        self.assertEqual(imaging_extractor.get_num_frames(), 7)
+        assert_array_equal(imaging_extractor.get_video(), self.videos[2])
+
+    def test_unevenly_spaced_tiff_pages_are_counted(self):
+        folder_path = Path(mkdtemp())
+        video = np.random.default_rng(seed=0).integers(0, 2**16, size=(9, 5, 3), dtype="uint16")
+        # Pages written one at a time with different descriptions are not evenly spaced
+        with tifffile.TiffWriter(folder_path / "session.tif") as tif:
+            for frame_index, frame in enumerate(video):
+                tif.write(frame, photometric="minisblack", metadata=None, description="frame" * frame_index)
+        imaging_extractor = MultiTiffImagingExtractor(folder_path=folder_path, sampling_frequency=30.0)
+        self.assertEqual(imaging_extractor.get_num_frames(), 9)
+        assert_array_equal(imaging_extractor.get_video(), video)
+
+    def test_max_frames(self):
+        imaging_extractor = MultiTiffImagingExtractor(
+            folder_path=self.folder_path, sampling_frequency=self.sampling_frequency, max_frames=7
+        )
+        file_names = [file_path.name for file_path in imaging_extractor.file_paths]
+        self.assertEqual(file_names, ["session_0.tif", "session_5.tif"])
+        self.assertEqual(imaging_extractor.get_num_frames(), 7)
+        assert_array_equal(imaging_extractor.get_video(), self.full_video[:7])
+
+    def test_no_matching_files_assertion(self):
+        with self.assertRaisesWith(
+            exc_type=AssertionError,
+            exc_msg=f"No files matching the pattern '*.tiff' were found in '{self.folder_path}'!",
+        ):
+            MultiTiffImagingExtractor(
+                folder_path=self.folder_path, sampling_frequency=self.sampling_frequency, file_pattern="*.tiff"
+            )
+
+    def test_interface_roundtrip(self):
+        interface = MultiTiffImagingInterface(
+            folder_path=str(self.folder_path), sampling_frequency=self.sampling_frequency, verbose=False
+        )
+        metadata = interface.get_metadata()
+        metadata["NWBFile"].update(session_start_time=datetime.now().astimezone())
+        nwbfile_path = Path(mkdtemp()) / "multi_tiff_imaging.nwb"
+        interface.run_conversion(nwbfile_path=nwbfile_path, metadata=metadata)
+
+        with NWBHDF5IO(nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            two_photon_series = nwbfile.acquisition["TwoPhotonSeries"]
+            # NWB stores images as num_columns x num_rows
+            assert_array_equal(two_photon_series.data[:], self.full_video.transpose((0, 2, 1)))
+
+    def test_interface_lazy_stub(self):
+        interface = MultiTiffImagingInterface(
+            folder_path=str(self.folder_path), sampling_frequency=self.sampling_frequency, verbose=False
+        )
+        metadata = interface.get_metadata()
+        metadata["NWBFile"].update(session_start_time=datetime.now().astimezone())
+        nwbfile_path = Path(mkdtemp()) / "multi_tiff_imaging_stub.nwb"
+        interface.run_conversion(nwbfile_path=nwbfile_path, metadata=metadata, stub_test=True, stub_frames=4)
+
+        # Neither the metadata nor the stub required indexing all the files
+        self.assertIsNone(interface._imaging_extractor)
+        with NWBHDF5IO(nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            assert_array_equal(nwbfile.acquisition["TwoPhotonSeries"].data[:], self.full_video[:4].transpose((0, 2, 1)))
+
+
+class TestTiffImagingInterfaceStub(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.file_path = Path(mkdtemp()) / "session [1].tif"
+        cls.video = np.random.default_rng(seed=0).integers(0, 2**16, size=(20, 8, 6), dtype="uint16")
+        # Written page by page without shape metadata, as by many acquisition systems
+        with tifffile.TiffWriter(cls.file_path) as tif:
+            for frame in cls.video:
+                tif.write(frame, photometric="minisblack", metadata=None)
+
+    def test_stub_imaging_extractor(self):
+        interface = TiffImagingInterface(file_path=str(self.file_path), sampling_frequency=30.0, verbose=False)
+        stub_imaging_extractor = interface.get_stub_imaging_extractor(stub_frames=5)
+
+        self.assertIsNone(interface._imaging_extractor)
+        self.assertEqual(stub_imaging_extractor.get_num_frames(), 5)
+        assert_array_equal(stub_imaging_extractor.get_video(), self.video[:5])
+
+    def test_metadata_matches_full_imaging_extractor(self):
+        interface = TiffImagingInterface(file_path=str(self.file_path), sampling_frequency=30.0, verbose=False)
+        stub_metadata = interface.get_metadata()
+        self.assertIsNone(interface._imaging_extractor)
+
+        self.assertEqual(interface.imaging_extractor.get_num_frames(), 20)
+        full_metadata = interface.get_metadata()
+        self.assertEqual(stub_metadata["Ophys"], full_metadata["Ophys"])
+
+    @parameterized.expand(
+        [
+            param(name="imagej", write_options=dict(imagej=True)),
+            param(name="volumetric", write_options=dict(volumetric=True, tile=(16, 16))),
+        ]
+    )
+    def test_stub_of_other_layouts_matches_full_imaging_extractor(self, name, write_options):
+        """ImageJ stacks and files written as a single volume fall back to the stub of the full extractor."""
+        file_path = Path(mkdtemp()) / f"{name}.tif"
+        tifffile.imwrite(file_path, self.video, **write_options)
+        self.assertFalse(has_single_page_frames(file_path=file_path))
+
+        interface = TiffImagingInterface(file_path=str(file_path), sampling_frequency=30.0, verbose=False)
+        stub_imaging_extractor = interface.get_stub_imaging_extractor(stub_frames=5)
+        self.assertEqual(stub_imaging_extractor.get_num_frames(), 5)
+        self.assertEqual(stub_imaging_extractor.get_image_size(), interface.imaging_extractor.get_image_size())
+        self.assertEqual(stub_imaging_extractor.get_dtype(), interface.imaging_extractor.get_dtype())
+        assert_array_equal(
+            stub_imaging_extractor.get_frames(frame_idxs=range(5)), interface.imaging_extractor.get_video(end_frame=5)
+        )
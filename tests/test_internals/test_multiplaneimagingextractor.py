@@ -0,0 +1,212 @@
+from tempfile import mkdtemp
+from pathlib import Path
+from datetime import datetime
+
+import numpy as np
+from hdmf.testing import TestCase
+from numpy.testing import assert_array_equal
+from pynwb import NWBHDF5IO
+from roiextractors.testing import generate_dummy_imaging_extractor, generate_dummy_segmentation_extractor
+
+from neuroconv.tools.roiextractors import write_multi_plane_imaging
+from neuroconv.tools.roiextractors.multiplaneimagingextractor import (
+    InterleavedPlanesFrameBuffer,
+    PlaneImagingExtractor,
+    VolumetricImagingExtractor,
+)
+
+
+class TestMultiPlaneImaging(TestCase):
+    def setUp(self):
+        self.num_planes = 3
+        self.num_frames = 30
+        self.num_rows = 8
+        self.num_columns = 6
+        self.sampling_frequency = 30.0
+        self.imaging_extractor = generate_dummy_imaging_extractor(
+            num_frames=self.num_frames,
+            num_rows=self.num_rows,
+            num_columns=self.num_columns,
+            sampling_frequency=self.sampling_frequency,
+        )
+        self.video = self.imaging_extractor.get_video()
+        self.metadata = dict(NWBFile=dict(session_start_time=datetime.now().astimezone()))
+        self.nwbfile_path = Path(mkdtemp()) / "multi_plane_imaging.nwb"
+
+    def test_plane_imaging_extractor(self):
+        frame_buffer = InterleavedPlanesFrameBuffer(
+            imaging_extractor=self.imaging_extractor, num_planes=self.num_planes
+        )
+        plane_imaging_extractor = PlaneImagingExtractor(frame_buffer=frame_buffer, plane_index=1)
+
+        self.assertEqual(plane_imaging_extractor.get_num_frames(), self.num_frames // self.num_planes)
+        self.assertEqual(plane_imaging_extractor.get_sampling_frequency(), self.sampling_frequency / self.num_planes)
+        self.assertEqual(plane_imaging_extractor.get_image_size(), (self.num_rows, self.num_columns))
+        assert_array_equal(plane_imaging_extractor.get_video(start_frame=2, end_frame=7), self.video[1::3][2:7])
+        assert_array_equal(plane_imaging_extractor.get_frames(frame_idxs=[0, 4]), self.video[1::3][[0, 4]])
+
+    def test_volumetric_imaging_extractor(self):
+        frame_buffer = InterleavedPlanesFrameBuffer(
+            imaging_extractor=self.imaging_extractor, num_planes=self.num_planes
+        )
+        volumetric_imaging_extractor = VolumetricImagingExtractor(frame_buffer=frame_buffer)
+
+        self.assertEqual(volumetric_imaging_extractor.get_image_size(), (self.num_rows, self.num_columns, 3))
+        expected_volumes = np.stack([self.video[plane_index::3] for plane_index in range(3)], axis=-1)
+        assert_array_equal(volumetric_imaging_extractor.get_video(), expected_volumes)
+
+    def test_frame_buffer_decodes_once_per_block(self):
+        frame_buffer = InterleavedPlanesFrameBuffer(
+            imaging_extractor=self.imaging_extractor, num_planes=self.num_planes
+        )
+        plane_imaging_extractors = [
+            PlaneImagingExtractor(frame_buffer=frame_buffer, plane_index=plane_index) for plane_index in range(3)
+        ]
+        # Exhaust each plane in turn, as the default write of an NWBFile does
+        for plane_index, plane_imaging_extractor in enumerate(plane_imaging_extractors):
+            for start_frame in range(0, 10, 4):
+                video = plane_imaging_extractor.get_video(start_frame=start_frame, end_frame=start_frame + 4)
+                assert_array_equal(video, self.video[plane_index::3][start_frame : start_frame + 4])
+
+        self.assertEqual(frame_buffer.num_decoded_frames, self.num_frames)
+        self.assertEqual(len(frame_buffer._held_blocks), 0)
+        self.assertEqual(len(frame_buffer._consumed_planes), 0)
+
+    def test_frame_buffer_drops_oldest_blocks_over_budget(self):
+        frame_buffer = InterleavedPlanesFrameBuffer(
+            imaging_extractor=self.imaging_extractor, num_planes=self.num_planes, buffer_gb=1e-9
+        )
+        plane_imaging_extractors = [
+            PlaneImagingExtractor(frame_buffer=frame_buffer, plane_index=plane_index) for plane_index in range(3)
+        ]
+        for plane_index, plane_imaging_extractor in enumerate(plane_imaging_extractors):
+            for start_frame in range(0, 10, 5):
+                video = plane_imaging_extractor.get_video(start_frame=start_frame, end_frame=start_frame + 5)
+                assert_array_equal(video, self.video[plane_index::3][start_frame : start_frame + 5])
+
+        self.assertLessEqual(len(frame_buffer._held_blocks), 1)
+        self.assertGreater(frame_buffer.num_decoded_frames, self.num_frames)
+
+    def test_incomplete_volume_warning(self):
+        with self.assertWarnsWith(
+            warn_type=UserWarning,
+            exc_msg=(
+                "The number of frames (30) is not a multiple of the number of planes (4)! "
+                "The trailing 2 frames of the incomplete last volume will be ignored."
+            ),
+        ):
+            frame_buffer = InterleavedPlanesFrameBuffer(imaging_extractor=self.imaging_extractor, num_planes=4)
+        self.assertEqual(frame_buffer.num_volumes, 7)
+
+    def test_write_multi_plane_imaging(self):
+        write_multi_plane_imaging(
+            imaging=self.imaging_extractor,
+            num_planes=self.num_planes,
+            nwbfile_path=self.nwbfile_path,
+            metadata=self.metadata,
+            overwrite=True,
+            verbose=False,
+        )
+
+        with NWBHDF5IO(self.nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            for plane_index, suffix in enumerate(["", "_Plane1", "_Plane2"]):
+                two_photon_series = nwbfile.acquisition[f"TwoPhotonSeries{suffix}"]
+                self.assertEqual(two_photon_series.imaging_plane.name, f"ImagingPlane{suffix}")
+                self.assertEqual(two_photon_series.rate, self.sampling_frequency / self.num_planes)
+                assert_array_equal(two_photon_series.data[:], self.video[plane_index::3].transpose((0, 2, 1)))
+
+    def test_write_multi_plane_imaging_reads_every_frame_once(self):
+        # Even when the budget cannot hold a block for the later planes, the planes are written in lockstep
+        number_of_read_frames = []
+        get_video = self.imaging_extractor.get_video
+
+        def counting_get_video(start_frame=None, end_frame=None, channel=0):
+            video = get_video(start_frame=start_frame, end_frame=end_frame, channel=channel)
+            number_of_read_frames.append(video.shape[0])
+            return video
+
+        self.imaging_extractor.get_video = counting_get_video
+        write_multi_plane_imaging(
+            imaging=self.imaging_extractor,
+            num_planes=self.num_planes,
+            nwbfile_path=self.nwbfile_path,
+            metadata=self.metadata,
+            overwrite=True,
+            verbose=False,
+            iterator_options=dict(buffer_shape=(2, self.num_columns, self.num_rows), chunk_shape=(1, 3, 4)),
+            frame_buffer_gb=1e-9,
+        )
+
+        self.assertEqual(sum(number_of_read_frames), self.num_frames)
+        with NWBHDF5IO(self.nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            for plane_index, suffix in enumerate(["", "_Plane1", "_Plane2"]):
+                two_photon_series = nwbfile.acquisition[f"TwoPhotonSeries{suffix}"]
+                assert_array_equal(two_photon_series.data[:], self.video[plane_index::3].transpose((0, 2, 1)))
+
+    def test_write_multi_plane_imaging_as_volume(self):
+        write_multi_plane_imaging(
+            imaging=self.imaging_extractor,
+            num_planes=self.num_planes,
+            nwbfile_path=self.nwbfile_path,
+            metadata=self.metadata,
+            overwrite=True,
+            verbose=False,
+            write_as_volume=True,
+        )
+
+        with NWBHDF5IO(self.nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            self.assertEqual(list(nwbfile.acquisition), ["TwoPhotonSeries"])
+            expected_volumes = np.stack([self.video[plane_index::3] for plane_index in range(3)], axis=-1)
+            assert_array_equal(nwbfile.acquisition["TwoPhotonSeries"].data[:], expected_volumes.transpose((0, 2, 1, 3)))
+
+    def test_write_multi_plane_imaging_with_segmentations(self):
+        segmentation_extractors = [
+            generate_dummy_segmentation_extractor(
+                num_rois=num_rois,
+                num_frames=self.num_frames // self.num_planes,
+                num_rows=self.num_rows,
+                num_columns=self.num_columns,
+            )
+            for num_rois in (4, 5, 6)
+        ]
+        for segmentation_extractor in segmentation_extractors:
+            segmentation_extractor._channel_names = ["OpticalChannel"]  # Not set by the dummy extractor
+        write_multi_plane_imaging(
+            imaging=self.imaging_extractor,
+            num_planes=self.num_planes,
+            nwbfile_path=self.nwbfile_path,
+            metadata=self.metadata,
+            overwrite=True,
+            verbose=False,
+            segmentation_extractors=segmentation_extractors,
+        )
+
+        with NWBHDF5IO(self.nwbfile_path, "r") as io:
+            nwbfile = io.read()
+            ophys = nwbfile.processing["ophys"]
+            image_segmentation = ophys["ImageSegmentation"]
+            for plane_index, suffix in enumerate(["", "_Plane1", "_Plane2"]):
+                plane_segmentation = image_segmentation[f"PlaneSegmentation{suffix}"]
+                self.assertEqual(plane_segmentation.imaging_plane.name, f"ImagingPlane{suffix}")
+                self.assertEqual(len(plane_segmentation), 4 + plane_index)
+
+                roi_response_series = ophys["Fluorescence"][f"RoiResponseSeries{suffix}"]
+                self.assertEqual(roi_response_series.rois.table.name, f"PlaneSegmentation{suffix}")
+                self.assertEqual(ophys["DfOverF"][f"RoiResponseSeries{suffix}"].data.shape, (10, 4 + plane_index))
+                self.assertIn(f"SegmentationImages{suffix}", ophys.data_interfaces)
+
+    def test_write_multi_plane_imaging_segmentation_count_assertion(self):
+        segmentation_extractor = generate_dummy_segmentation_extractor(num_frames=10)
+        with self.assertRaisesWith(
+            exc_type=AssertionError,
+            exc_msg="The number of segmentation_extractors (1) must match the number of planes (3)!",
+        ):
+            write_multi_plane_imaging(
+                imaging=self.imaging_extractor,
+                num_planes=self.num_planes,
+                metadata=self.metadata,
+                segmentation_extractors=[segmentation_extractor],
+            )
@@ -0,0 +1,89 @@
+import os
+from datetime import datetime
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest.mock import patch
+
+from hdmf.testing import TestCase
+
+from neuroconv.basedatainterface import BaseDataInterface
+from neuroconv.datainterfaces.ecephys.neuroscope import neuroscope_utils
+from neuroconv.datainterfaces.ecephys.neuroscope.neuroscope_utils import (
+    get_channel_groups,
+    get_session_start_time,
+    get_shank_channels,
+    read_neuroscope_session,
+)
+from neuroconv.utils.header_cache import header_cache
+
+SESSION_XML = """<?xml version='1.0'?>
+<parameters>
+ <generalInfo><date>2020-01-02</date></generalInfo>
+ <anatomicalDescription>
+  <channelGroups>
+   <group><channel>0</channel><channel>1</channel><channel>2</channel></group>
+   <group><channel>3</channel><channel>4</channel></group>
+  </channelGroups>
+ </anatomicalDescription>
+ <spikeDetection>
+  <channelGroups>
+   <group><channels><channel>0</channel><channel>1</channel></channels></group>
+   <group><channels><channel>3</channel></channels></group>
+  </channelGroups>
+ </spikeDetection>
+</parameters>
+"""
+
+
+class TestNeuroscopeSession(TestCase):
+    def setUp(self):
+        self.xml_file_path = Path(mkdtemp()) / "session.xml"
+        self.xml_file_path.write_text(SESSION_XML)
+
+    def test_read_neuroscope_session(self):
+        session = read_neuroscope_session(xml_file_path=self.xml_file_path)
+        self.assertEqual(session.channel_groups, [[0, 1, 2], [3, 4]])
+        self.assertEqual(session.shank_channels, [[0, 1], [3]])
+        self.assertEqual(session.session_start_time, datetime(2020, 1, 2))
+
+    def test_helpers_parse_once(self):
+        with patch.object(neuroscope_utils, "get_xml", wraps=neuroscope_utils.get_xml) as get_xml:
+            self.assertEqual(get_channel_groups(xml_file_path=str(self.xml_file_path)), [[0, 1, 2], [3, 4]])
+            self.assertEqual(get_shank_channels(xml_file_path=str(self.xml_file_path)), [[0, 1], [3]])
+            self.assertEqual(get_session_start_time(xml_file_path=self.xml_file_path), datetime(2020, 1, 2))
+        self.assertEqual(get_xml.call_count, 1)
+
+        # The returned channel lists can be modified without affecting the parsed session
+        get_channel_groups(xml_file_path=str(self.xml_file_path))[0].append(5)
+        self.assertEqual(read_neuroscope_session(xml_file_path=self.xml_file_path).channel_groups[0], [0, 1, 2])
+
+    def test_session_reparsed_after_modification(self):
+        session = read_neuroscope_session(xml_file_path=self.xml_file_path)
+        self.xml_file_path.write_text(SESSION_XML.replace("2020-01-02", "2021-03-04"))
+        modification_time_ns = os.stat(self.xml_file_path).st_mtime_ns + 10**9
+        os.utime(self.xml_file_path, ns=(modification_time_ns, modification_time_ns))
+
+        modified_session = read_neuroscope_session(xml_file_path=self.xml_file_path)
+        self.assertIsNot(modified_session, session)
+        self.assertEqual(modified_session.session_start_time, datetime(2021, 3, 4))
+
+    def test_sessions_kept_in_header_cache(self):
+        # The module-level cache is the one shared by the data interfaces
+        self.assertIs(BaseDataInterface.header_cache, header_cache)
+        number_of_cached_values = len(header_cache._values)
+        session = read_neuroscope_session(xml_file_path=self.xml_file_path)
+        hits = header_cache.hits
+        self.assertIs(read_neuroscope_session(xml_file_path=str(self.xml_file_path)), session)
+        self.assertEqual(header_cache.hits, hits + 1)
+
+        # The session parsed from the modified file replaces the previous one
+        modification_time_ns = os.stat(self.xml_file_path).st_mtime_ns + 10**9
+        os.utime(self.xml_file_path, ns=(modification_time_ns, modification_time_ns))
+        self.assertIsNot(read_neuroscope_session(xml_file_path=self.xml_file_path), session)
+        self.assertEqual(len(header_cache._values), number_of_cached_values + 1)
+
+    def test_missing_sections(self):
+        self.xml_file_path.write_text("<?xml version='1.0'?>\n<parameters></parameters>\n")
+        session = read_neuroscope_session(xml_file_path=self.xml_file_path)
+        self.assertIsNone(session.shank_channels)
+        self.assertIsNone(session.session_start_time)
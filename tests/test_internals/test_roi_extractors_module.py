@@ -31,6 +31,19 @@ from neuroconv.tools.roiextractors import (
 from neuroconv.tools.roiextractors.imagingextractordatachunkiterator import ImagingExtractorDataChunkIterator
 
 
+class ComparisonCountingInt(int):
+    """An int counting the equality comparisons made against it."""
+
+    num_comparisons = 0
+
+    def __eq__(self, other):
+        ComparisonCountingInt.num_comparisons += 1
+        return int(self) == other
+
+    def __hash__(self):
+        return int(self)
+
+
 class TestAddDevices(unittest.TestCase):
     def setUp(self):
         self.session_start_time = datetime.now().astimezone()
@@ -419,6 +432,59 @@ class TestAddPlaneSegmentation(unittest.TestCase):
         plane_segmentation_accepted_roi_ids = plane_segmentation["Accepted"].data
         assert_array_equal(plane_segmentation_accepted_roi_ids, accepted_roi_ids)
 
+    @parameterized.expand([param(num_rois=10_000), param(num_rois=100_000)])
+    def test_accepted_and_rejected_flags_many_rois(self, num_rois):
+        """Test that the vectorized accepted and rejected flags of many ROIs match those computed ROI by ROI."""
+        roi_ids = list(range(num_rois))
+        # Scanning the lists for every ROI would compare each ROI id with every listed id
+        accepted_list = [ComparisonCountingInt(roi_id) for roi_id in roi_ids[::2]]
+        rejected_list = [ComparisonCountingInt(roi_id) for roi_id in roi_ids[1::3]]
+        ComparisonCountingInt.num_comparisons = 0
+        segmentation_extractor = Mock()
+        segmentation_extractor.get_roi_ids.return_value = roi_ids
+        segmentation_extractor.get_accepted_list.return_value = accepted_list
+        segmentation_extractor.get_rejected_list.return_value = rejected_list
+        segmentation_extractor.get_roi_locations.return_value = np.zeros((2, num_rois))
+        segmentation_extractor.get_roi_image_masks.side_effect = lambda roi_ids: np.zeros(
+            (self.num_rows, self.num_columns, len(roi_ids))
+        )
+
+        add_plane_segmentation(
+            segmentation_extractor=segmentation_extractor,
+            nwbfile=self.nwbfile,
+            metadata=self.metadata,
+        )
+
+        self.assertEqual(segmentation_extractor.get_accepted_list.call_count, 1)
+        self.assertEqual(segmentation_extractor.get_rejected_list.call_count, 1)
+        self.assertLessEqual(ComparisonCountingInt.num_comparisons, num_rois)
+        image_segmentation = self.nwbfile.processing["ophys"].get(self.image_segmentation_name)
+        plane_segmentation = image_segmentation.plane_segmentations[self.plane_segmentation_name]
+        accepted_set, rejected_set = set(accepted_list), set(rejected_list)
+        assert_array_equal(plane_segmentation["Accepted"].data, [int(roi_id in accepted_set) for roi_id in roi_ids])
+        assert_array_equal(plane_segmentation["Rejected"].data, [int(roi_id in rejected_set) for roi_id in roi_ids])
+
+    def test_image_masks_requested_in_blocks(self):
+        """Test that the image masks are requested in blocks of ROIs rather than one ROI at a time."""
+        # The centroids of roiextractors are computed from the mask of each ROI, which would also count as requests
+        roi_locations = self.segmentation_extractor.get_roi_locations()
+        self.segmentation_extractor.get_roi_locations = Mock(return_value=roi_locations)
+        get_roi_image_masks = Mock(wraps=self.segmentation_extractor.get_roi_image_masks)
+        self.segmentation_extractor.get_roi_image_masks = get_roi_image_masks
+
+        add_plane_segmentation(
+            segmentation_extractor=self.segmentation_extractor,
+            nwbfile=self.nwbfile,
+            metadata=self.metadata,
+        )
+        image_segmentation = self.nwbfile.processing["ophys"].get(self.image_segmentation_name)
+        plane_segmentation = image_segmentation.plane_segmentations[self.plane_segmentation_name]
+        image_masks = np.concatenate([data_chunk.data for data_chunk in plane_segmentation["image_mask"].data])
+
+        # The first mask sizes the block of all the remaining ones
+        self.assertEqual(get_roi_image_masks.call_count, 2)
+        assert_array_equal(image_masks, get_roi_image_masks().T)
+
     def test_not_overwriting_plane_segmentation_if_same_name(self):
         """Test that adding a plane segmentation with the same name will not overwrite
         the existing plane segmentation."""
@@ -1009,6 +1075,68 @@ class TestAddTwoPhotonSeries(TestCase):
             assert self.imaging_plane_name in imaging_planes_in_file
             assert len(imaging_planes_in_file) == 1
 
+    def test_add_two_photon_series_with_summary_images_roundtrip(self):
+        add_two_photon_series(
+            imaging=self.imaging_extractor, nwbfile=self.nwbfile, metadata=self.metadata, compute_summary_images=True
+        )
+
+        nwbfile_path = Path(mkdtemp()) / "two_photon_summary_images_roundtrip.nwb"
+        with NWBHDF5IO(nwbfile_path, "w") as io:
+            io.write(self.nwbfile)
+
+        with NWBHDF5IO(nwbfile_path, "r") as io:
+            read_nwbfile = io.read()
+
+            images = read_nwbfile.processing["ophys"]["summary_images"].images
+            self.assertCountEqual(images.keys(), ["mean", "max", "std", "correlation"])
+
+            # NWB stores images as num_columns x num_rows
+            video = self.imaging_extractor.get_video().transpose((0, 2, 1))
+            np.testing.assert_allclose(images["mean"].data[:], video.mean(axis=0))
+            assert_array_equal(images["max"].data[:], video.max(axis=0))
+            np.testing.assert_allclose(images["std"].data[:], video.std(axis=0))
+            assert images["correlation"].data.shape == (self.num_columns, self.num_rows)
+
+    def test_add_two_photon_series_with_summary_images_interleaved_write(self):
+        """The summary images are computed from the extractor if they are written before the end of the series."""
+        add_two_photon_series(
+            imaging=self.imaging_extractor,
+            nwbfile=self.nwbfile,
+            metadata=self.metadata,
+            iterator_options=dict(
+                buffer_shape=(5, self.num_columns, self.num_rows), chunk_shape=(5, self.num_columns, self.num_rows)
+            ),
+            compute_summary_images=True,
+        )
+        accumulator = self.nwbfile.acquisition[self.two_photon_series_name].data.summary_images_accumulator
+
+        nwbfile_path = Path(mkdtemp()) / "two_photon_summary_images_interleaved_write.nwb"
+        with NWBHDF5IO(nwbfile_path, "w") as io:
+            io.write(self.nwbfile, exhaust_dci=False)
+        assert accumulator.is_complete
+
+        with NWBHDF5IO(nwbfile_path, "r") as io:
+            read_nwbfile = io.read()
+
+            images = read_nwbfile.processing["ophys"]["summary_images"].images
+            video = self.imaging_extractor.get_video().transpose((0, 2, 1))
+            np.testing.assert_allclose(images["mean"].data[:], video.mean(axis=0))
+            assert_array_equal(images["max"].data[:], video.max(axis=0))
+            np.testing.assert_allclose(images["std"].data[:], video.std(axis=0))
+            np.testing.assert_allclose(images["correlation"].data[:], accumulator.get_images()["correlation"])
+
+    def test_summary_images_require_v2_iterator(self):
+        with self.assertRaisesWith(
+            AssertionError, "Summary images can only be computed on the fly with iterator_type='v2'!"
+        ):
+            add_two_photon_series(
+                imaging=self.imaging_extractor,
+                nwbfile=self.nwbfile,
+                metadata=self.metadata,
+                iterator_type="v1",
+                compute_summary_images=True,
+            )
+
 
 class TestAddSummaryImages(unittest.TestCase):
     def setUp(self):
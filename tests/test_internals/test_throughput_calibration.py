@@ -0,0 +1,168 @@
+import re
+from pathlib import Path
+from tempfile import mkdtemp
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from hdmf.testing import TestCase
+
+from neuroconv import NWBConverter
+from neuroconv.datainterfaces import AxonaLFPDataInterface
+from neuroconv.tools.data_transfers import estimate_total_conversion_runtime
+from neuroconv.tools.throughput_calibration import (
+    calibrate_conversion_throughput,
+    calibrate_conversion_from_yaml,
+    get_calibration_profile,
+    get_calibrated_rates,
+    get_interface_modality,
+    get_interface_source_bytes,
+    load_calibration_profile,
+    save_calibration_profile,
+)
+
+
+class TestThroughputCalibration(TestCase):
+    def setUp(self):
+        self.test_dir = Path(mkdtemp())
+        self.number_of_samples = 1_000_000
+        self.file_names = ["session.eeg", "session.eeg2"]
+        rng = np.random.default_rng(seed=0)
+        self.lfp_data = rng.integers(-4, 4, size=(len(self.file_names), self.number_of_samples), dtype="int8")
+        for file_name, channel_data in zip(self.file_names, self.lfp_data):
+            header = (
+                f"trial_date Friday, 15 Aug 2014\r\nsample_rate 250.0 hz\r\nnum_EEG_samples {len(channel_data)}\r\n"
+            )
+            with open(self.test_dir / file_name, "wb") as eeg_file:
+                eeg_file.write(header.encode() + b"data_start" + channel_data.tobytes() + b"\r\ndata_end\r\n")
+
+    @property
+    def source_bytes(self):
+        """The LFP of all the channels is read, not only that of the file_path of the interface."""
+        return sum((self.test_dir / file_name).stat().st_size for file_name in self.file_names)
+
+    @staticmethod
+    def patch_timings(interface_seconds):
+        """
+        Time the writes of the metadata alone in 1, 2 and 1 seconds, and then the conversion of each interface in
+        1 second more than interface_seconds, so that the measured seconds net of the overhead are exact.
+        """
+        times = [0.0, 1.0, 10.0, 12.0, 20.0, 21.0]
+        for seconds in interface_seconds:
+            times.extend([30.0, 30.0 + 1.0 + seconds])
+        return patch("neuroconv.tools.throughput_calibration.perf_counter", side_effect=times)
+
+    def test_calibrate_conversion_throughput(self):
+        class LFPConverter(NWBConverter):
+            data_interface_classes = dict(LFP=AxonaLFPDataInterface)
+
+        converter = LFPConverter(source_data=dict(LFP=dict(file_path=str(self.test_dir / "session.eeg"))))
+        metadata = converter.get_metadata()
+        metadata["NWBFile"].update(session_start_time="2014-08-15T00:00:00")
+        with self.patch_timings(interface_seconds=[2.5]):
+            measurements = calibrate_conversion_throughput(converter=converter, metadata=metadata, stub_test=False)
+
+        self.assertEqual(list(measurements), ["LFP"])
+        self.assertEqual(measurements["LFP"]["modality"], "ecephys")
+        self.assertEqual(measurements["LFP"]["source_bytes"], self.source_bytes)
+        self.assertGreaterEqual(measurements["LFP"]["bytes"], self.lfp_data.nbytes)
+        self.assertLess(measurements["LFP"]["stored_bytes"], measurements["LFP"]["bytes"])
+        self.assertEqual(measurements["LFP"]["seconds"], 2.5)
+
+    def test_get_interface_source_bytes(self):
+        interface = AxonaLFPDataInterface(file_path=str(self.test_dir / "session.eeg"))
+        self.assertEqual(get_interface_source_bytes(data_interface=interface), self.source_bytes)
+
+    def test_calibrate_conversion_throughput_stub(self):
+        class LFPConverter(NWBConverter):
+            data_interface_classes = dict(LFP=AxonaLFPDataInterface)
+
+        converter = LFPConverter(source_data=dict(LFP=dict(file_path=str(self.test_dir / "session.eeg"))))
+        metadata = converter.get_metadata()
+        metadata["NWBFile"].update(session_start_time="2014-08-15T00:00:00")
+        measurements = calibrate_conversion_throughput(converter=converter, metadata=metadata, stub_test=True)
+
+        # The source bytes are scaled by the fraction of the samples written by the stub
+        stub_samples = converter.data_interface_objects["LFP"].subset_recording(stub_test=True).get_num_samples()
+        self.assertAlmostEqual(
+            measurements["LFP"]["source_bytes"], self.source_bytes * stub_samples / self.number_of_samples
+        )
+        self.assertLess(measurements["LFP"]["source_bytes"], self.source_bytes)
+
+    def test_calibrate_conversion_from_yaml(self):
+        specification_file_path = self.test_dir / "specification.yml"
+        with open(specification_file_path, "w") as specification_file:
+            specification_file.write(
+                "metadata:\n"
+                "  NWBFile:\n"
+                "    session_start_time: '2014-08-15T00:00:00'\n"
+                "experiments:\n"
+                "  lfp:\n"
+                "    data_interfaces:\n"
+                "      - AxonaLFPDataInterface\n"
+                "    sessions:\n"
+                "      - source_data:\n"
+                "          AxonaLFPDataInterface:\n"
+                "            file_path: session.eeg\n"
+            )
+        with self.patch_timings(interface_seconds=[0.5]):
+            calibration_profile = calibrate_conversion_from_yaml(
+                specification_file_path=specification_file_path, stub_test=False
+            )
+
+        self.assertEqual(list(calibration_profile), ["ecephys"])
+        self.assertEqual(calibration_profile["ecephys"]["source_bytes"], self.source_bytes)
+        self.assertEqual(calibration_profile["ecephys"]["seconds"], 0.5)
+        self.assertEqual(calibration_profile["ecephys"]["conversion_rate_mb"], self.source_bytes / 1e6 / 0.5)
+        self.assertEqual(
+            calibration_profile["ecephys"]["compression_ratio"],
+            calibration_profile["ecephys"]["source_bytes"] / calibration_profile["ecephys"]["stored_bytes"],
+        )
+        self.assertEqual(list(self.test_dir.glob("*.nwb")), [])
+
+        profile_file_path = self.test_dir / "calibration_profile.json"
+        save_calibration_profile(calibration_profile=calibration_profile, file_path=profile_file_path)
+        self.assertEqual(load_calibration_profile(file_path=profile_file_path), calibration_profile)
+
+    def test_get_interface_modality(self):
+        interface = AxonaLFPDataInterface(file_path=str(self.test_dir / "session.eeg"))
+        self.assertEqual(get_interface_modality(data_interface=interface), "ecephys")
+        self.assertEqual(get_interface_modality(data_interface=object()), "other")
+
+
+def test_get_calibration_profile():
+    calibration_profile = get_calibration_profile(
+        measurements=[
+            dict(modality="ecephys", source_bytes=4e6, bytes=8e6, stored_bytes=2e6, seconds=1.0),
+            dict(modality="ecephys", source_bytes=2e6, bytes=4e6, stored_bytes=1e6, seconds=0.5),
+            dict(modality="behavior", source_bytes=1e6, bytes=50e6, stored_bytes=1e6, seconds=2.0),
+        ]
+    )
+    # The rates are relative to the source data, not to the uncompressed data written to the NWBFile
+    assert calibration_profile == dict(
+        ecephys=dict(
+            source_bytes=6e6, bytes=12e6, stored_bytes=3e6, seconds=1.5, conversion_rate_mb=4.0, compression_ratio=2.0
+        ),
+        behavior=dict(
+            source_bytes=1e6, bytes=50e6, stored_bytes=1e6, seconds=2.0, conversion_rate_mb=0.5, compression_ratio=1.0
+        ),
+    )
+
+
+def test_get_calibrated_rates():
+    calibration_profile = dict(
+        ecephys=dict(conversion_rate_mb=4.0, compression_ratio=2.0),
+        ophys=dict(conversion_rate_mb=1.0, compression_ratio=1.0),
+    )
+    # 100 MB of ecephys take 25 s and compress to 50 MB; 50 MB of ophys take 50 s and stay 50 MB
+    rates = get_calibrated_rates(calibration_profile=calibration_profile, modality_mb=dict(ecephys=100, ophys=50))
+    assert rates == dict(conversion_rate_mb=2.0, compression_ratio=1.5)
+    assert estimate_total_conversion_runtime(total_mb=150, **rates) == estimate_total_conversion_runtime(
+        total_mb=150, conversion_rate_mb=2.0, compression_ratio=1.5
+    )
+
+
+def test_get_calibrated_rates_assertion():
+    calibration_profile = dict(ecephys=dict(conversion_rate_mb=4.0, compression_ratio=2.0))
+    with pytest.raises(AssertionError, match=re.escape("no rates for the modalities ['behavior']")):
+        get_calibrated_rates(calibration_profile=calibration_profile, modality_mb=dict(behavior=10))
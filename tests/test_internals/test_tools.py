@@ -1,9 +1,14 @@
 import os
+import sys
+import json
 import unittest
+from unittest.mock import patch
 from datetime import datetime
 from tempfile import mkdtemp
 from pathlib import Path
-from shutil import rmtree
+from shutil import rmtree, copytree, copyfile
+from threading import Lock
+from time import sleep
 
 import pytest
 from pynwb import NWBHDF5IO, ProcessingModule, TimeSeries
@@ -15,6 +20,7 @@ from neuroconv.tools.nwb_helpers import (
     get_default_nwbfile_metadata,
     make_or_load_nwbfile,
 )
+from neuroconv.tools import data_transfers
 from neuroconv.tools.data_transfers import (
     get_globus_dataset_content_sizes,
     estimate_s3_conversion_cost,
@@ -22,6 +28,8 @@ from neuroconv.tools.data_transfers import (
     automatic_dandi_upload,
     transfer_globus_content,
     deploy_process,
+    run_conversion_pipeline,
+    track_globus_transfers,
 )
 
 try:
@@ -234,6 +242,336 @@ class TestGlobusTransferContent(TestCase):
         assert tmpdir_size > 0
 
 
+FAKE_GLOBUS_CLI = """
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+state_folder_path = Path(os.environ["FAKE_GLOBUS_STATE"])
+with open(state_folder_path / "calls.txt", "a") as calls_file:
+    calls_file.write(" ".join(sys.argv[1:]) + "\\n")
+if sys.argv[1] == "transfer":
+    batch_file_path = Path(sys.argv[sys.argv.index("--batch") + 1])
+    if "failing" in batch_file_path.read_text():
+        print("Error: the batch could not be submitted")
+        sys.exit(0)
+    print("Message: The transfer has been accepted and a task has been created and queued for execution")
+    print(f"Task ID: task-{batch_file_path.stem}")
+elif sys.argv[1] == "ls":
+    sizes = dict(a=100, b=200, c=300)
+    print(json.dumps(dict(DATA=[dict(name=name, size=size, type="file") for name, size in sizes.items()])))
+elif sys.argv[1:3] == ["task", "show"]:
+    start_time = time.time()
+    time.sleep(0.2)
+    with open(state_folder_path / "task_show_times.txt", "a") as times_file:
+        times_file.write(f"{start_time} {time.time()}\\n")
+    task_id = sys.argv[3]
+    # Each task is done after its third status request
+    with open(state_folder_path / f"{task_id}.txt", "a") as task_file:
+        task_file.write("show\\n")
+    number_of_requests = len((state_folder_path / f"{task_id}.txt").read_text().splitlines())
+    status = "FAILED" if task_id == "task-failing" else "SUCCEEDED" if number_of_requests >= 3 else "ACTIVE"
+    print(json.dumps(dict(status=status, bytes_transferred=min(number_of_requests, 3) * 100)))
+"""
+
+
+class TestGlobusTransferContentWithFakeCLI(TestCase):
+    """Runs the Globus transfer and tracking with a fake 'globus' command line interface on the PATH."""
+
+    def setUp(self):
+        self.tmpdir = Path(mkdtemp())
+        self.cli_folder_path = self.tmpdir / "bin"
+        self.cli_folder_path.mkdir()
+        fake_globus_path = self.cli_folder_path / "globus"
+        fake_globus_path.write_text(f"#!{sys.executable}\n{FAKE_GLOBUS_CLI}")
+        fake_globus_path.chmod(0o755)
+        self.state_folder_path = self.tmpdir / "state"
+        self.state_folder_path.mkdir()
+        environment = dict(
+            PATH=f"{self.cli_folder_path}{os.pathsep}{os.environ['PATH']}",
+            FAKE_GLOBUS_STATE=str(self.state_folder_path),
+        )
+        self.patches = [patch.dict(os.environ, environment), patch.object(data_transfers, "HAVE_GLOBUS", True)]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        rmtree(self.tmpdir)
+
+    def get_calls(self):
+        return (self.state_folder_path / "calls.txt").read_text().splitlines()
+
+    @unittest.skipIf(sys.platform.startswith("win"), "The fake globus CLI is an executable script.")
+    def test_transfer_globus_content(self):
+        destination_folder_path = self.tmpdir / "destination"
+        success, task_ids = transfer_globus_content(
+            source_endpoint_id="source",
+            source_files=[["/data/a", "/data/b"], ["/data/c"], ["/other/a"]],
+            destination_endpoint_id="destination",
+            destination_folder=destination_folder_path,
+            display_progress=False,
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(task_ids, ["task-paths_0", "task-paths_1", "task-paths_2"])
+        calls = self.get_calls()
+        self.assertEqual(len([call for call in calls if call.startswith("transfer")]), 3)
+        # Each source folder is listed only once
+        self.assertEqual(
+            sorted(call for call in calls if call.startswith("ls")),
+            [
+                "ls -Fjson source:/data --recursive",
+                "ls -Fjson source:/other --recursive",
+            ],
+        )
+        self.assertEqual(list(destination_folder_path.iterdir()), [])
+
+    @unittest.skipIf(sys.platform.startswith("win"), "The fake globus CLI is an executable script.")
+    def test_transfer_globus_content_reports_accepted_tasks(self):
+        destination_folder_path = self.tmpdir / "destination"
+        with self.assertRaisesWith(
+            exc_type=AssertionError,
+            exc_msg=(
+                "Transfer submission failed for 1 of 3 batches! The tasks ['task-paths_0', 'task-paths_2'] were "
+                "accepted and are still running. Globus output:\nError: the batch could not be submitted"
+            ),
+        ):
+            transfer_globus_content(
+                source_endpoint_id="source",
+                source_files=[["/data/a"], ["/data/failing"], ["/data/c"]],
+                destination_endpoint_id="destination",
+                destination_folder=destination_folder_path,
+                display_progress=False,
+            )
+        self.assertEqual(len([call for call in self.get_calls() if call.startswith("transfer")]), 3)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "The fake globus CLI is an executable script.")
+    def test_track_globus_transfers_polls_concurrently(self):
+        task_total_sizes = {f"task-{j}": 300 for j in range(8)}
+        success = track_globus_transfers(
+            task_total_sizes=task_total_sizes, display_progress=False, minimum_progress_update_rate=0.01
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(len(self.get_calls()), 3 * len(task_total_sizes))
+        # The status requests of a single update overlap in time
+        request_times = [
+            [float(time) for time in line.split()]
+            for line in (self.state_folder_path / "task_show_times.txt").read_text().splitlines()
+        ]
+        max_overlapping_requests = max(
+            sum(start_time <= other_start_time < end_time for other_start_time, _ in request_times)
+            for start_time, end_time in request_times
+        )
+        self.assertGreater(max_overlapping_requests, 1)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "The fake globus CLI is an executable script.")
+    def test_track_globus_transfers_failed_task(self):
+        with self.assertRaisesWith(
+            exc_type=AssertionError,
+            exc_msg=(
+                "Something went wrong with the transfer! Please manually inspect the task with ID 'task-failing'."
+            ),
+        ):
+            track_globus_transfers(task_total_sizes={"task-failing": 300}, display_progress=False)
+
+    @unittest.skipIf(sys.platform.startswith("win"), "The fake globus CLI is an executable script.")
+    def test_track_globus_transfers_timeout(self):
+        # Without progress, the interval between updates doubles from 0.05 up to 0.2 seconds
+        success = track_globus_transfers(
+            task_total_sizes={"task-slow": 10**6},
+            display_progress=False,
+            minimum_progress_update_rate=0.05,
+            progress_update_rate=0.2,
+            progress_update_timeout=0.01,
+        )
+        self.assertFalse(success)
+        self.assertEqual(len(self.get_calls()), 1)
+
+
+@pytest.mark.parametrize(
+    "remaining_seconds, status_changed, expected_update_rate",
+    [
+        # Far from completion, the interval grows up to the longest one
+        ([1000.0, 300.0], False, 60.0),
+        # Near completion, the next update is aimed at half of the earliest estimated completion
+        ([1000.0, 20.0], False, 10.0),
+        ([0.5], False, 1.0),
+        # Without progress, the interval doubles
+        ([], False, 16.0),
+        ([1000.0], True, 1.0),
+    ],
+)
+def test_get_next_update_rate(remaining_seconds, status_changed, expected_update_rate):
+    update_rate = data_transfers._get_next_update_rate(
+        update_rate=8.0,
+        remaining_seconds=remaining_seconds,
+        status_changed=status_changed,
+        minimum_progress_update_rate=1.0,
+        progress_update_rate=60.0,
+    )
+    assert update_rate == expected_update_rate
+
+
+class TestConversionPipeline(TestCase):
+    """Runs the pipeline with local stand-ins for the Globus transfer and the DANDI upload."""
+
+    def setUp(self):
+        self.tmpdir = Path(mkdtemp())
+        self.remote_folder_path = self.tmpdir / "remote"
+        self.local_folder_path = self.tmpdir / "local"
+        self.archive_folder_path = self.tmpdir / "archive"
+        for folder_path in (self.remote_folder_path, self.local_folder_path, self.archive_folder_path):
+            folder_path.mkdir()
+        self.session_ids = [f"session_{j}" for j in range(8)]
+        for session_id in self.session_ids:
+            (self.remote_folder_path / session_id).mkdir()
+            (self.remote_folder_path / session_id / "data.bin").write_bytes(session_id.encode())
+
+        self.lock = Lock()
+        self.active_stages = dict(transfer=0, convert=0, upload=0)
+        self.max_active_stages = dict(transfer=0, convert=0, upload=0)
+        self.max_local_sessions = 0
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def _run_stage(self, stage: str, function):
+        with self.lock:
+            self.active_stages[stage] += 1
+            self.max_active_stages[stage] = max(self.max_active_stages[stage], self.active_stages[stage])
+            local_session_ids = {path.name.split(".")[0] for path in self.local_folder_path.iterdir()}
+            self.max_local_sessions = max(self.max_local_sessions, len(local_session_ids))
+        try:
+            sleep(0.01)
+            return function()
+        finally:
+            with self.lock:
+                self.active_stages[stage] -= 1
+
+    def transfer(self, session_id: str) -> Path:
+        source_folder_path = self.local_folder_path / session_id
+        return self._run_stage(
+            "transfer", lambda: Path(copytree(src=self.remote_folder_path / session_id, dst=source_folder_path))
+        )
+
+    def convert(self, session_id: str, source_folder_path: Path) -> Path:
+        def _convert():
+            if session_id == "session_3":
+                raise ValueError("corrupt source data")
+            nwbfile_path = self.local_folder_path / f"{session_id}.nwb"
+            nwbfile_path.write_bytes((source_folder_path / "data.bin").read_bytes())
+            return nwbfile_path
+
+        return self._run_stage("convert", _convert)
+
+    def upload(self, session_id: str, nwbfile_path: Path):
+        self._run_stage("upload", lambda: copyfile(src=nwbfile_path, dst=self.archive_folder_path / nwbfile_path.name))
+
+    def test_run_conversion_pipeline(self):
+        failed_sessions = run_conversion_pipeline(
+            session_ids=self.session_ids,
+            transfer=self.transfer,
+            convert=self.convert,
+            upload=self.upload,
+            max_sessions_in_flight=3,
+            max_concurrent_transfers=2,
+            max_concurrent_conversions=2,
+            max_concurrent_uploads=1,
+        )
+
+        self.assertEqual(list(failed_sessions), ["session_3"])
+        self.assertEqual(failed_sessions["session_3"], "convert failed with ValueError: corrupt source data")
+        uploaded_session_ids = [session_id for session_id in self.session_ids if session_id != "session_3"]
+        self.assertEqual(
+            sorted(path.name for path in self.archive_folder_path.iterdir()),
+            [f"{session_id}.nwb" for session_id in uploaded_session_ids],
+        )
+        for session_id in uploaded_session_ids:
+            self.assertEqual((self.archive_folder_path / f"{session_id}.nwb").read_bytes(), session_id.encode())
+        # The source data of the failed session is removed as well
+        self.assertEqual(list(self.local_folder_path.iterdir()), [])
+        self.assertLessEqual(self.max_local_sessions, 3)
+        self.assertLessEqual(self.max_active_stages["transfer"], 2)
+        self.assertLessEqual(self.max_active_stages["convert"], 2)
+        self.assertEqual(self.max_active_stages["upload"], 1)
+
+    def test_run_conversion_pipeline_keep_failed_sessions(self):
+        failed_sessions = run_conversion_pipeline(
+            session_ids=self.session_ids,
+            transfer=self.transfer,
+            convert=self.convert,
+            upload=self.upload,
+            max_sessions_in_flight=2,
+            keep_failed_sessions=True,
+        )
+
+        self.assertEqual(list(failed_sessions), ["session_3"])
+        self.assertEqual([path.name for path in self.local_folder_path.iterdir()], ["session_3"])
+        self.assertEqual(len(list(self.archive_folder_path.iterdir())), len(self.session_ids) - 1)
+        # The kept data of the failed session counts towards the sessions held on local disk
+        self.assertLessEqual(self.max_local_sessions, 2)
+
+    def test_run_conversion_pipeline_failed_sessions_fill_local_disk(self):
+        failed_sessions = run_conversion_pipeline(
+            session_ids=["session_3", "session_4"],
+            transfer=self.transfer,
+            convert=self.convert,
+            upload=self.upload,
+            max_sessions_in_flight=1,
+            keep_failed_sessions=True,
+        )
+
+        self.assertEqual(
+            failed_sessions,
+            dict(
+                session_3="convert failed with ValueError: corrupt source data",
+                session_4="not started since the local disk holds the data of 1 failed sessions",
+            ),
+        )
+        self.assertEqual([path.name for path in self.local_folder_path.iterdir()], ["session_3"])
+
+    def test_run_conversion_pipeline_keeps_nwbfile_of_failed_upload(self):
+        def upload(session_id: str, nwbfile_path: Path):
+            if session_id == "session_1":
+                raise ConnectionError("archive unavailable")
+            self.upload(session_id=session_id, nwbfile_path=nwbfile_path)
+
+        failed_sessions = run_conversion_pipeline(
+            session_ids=self.session_ids[:3],
+            transfer=self.transfer,
+            convert=self.convert,
+            upload=upload,
+        )
+
+        self.assertEqual(failed_sessions, dict(session_1="upload failed with ConnectionError: archive unavailable"))
+        # The source data of the failed session is removed, but its NWBFile is kept to retry the upload
+        self.assertEqual([path.name for path in self.local_folder_path.iterdir()], ["session_1.nwb"])
+        self.assertEqual((self.local_folder_path / "session_1.nwb").read_bytes(), b"session_1")
+        self.assertEqual(
+            sorted(path.name for path in self.archive_folder_path.iterdir()), ["session_0.nwb", "session_2.nwb"]
+        )
+
+    def test_run_conversion_pipeline_without_cleanup(self):
+        failed_sessions = run_conversion_pipeline(
+            session_ids=self.session_ids[:2],
+            transfer=self.transfer,
+            convert=self.convert,
+            upload=self.upload,
+            cleanup=False,
+        )
+
+        self.assertEqual(failed_sessions, dict())
+        self.assertEqual(
+            sorted(path.name for path in self.local_folder_path.iterdir()),
+            ["session_0", "session_0.nwb", "session_1", "session_1.nwb"],
+        )
+
+
 class TestMakeOrLoadNWBFile(TestCase):
     @classmethod
     def setUpClass(cls):